@@ -21,11 +21,14 @@ class CoreConfig(AppConfig):
                 "process_result": "ProcessResult",
                 "batch": "Batch"
             },
+            "process_result_batch_size": None,  # maximum amount of ProcessResults to write in one query
             "resource_exception_log_level": logging.WARNING
         })
         register_defaults("http_resource", {
             "method": "get",
-            "continuation_limit": 9999  # an arbitrary large number to never hit this limit
+            "continuation_limit": 9999,  # an arbitrary large number to never hit this limit
+            "concurrency": 1,  # amount of continuation pages or pipeline requests that may get send in parallel
+            "domain_concurrency": None  # amount of pipeline requests to a single domain that may run in parallel
         })
         register_defaults("extract_processor", {
             "extractor": "ExtractProcessor.extract_from_resource",
@@ -36,5 +39,7 @@ class CoreConfig(AppConfig):
             "phase": "initial",
             "phases": [],
             "identifier": "srn",  # SURF Resource Name
-            "is_post_initialization": False
+            "is_post_initialization": False,
+            "streaming": False,  # overlaps fetching with document updates and doesn't keep copies of seeds in memory
+            "merge_index_max_age": None  # timedelta kwargs that enable the MergeIndex for "merge" phases
         })
@@ -2,6 +2,7 @@ import logging
 from copy import copy
 
 from django.conf import settings
+from django.db.models import Count, Q
 
 
 harvester = logging.getLogger('harvester')
@@ -88,13 +89,16 @@ class HarvestLogger(object):
         documents.info(f"Report: {external_id}", extra=extra)
 
     def _get_document_counts(self, document_queryset):
-        total = document_queryset.count()
-        inactive_count = document_queryset.filter(properties__state="inactive").count()
-        deleted_count = document_queryset.filter(properties__state="deleted").count()
+        # The state column mirrors properties.state and counting it in one query avoids reading JSON
+        counts = document_queryset.aggregate(
+            total=Count("id"),
+            inactive_count=Count("id", filter=Q(state="inactive")),
+            deleted_count=Count("id", filter=Q(state="deleted"))
+        )
         return {
-            "total": total - inactive_count - deleted_count,
-            "inactive_count": inactive_count,
-            "deleted_count": deleted_count
+            "total": counts["total"] - counts["inactive_count"] - counts["deleted_count"],
+            "inactive_count": counts["inactive_count"],
+            "deleted_count": counts["deleted_count"]
         }
 
     def report_collection(self, collection, entity):
@@ -0,0 +1,49 @@
+from time import perf_counter
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.loading import load_harvest_models
+
+
+class Command(BaseCommand):
+    """
+    Compares the per document cost of serializing search documents with separate to_search calls for each index,
+    against serializing them with to_search_targets.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument('-a', '--app-label', type=str, default="products")
+        parser.add_argument('-s', '--size', type=int, default=500)
+        parser.add_argument('-r', '--rounds', type=int, default=3)
+
+    def handle(self, *args, **options):
+        app_label = options["app_label"]
+        models = load_harvest_models(app_label)
+        dataset_version = models["DatasetVersion"].objects.get_current_version()
+        if dataset_version is None:
+            raise CommandError(f"Can't benchmark without a current dataset version for: {app_label}")
+        Document = models["Document"]
+        documents = list(
+            dataset_version.documents.filter(state=Document.States.ACTIVE)[:options["size"]]
+        )
+        if not documents:
+            raise CommandError("Can't benchmark without active documents")
+        Document.prefetch_to_data(documents)
+
+        def separate_passes():
+            for document in documents:
+                document.to_search(use_multilingual_fields=False)
+                document.to_search(use_multilingual_fields=True)
+
+        def single_pass():
+            for document in documents:
+                document.to_search_targets()
+
+        for name, serialize in [("to_search (twice)", separate_passes), ("to_search_targets", single_pass)]:
+            durations = []
+            for _ in range(options["rounds"]):
+                start = perf_counter()
+                serialize()
+                durations.append(perf_counter() - start)
+            per_document = min(durations) / len(documents) * 1000
+            self.stdout.write(f"{name:<20}{per_document:>10.3f} ms per document ({len(documents)} documents)")
@@ -9,6 +9,7 @@ from django.db.models import Q
 from django.contrib.auth.models import User
 
 from core.loading import load_harvest_models, load_task_resources
+from core.models import MergeIndex, IndexingChange
 
 
 class Command(BaseCommand):
@@ -55,6 +56,10 @@ class Command(BaseCommand):
                     filters = reduce(lambda x, y: x | y, document_phase_filters)
                     if not models["Document"].objects.filter(filters).exists():
                         resource.delete()
+        # Merge index entries that haven't been refreshed for a long time are no longer in use
+        MergeIndex.objects.filter(modified_at__lte=purge_time).delete()
+        # Changes have been pushed long ago and the change_cursor of indices has moved past them
+        IndexingChange.objects.filter(created_at__lte=purge_time)._raw_delete("default")
 
     @staticmethod
     def _delete_users_data(force=False):
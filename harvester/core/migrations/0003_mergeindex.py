@@ -0,0 +1,30 @@
+# Generated by Django 4.2.15 on 2026-10-18 10:12
+
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_remove_sites'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MergeIndex',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('index', models.CharField(max_length=255)),
+                ('merge_value', models.CharField(max_length=255)),
+                ('seed_hash', models.CharField(max_length=40)),
+                ('contents', models.JSONField(default=list, encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('modified_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'merge indices',
+                'unique_together': {('index', 'merge_value')},
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.15 on 2026-10-18 12:40
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('core', '0003_mergeindex'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IndexingChange',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('document_id', models.BigIntegerField()),
+                ('dataset_version_id', models.BigIntegerField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('document_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='contenttypes.contenttype')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['document_type', 'dataset_version_id', 'id'], name='indexing_change_cursor_idx')],
+            },
+        ),
+    ]
@@ -1,2 +1,4 @@
 from .resources.matomo import MatomoVisitsResource
 from .search import Query, QueryRanking
+from .seeding import MergeIndex
+from .indexing import IndexingChange
@@ -1,3 +1,4 @@
+from typing import Iterable
 from collections import defaultdict
 from datetime import datetime
 
@@ -14,8 +15,33 @@ class HarvestObjectMixin(models.Model):
     pending_at = models.DateTimeField(default=now, null=True, blank=True)
     finished_at = models.DateTimeField(null=True, blank=True)
 
+    @classmethod
+    def prefetch_task_checks(cls, instances: list["HarvestObjectMixin"]) -> None:
+        """
+        Loads any data that the checks of tasks need for all given instances at once.
+        Classes with checks that require database queries should override this method and store the data on instances.
+        """
+        pass
+
+    @classmethod
+    def get_bulk_pending_tasks(cls, instances: Iterable["HarvestObjectMixin"]) -> dict[int, list[str]]:
+        """
+        Works like get_pending_tasks, but for many instances at once,
+        which prevents running queries for task checks for each instance separately.
+
+        :param instances: list or queryset of instances to get pending tasks for
+        :return: dictionary with instance ids as keys and a list of pending tasks as values
+        """
+        instances = list(instances)
+        cls.prefetch_task_checks(instances)
+        return {
+            instance.id: instance.get_pending_tasks()
+            for instance in instances
+        }
+
     def get_pending_tasks(self) -> list[str]:
         pending_tasks = []
+        check_results = {}
         for task_name, conditions in self.tasks.items():
             # If a task has already run it can't be pending to prevent eternal loops
             has_run = self.pipeline.get(task_name, False)
@@ -23,7 +49,10 @@ class HarvestObjectMixin(models.Model):
             is_pending_task = False
             for check in conditions["checks"]:
                 negate = check.startswith("!")
-                check_attribute = getattr(self, check if not negate else check[1:])
+                check_name = check if not negate else check[1:]
+                if check_name not in check_results:  # different tasks often share checks
+                    check_results[check_name] = getattr(self, check_name)
+                check_attribute = check_results[check_name]
                 if not check_attribute and not negate or check_attribute and negate:
                     break
             else:
@@ -43,6 +72,17 @@ class HarvestObjectMixin(models.Model):
                 pending_tasks.append(task_name)
         return pending_tasks
 
+    def get_dispatched_tasks(self) -> list[str]:
+        # Dispatched tasks are running and get replaced by their result when done
+        return [
+            task_name for task_name in self.tasks
+            if isinstance(self.pipeline.get(task_name), dict) and self.pipeline[task_name].get("is_dispatched")
+        ]
+
+    def mark_dispatched_tasks(self, task_names: list[str]) -> None:
+        for task_name in task_names:
+            self.pipeline[task_name] = {"success": False, "is_dispatched": True}
+
     def get_property_dependencies(self) -> dict:
         property_dependencies = defaultdict(list)
         for task_name, conditions in self.tasks.items():
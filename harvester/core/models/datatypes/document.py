@@ -14,6 +14,7 @@ from datagrowth.utils import reach
 from datagrowth.datatypes import DocumentBase
 from datagrowth.resources.base import Resource
 from core.models.datatypes.base import HarvestObjectMixin
+from core.models.indexing import IndexingChange
 from core.utils.decoders import HarvesterJSONDecoder
 
 
@@ -28,6 +29,42 @@ def document_metadata_default() -> dict:
     }
 
 
+class HarvestDocumentQuerySet(models.QuerySet):
+
+    # Names of code paths with the JSON fields that these code paths never use
+    projections = {
+        "dispatch": ("metadata",),
+        "index": ("pipeline", "tasks",),
+        "raw": ("pipeline", "tasks",),
+        "metadata": ("derivatives", "pipeline", "tasks",),
+        "integrity": ("derivatives", "pipeline", "tasks",),
+    }
+
+    def projection(self, name: str) -> "HarvestDocumentQuerySet":
+        """
+        Defers loading of the JSON fields that the code path with given name doesn't need.
+        Deferred fields still load when accessed, but that costs a query per Document.
+        """
+        if name not in self.projections:
+            raise ValueError(f"Unknown Document projection: {name}")
+        return self.defer(*self.projections[name])
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = super().bulk_create(objs, *args, **kwargs)
+        IndexingChange.objects.record_changes(objs)
+        return objs
+
+    def bulk_update(self, objs, *args, **kwargs):
+        objs = list(objs)
+        rows = super().bulk_update(objs, *args, **kwargs)
+        IndexingChange.objects.record_changes(objs)
+        return rows
+
+
+class HarvestDocumentManager(models.Manager.from_queryset(HarvestDocumentQuerySet)):
+    pass
+
+
 class HarvestDocument(DocumentBase, HarvestObjectMixin):
 
     # NB: These foreign keys are app agnostic and point to different models in different apps
@@ -49,7 +86,10 @@ class HarvestDocument(DocumentBase, HarvestObjectMixin):
         encoder=DjangoJSONEncoder, decoder=HarvesterJSONDecoder, db_index=True
     )
 
+    objects = HarvestDocumentManager()
+
     property_defaults = {}
+    has_index_change = False  # set by set_metadata and reset when the change gets recorded for indexing
 
     @classmethod
     def build(cls, data, collection=None, build_time=None):
@@ -102,12 +142,14 @@ class HarvestDocument(DocumentBase, HarvestObjectMixin):
         if new:
             self.metadata["created_at"] = current_time
             self.metadata["modified_at"] = current_time
+            self.has_index_change = True
             self.prepare_processing(current_time, commit=False)
         # Update metadata about deletion
         self.state = self.properties.get("state", None)
         if self.state != self.States.ACTIVE and not new:
             self.metadata["deleted_at"] = current_time
             self.metadata["modified_at"] = current_time
+            self.has_index_change = True
             self.finish_processing(current_time, commit=False)
         elif self.state == self.States.ACTIVE and self.pipeline:
             self.metadata["deleted_at"] = None
@@ -134,9 +176,11 @@ class HarvestDocument(DocumentBase, HarvestObjectMixin):
         properties_hash = sha1(properties_string.encode("utf-8")).hexdigest()
         if self.metadata.get("hash", None) is None:
             self.metadata["hash"] = properties_hash
+            self.has_index_change = True
         elif properties_hash != self.metadata["hash"]:
             self.metadata["hash"] = properties_hash
             self.metadata["modified_at"] = current_time
+            self.has_index_change = True
 
     def clean(self, set_metadata=True):
         super().clean()
@@ -152,6 +196,10 @@ class HarvestDocument(DocumentBase, HarvestObjectMixin):
         if set_metadata:
             self.set_metadata()
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        IndexingChange.objects.record_changes([self])
+
     def apply_resource(self, resource: Resource) -> None:
         pass
 
@@ -165,6 +213,24 @@ class HarvestDocument(DocumentBase, HarvestObjectMixin):
             self.pending_at = current_time
             self.finished_at = None
 
+    @classmethod
+    def prefetch_to_data(cls, instances: list["HarvestDocument"]) -> None:
+        """
+        Loads any related data that to_data needs for all given instances at once.
+        Classes with to_data methods that require database queries should override this and store data on instances.
+        """
+        pass
+
+    @classmethod
+    def copy_related(cls, document_ids: dict[int, int]) -> None:
+        """
+        Copies data that is stored outside of Documents when Documents get copied, for instance into a new Set.
+        Classes that store data in related models should override this to copy the data to the new Documents.
+
+        :param document_ids: a mapping from ids of source Documents to the ids of their copies
+        """
+        pass
+
     def get_derivatives_data(self) -> dict:
         data = {}
         for base, derivatives in self.derivatives.items():
@@ -204,6 +270,31 @@ class HarvestDocument(DocumentBase, HarvestObjectMixin):
         search_data["_id"] = self.properties["srn"]
         return search_data
 
+    def to_data_targets(self) -> tuple[dict, dict]:
+        """
+        Returns the output of to_data without and with multilingual fields.
+        Classes with expensive to_data methods should override this method to share work between both outputs.
+        """
+        return self.to_data(use_multilingual_fields=False), self.to_data(use_multilingual_fields=True)
+
+    def to_search_targets(self) -> list[tuple[str, dict]]:
+        """
+        Returns the search documents for the language specific index and the multilingual index with their language.
+        """
+        language = self.get_analyzer_language()
+        if self.state != self.States.ACTIVE:
+            return [
+                (language, self.to_search(use_multilingual_fields=False),),
+                ("all", self.to_search(use_multilingual_fields=True),),
+            ]
+        search_data, multilingual_search_data = self.to_data_targets()
+        search_data["_id"] = self.properties["srn"]
+        multilingual_search_data["_id"] = self.properties["srn"]
+        return [
+            (language, search_data,),
+            ("all", multilingual_search_data,),
+        ]
+
     def __eq__(self, other):
         # We won't try equality with anything but a HarvestDocument of the same class
         if not isinstance(other, type(self)):
@@ -59,12 +59,15 @@ class HarvestSet(DocumentCollectionMixin, CollectionBase, HarvestObjectMixin):
     def copy_documents(self, source_set: HarvestSet) -> None:
         Document = self.get_document_model()
         for batch in ibatch(Document.objects.filter(collection_id=source_set.id), batch_size=100):
+            source_ids = []
             for doc in batch:
+                source_ids.append(doc.id)
                 doc.collection_id = self.id
                 doc.dataset_version = self.dataset_version
                 doc.pk = None
                 doc.id = None
             Document.objects.bulk_create(batch)
+            Document.copy_related({source_id: doc.id for source_id, doc in zip(source_ids, batch)})
 
     def process_soft_deletes(self) -> None:
         """
@@ -74,6 +77,7 @@ class HarvestSet(DocumentCollectionMixin, CollectionBase, HarvestObjectMixin):
         """
         Document = self.get_document_model()
         soft_deleted_documents = self.documents \
+            .projection("integrity") \
             .exclude(metadata__deleted_at=None) \
             .filter(properties__state=Document.States.ACTIVE)
         for batch in ibatch(soft_deleted_documents, batch_size=100):
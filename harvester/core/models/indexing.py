@@ -0,0 +1,70 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import models
+from django.db.models import Max, Q
+from django.utils.timezone import now
+from django.contrib.contenttypes.models import ContentType
+
+
+class IndexingChangeManager(models.Manager):
+
+    def record_changes(self, documents: list) -> None:
+        """
+        Appends a change for any Document that set_metadata marked as changed and resets the mark afterwards.
+        """
+        changes = []
+        for document in documents:
+            if not document.has_index_change or not document.id:
+                continue
+            changes.append(
+                self.model(
+                    document_type=ContentType.objects.get_for_model(document),
+                    document_id=document.id,
+                    dataset_version_id=document.dataset_version_id
+                )
+            )
+            document.has_index_change = False
+        if changes:
+            self.bulk_create(changes)
+
+    def get_last_id(self) -> int:
+        return self.aggregate(last_id=Max("id"))["last_id"] or 0
+
+    def get_changes(self, dataset_version, cursor: int, until: int) -> models.QuerySet:
+        """
+        Returns the changes for Documents of a DatasetVersion that happened after the cursor and up to until.
+        Ids get assigned when changes are inserted and not when they are committed,
+        which means that a change below the cursor may become visible after the cursor moved past it.
+        Therefore changes created during the last INDEXING_CHANGE_LAG seconds get returned regardless of the cursor.
+        """
+        document_model = dataset_version.documents.model
+        lag_start = now() - timedelta(seconds=settings.INDEXING_CHANGE_LAG)
+        return self.filter(
+            Q(id__gt=cursor) | Q(created_at__gte=lag_start),
+            document_type=ContentType.objects.get_for_model(document_model),
+            dataset_version_id=dataset_version.id,
+            id__lte=until
+        )
+
+
+class IndexingChange(models.Model):
+    """
+    An append-only outbox of Document changes that are relevant for search indices.
+    Documents write to it when set_metadata changes their hash or state
+    and index synchronisation consumes it in order, using the change_cursor of an OpenSearchIndex.
+    """
+
+    id = models.BigAutoField(primary_key=True)
+    document_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    document_id = models.BigIntegerField()
+    dataset_version_id = models.BigIntegerField(null=True, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    objects = IndexingChangeManager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["document_type", "dataset_version_id", "id"], name="indexing_change_cursor_idx"),
+        ]
@@ -0,0 +1,79 @@
+import json
+from hashlib import sha1
+from datetime import datetime
+
+from django.db import models
+from django.core.serializers.json import DjangoJSONEncoder
+
+
+def _serialize_objective_value(value) -> str:
+    # Objectives may contain extraction functions, which get identified by name to keep keys the same across processes
+    if callable(value):
+        return f"{value.__module__}.{value.__qualname__}"
+    return str(value)
+
+
+class MergeIndexManager(models.Manager):
+
+    def get_fresh_entries(self, index: str, seed_hashes: dict[str, str], since: datetime) -> dict[str, "MergeIndex"]:
+        """
+        Returns the index entries for given merge values, but only when the seed (list-level) data is unchanged
+        and the entry has been stored after the given datetime.
+        """
+        entries = self.filter(index=index, merge_value__in=seed_hashes.keys(), modified_at__gte=since)
+        return {
+            entry.merge_value: entry
+            for entry in entries
+            if entry.seed_hash == seed_hashes[entry.merge_value]
+        }
+
+    def store_entries(self, index: str, seed_hashes: dict[str, str], contents: dict[str, list]) -> None:
+        entries = [
+            MergeIndex(index=index, merge_value=merge_value, seed_hash=seed_hashes[merge_value], contents=content_list)
+            for merge_value, content_list in contents.items()
+            if content_list and merge_value in seed_hashes
+        ]
+        self.bulk_create(
+            entries,
+            update_conflicts=True,
+            unique_fields=["index", "merge_value"],
+            update_fields=["seed_hash", "contents", "modified_at"]
+        )
+
+
+class MergeIndex(models.Model):
+    """
+    Stores content retrieved during "merge" seeding phases, keyed by the phase and the value of the merge_on field.
+    This allows the seeding processor to skip requests when the seed data that would lead to a request hasn't changed.
+    """
+
+    index = models.CharField(max_length=255)
+    merge_value = models.CharField(max_length=255)
+    seed_hash = models.CharField(max_length=40)
+    contents = models.JSONField(default=list, encoder=DjangoJSONEncoder)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    modified_at = models.DateTimeField(auto_now=True)
+
+    objects = MergeIndexManager()
+
+    @staticmethod
+    def get_index_key(resource: str, phase: str, objective: dict) -> str:
+        """
+        Contents are extracted by the objective of a phase, so entries are only valid for that phase and objective.
+        """
+        objective_string = json.dumps(objective, sort_keys=True, default=_serialize_objective_value)
+        objective_hash = sha1(objective_string.encode("utf-8")).hexdigest()
+        return f"{resource}:{phase}:{objective_hash}"
+
+    @staticmethod
+    def hash_seed(seed: dict) -> str:
+        seed_string = json.dumps(seed, sort_keys=True, default=str)
+        return sha1(seed_string.encode("utf-8")).hexdigest()
+
+    def __str__(self) -> str:
+        return f"{self.index}:{self.merge_value}"
+
+    class Meta:
+        unique_together = ("index", "merge_value",)
+        verbose_name_plural = "merge indices"
@@ -1,10 +1,17 @@
 from time import sleep
+from typing import Iterator
+from urllib.parse import urlparse
+from itertools import zip_longest
+from threading import BoundedSemaphore
+from concurrent.futures import ThreadPoolExecutor
 from sentry_sdk import capture_message
+from collections import defaultdict
 from collections.abc import Generator
 
+from django.apps import apps
 from django.db.models import Q
 from django.contrib.contenttypes.models import ContentType
-from django.db import transaction
+from django.db import transaction, connection
 
 from datagrowth.configuration import create_config
 from datagrowth.resources.base import Resource
@@ -25,6 +32,10 @@ class ResourcePipelineProcessor(PipelineProcessor):
     def dispatch_resource(self, config, *args, **kwargs):
         return [], []
 
+    def dispatch_resources(self, config, requests: list[tuple[list, dict]]) -> Iterator[tuple[list, list]]:
+        for args, kwargs in requests:
+            yield self.dispatch_resource(config, *args, **kwargs)
+
     def filter_documents(self, queryset):
         depends_on = self.config.pipeline_depends_on
         pipeline_phase = self.config.pipeline_phase
@@ -40,11 +51,14 @@ class ResourcePipelineProcessor(PipelineProcessor):
         app_label, resource_model = config.resource.split(".")
         resource_type = ContentType.objects.get_by_natural_key(app_label, resource_model)
 
+        process_results = list(batch.processresult_set.select_related("document"))
+        requests = [
+            process_result.document.output(config.args, config.kwargs)
+            for process_result in process_results
+        ]
         updates = []
         creates = []
-        for process_result in batch.processresult_set.all():
-            args, kwargs = process_result.document.output(config.args, config.kwargs)
-            successes, fails = self.dispatch_resource(config, *args, **kwargs)
+        for process_result, (successes, fails) in zip(process_results, self.dispatch_resources(config, requests)):
             results = successes + fails
             if not len(results):
                 continue
@@ -57,8 +71,10 @@ class ResourcePipelineProcessor(PipelineProcessor):
                     self.ProcessResult(document=process_result.document, batch=batch,
                                        result_id=result_id, result_type=resource_type)
                 )
-            self.ProcessResult.objects.bulk_create(creates)
-            self.ProcessResult.objects.bulk_update(updates, ["result_type", "result_id"])
+        # All changes to ProcessResults get written at once, optionally in chunks of process_result_batch_size
+        write_batch_size = self.config.process_result_batch_size
+        self.ProcessResult.objects.bulk_create(creates, batch_size=write_batch_size)
+        self.ProcessResult.objects.bulk_update(updates, ["result_type", "result_id"], batch_size=write_batch_size)
 
     def extract_from_resource(self, extractor: ExtractProcessor, extract_method_name: str,
                               resource: Resource) -> dict | None:
@@ -90,48 +106,59 @@ class ResourcePipelineProcessor(PipelineProcessor):
             contribution_field, contribution_property = contribution_property.split("/")
             contribution_property = contribution_property or None
 
+        # Load all Resources for the batch upfront instead of one at a time
+        process_results = list(
+            batch.processresult_set.filter(result_id__isnull=False, result_type=self.result_type)
+        )
+        resources = self.result_type.model_class().objects.in_bulk(
+            [process_result.result_id for process_result in process_results]
+        )
+
+        # Extraction happens before locking, while changes get applied to Documents that are read under the lock
+        merges = []
+        for process_result in process_results:
+            result = resources.get(process_result.result_id)
+            if result is None:
+                continue
+            pipeline = {
+                "success": result.success,
+                "resource": f"{result._meta.app_label}.{result._meta.model_name}",
+                "id": result.id
+            }
+            contribution = self.extract_from_resource(extractor, method_name, result)
+            merges.append((process_result.document_id, pipeline, result, contribution,))
+
+        # We'll be locking the Documents only for the update to prevent accidental overwrite of parallel results
+        fields = ["pipeline", contribution_field] + config.apply_resource_to
+        document_ids = {document_id for document_id, pipeline, result, contribution in merges}
         attempts = 0
         while attempts < 3:
-
-            documents = []
-            for process_result in batch.processresult_set.filter(result_id__isnull=False):
-                result = process_result.result
-                # Write results to the pipeline
-                process_result.document.pipeline[pipeline_phase] = {
-                    "success": result.success,
-                    "resource": f"{result._meta.app_label}.{result._meta.model_name}",
-                    "id": result.id
-                }
-                # Possibly "apply" the Resource to the Document to allow custom updates
-                if config.apply_resource_to:
-                    process_result.document.apply_resource(process_result.result)
-
-                documents.append(process_result.document)
-                # Write data to the Document
-                contribution = self.extract_from_resource(extractor, method_name, result)
-                if contribution:
-                    field_attribute = getattr(process_result.document, contribution_field)
-                    if contribution_property is None:
-                        field_attribute.update(contribution)
-                    else:
-                        field_attribute[contribution_property] = contribution
-
-            # We'll be locking the Documents for update to prevent accidental overwrite of parallel results
             with transaction.atomic():
                 try:
-                    list(
-                        self.Document.objects
-                            .filter(id__in=[doc.id for doc in documents])
-                            .select_for_update(nowait=True)
-                    )
+                    documents = self.Document.objects.select_for_update(nowait=True).in_bulk(document_ids)
                 except transaction.DatabaseError:
                     attempts += 1
                     warning = f"Failed to acquire lock to merge pipeline batch (attempt={attempts})"
                     capture_message(warning, level="warning")
                     sleep(5)
                     continue
-                fields = ["pipeline", contribution_field] + config.apply_resource_to
-                self.Document.objects.bulk_update(documents, fields)
+                for document_id, pipeline, result, contribution in merges:
+                    document = documents.get(document_id)
+                    if document is None:
+                        continue
+                    # Write results to the pipeline
+                    document.pipeline[pipeline_phase] = pipeline
+                    # Possibly "apply" the Resource to the Document to allow custom updates
+                    if config.apply_resource_to:
+                        document.apply_resource(result)
+                    # Write data to the Document
+                    if contribution:
+                        field_attribute = getattr(document, contribution_field)
+                        if contribution_property is None:
+                            field_attribute.update(contribution)
+                        else:
+                            field_attribute[contribution_property] = contribution
+                self.Document.objects.bulk_update(list(documents.values()), fields)
                 break
 
 
@@ -142,6 +169,53 @@ class HttpPipelineProcessor(ResourcePipelineProcessor):
     def dispatch_resource(self, config, *args, **kwargs):
         return send(*args, **kwargs, config=config, method=config.method)
 
+    @staticmethod
+    def get_request_domain(config, *args, **kwargs) -> str:
+        uri_template = getattr(apps.get_model(config.resource), "URI_TEMPLATE", None)
+        if isinstance(uri_template, str) and urlparse(uri_template).netloc:
+            return urlparse(uri_template).netloc
+        for arg in args:
+            if isinstance(arg, str) and arg.startswith("http"):
+                return urlparse(arg).netloc
+        return ""
+
+    def dispatch_threaded_resource(self, config, semaphore, *args, **kwargs):
+        try:
+            with semaphore:
+                return self.dispatch_resource(config, *args, **kwargs)
+        finally:
+            # Worker threads get their own database connection, which we don't want to leave open
+            connection.close()
+
+    def dispatch_resources(self, config, requests: list[tuple[list, dict]]) -> Iterator[tuple[list, list]]:
+        # Worker threads can't read data inside an open transaction, so we only send concurrently outside of them
+        if config.concurrency <= 1 or connection.in_atomic_block:
+            yield from super().dispatch_resources(config, requests)
+            return
+        # Requests for the same domain are limited by a semaphore, while the thread pool limits all requests.
+        # To prevent threads waiting for a busy domain, we submit requests alternating between domains.
+        domain_requests = defaultdict(list)
+        for ix, (args, kwargs) in enumerate(requests):
+            domain_requests[self.get_request_domain(config, *args, **kwargs)].append(ix)
+        domain_concurrency = config.domain_concurrency or config.concurrency
+        semaphores = {domain: BoundedSemaphore(domain_concurrency) for domain in domain_requests.keys()}
+        domain_queues = [[(domain, ix) for ix in indices] for domain, indices in domain_requests.items()]
+        request_order = [
+            request
+            for requests_round in zip_longest(*domain_queues)
+            for request in requests_round if request
+        ]
+        with ThreadPoolExecutor(max_workers=config.concurrency) as executor:
+            futures = {
+                ix: executor.submit(
+                    self.dispatch_threaded_resource,
+                    config, semaphores[domain], *requests[ix][0], **requests[ix][1]
+                )
+                for domain, ix in request_order
+            }
+            for ix in range(len(requests)):
+                yield futures[ix].result()
+
     def resource_is_empty(self, resource):
         return resource.status == 204
 
@@ -1,16 +1,182 @@
+import logging
 from typing import Any, Iterator, List, Dict, Union
 from copy import deepcopy
-from collections import OrderedDict
+from collections import OrderedDict, defaultdict
+from itertools import chain
+from datetime import timedelta
+from concurrent.futures import ThreadPoolExecutor
 from requests import Session
+from requests.adapters import HTTPAdapter
 from json.decoder import JSONDecodeError
+from urlobject import URLObject
+
+from django.db import connection
+from django.utils.timezone import now
 
 from datagrowth.datatypes import CollectionBase
-from datagrowth.configuration import create_config, ConfigurationType
-from datagrowth.resources.http.iterators import send_serie_iterator
+from datagrowth.configuration import create_config, ConfigurationType, load_config
+from datagrowth.exceptions import DGResourceException
+from datagrowth.resources.base import Resource
+from datagrowth.resources.http import load_session
+from datagrowth.resources.http.iterators import send_serie_iterator, get_resource_link
 from datagrowth.processors import Processor
 from datagrowth.processors.input.iterators import content_iterator
 from datagrowth.utils import ibatch
 
+from core.models.seeding import MergeIndex
+
+
+log = logging.getLogger("datagrowth")
+
+
+def create_continuation_requests(resource: Resource, window: int) -> list[dict]:
+    """
+    Creates the requests for a window of pages that follow the given resource.
+    Resources indicate which pages come next by implementing the next_parameters_window method.
+    Resources that don't implement this method can only be continued one page at a time
+    and for those resources the (single) continuation request will be returned as normal.
+
+    :param resource: the resource to create continuation requests for
+    :param window: the maximum amount of continuation requests to create
+    :return: list of request dictionaries
+    """
+    if not hasattr(resource, "next_parameters_window"):
+        next_request = resource.create_next_request()
+        return [next_request] if next_request else []
+    if not resource.success:
+        return []
+    continuation_requests = []
+    for next_parameters in resource.next_parameters_window(window):
+        url = URLObject(resource.request.get("url"))
+        params = url.query.dict
+        params.update(next_parameters)
+        url = url.set_query_params(params)
+        request = deepcopy(resource.request)
+        request["url"] = str(url)
+        continuation_requests.append(request)
+    return continuation_requests
+
+
+def send_link(config: ConfigurationType, session: Session, method: str, request: dict,
+              *args, **kwargs) -> Resource:
+    link = get_resource_link(config, session)
+    link.request = request
+    link.interval_duration = config.interval_duration
+    try:
+        link = link.send(method, *args, **kwargs)
+        link.close()
+    except DGResourceException as exc:
+        log.log(config.resource_exception_log_level, exc)
+        link = exc.resource
+        link.close()
+        if config.resource_exception_reraise:
+            raise exc
+    return link
+
+
+def send_threaded_link(config: ConfigurationType, session: Session, method: str, request: dict,
+                       *args, **kwargs) -> Resource:
+    try:
+        return send_link(config, session, method, request, *args, **kwargs)
+    finally:
+        # Worker threads get their own database connection, which we don't want to leave open
+        connection.close()
+
+
+def send_continuation_iterator(executor: ThreadPoolExecutor, config: ConfigurationType, session: Session,
+                               method: str, link: Resource, *args, **kwargs) -> Iterator[Resource]:
+    """
+    Fetches the continuation pages that follow a given resource, a window of pages at a time in parallel.
+    Resources are always yielded in the order of their pages, regardless of the order in which requests finish.
+    The size of the window is determined by the concurrency configuration.
+
+    :param executor: the thread pool that executes the requests for continuation pages
+    :param config: the resource configuration
+    :param session: the requests session to share between threads
+    :param method: the HTTP method to use
+    :param link: the resource that continuation pages should get fetched for
+    :param args: arguments for the resource
+    :param kwargs: keyword arguments for the resource
+    :return: iterator of resources
+    """
+    limit = config.continuation_limit or 1
+    count = 1
+    while count < limit:
+        window = min(config.concurrency, limit - count)
+        futures = [
+            executor.submit(send_threaded_link, config, session, method, request, *args, **kwargs)
+            for request in create_continuation_requests(link, window)
+        ]
+        if not futures:
+            break
+        for ix, future in enumerate(futures):
+            link = future.result()
+            count += 1
+            yield link
+            # When a page turns out to be the last page any pages after it are not relevant
+            if ix < len(futures) - 1 and not link.create_next_request():
+                for redundant in futures[ix+1:]:
+                    redundant.cancel()
+                return
+
+
+@load_config()
+@load_session()
+def send_concurrent_serie_iterator(config: ConfigurationType, args_list: List[Any], kwargs_list: List[Dict],
+                                   method: str = None, session: Session = None) -> Iterator[Resource]:
+    """
+    Works like the send_serie_iterator from Datagrowth, but sends requests in parallel.
+    The first pages for a window of args and kwargs get fetched in parallel
+    and after that the continuation pages for each first page get fetched in parallel.
+    Resources are yielded in the same order as send_serie_iterator would yield them.
+    """
+    # Allows the session to keep a connection open for each thread
+    adapter = HTTPAdapter(pool_connections=config.concurrency, pool_maxsize=config.concurrency)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    with ThreadPoolExecutor(max_workers=config.concurrency) as executor:
+        requests = list(zip(args_list, kwargs_list))
+        for window in ibatch(requests, batch_size=config.concurrency):
+            futures = [
+                executor.submit(send_threaded_link, config, session, method, {}, *args, **kwargs)
+                for args, kwargs in window
+            ]
+            for future, (args, kwargs) in zip(futures, window):
+                link = future.result()
+                yield link
+                yield from send_continuation_iterator(executor, config, session, method, link, *args, **kwargs)
+
+
+def prefetch_iterator(iterator: Iterator) -> Iterator:
+    """
+    Retrieves the next item of an iterator in a background thread, while the caller processes the current item.
+    For seeding this means that the next page of a source gets fetched while documents get written to the database.
+    Exceptions raised by the iterator are raised in the calling thread, at the moment the item would get yielded.
+
+    :param iterator: the iterator to prefetch items for
+    :return: iterator with the same items
+    """
+    exhausted = object()
+
+    def fetch_next():
+        try:
+            return next(iterator)
+        except StopIteration:  # can't travel through a Future, so we signal exhaustion with a sentinel
+            return exhausted
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        try:
+            future = executor.submit(fetch_next)
+            while True:
+                item = future.result()
+                if item is exhausted:
+                    break
+                future = executor.submit(fetch_next)
+                yield item
+        finally:
+            # The single worker thread has its own database connection, which we don't want to leave open
+            executor.submit(connection.close)
+
 
 class ResourceSeedingProcessor(Processor):
 
@@ -34,9 +200,13 @@ class ResourceSeedingProcessor(Processor):
                               resource_config: ConfigurationType) -> Iterator:
         raise NotImplementedError("ResourceSeedingProcessor does not implement get_resource_iterator")
 
-    def build_seed_iterator(self, phase: Dict, *args, **kwargs) -> Iterator:
+    @property
+    def is_streaming(self) -> bool:
+        return self.config.get("streaming", False)
+
+    def build_content_iterator(self, phase: Dict, seeds: List[Dict], *args, **kwargs) -> Iterator:
         resource_config = phase["retrieve"]
-        if not len(self.batch):
+        if not len(seeds):
             # This is the initial case where there is no input from a buffer.
             # So we just use args and kwargs as given to the call to the processor.
             args_list = [args]
@@ -60,22 +230,90 @@ class ResourceSeedingProcessor(Processor):
             # for data coming from the batch if a value starts with "$".
             args_list = []
             kwargs_list = []
-            for content in self.batch:
+            for content in seeds:
                 content_args, content_kwargs = self.Document.output_from_content(content, args, kwargs)
                 args_list.append(content_args)
                 kwargs_list.append(content_kwargs)
 
         # Sending the parsed args and kwargs, possibly with batch data to the Resource
         resource_iterator = self.get_resource_iterator(args_list, kwargs_list, resource_config)
-        seed_iterator = content_iterator(resource_iterator, phase["contribute"].objective)
+        return content_iterator(resource_iterator, phase["contribute"].objective)
+
+    def build_seed_iterator(self, phase: Dict, *args, **kwargs) -> Iterator:
+        seed_iterator = self.build_content_iterator(phase, self.batch, *args, **kwargs)
         batch_size = phase["phase"].batch_size
-        return ibatch(seed_iterator, batch_size=batch_size)
+        seed_batches = ibatch(seed_iterator, batch_size=batch_size)
+        # Worker threads can't read data inside an open transaction, so we only prefetch outside of transactions
+        if self.is_streaming and phase["phase"].strategy in ["initial", "replace"] and not connection.in_atomic_block:
+            return prefetch_iterator(seed_batches)
+        return seed_batches
 
     def build_callback_iterator(self, phase: Dict, *args) -> Iterator:
         callback = phase["contribute"].callback
         for seed in self.batch:
             yield callback(seed, *args)
 
+    def build_merge_iterator(self, phase: Dict, *args, **kwargs) -> Iterator:
+        """
+        Yields the content that should get merged into the batch.
+        When the phase has a merge_index_max_age the content for seeds, that didn't change since the content was
+        retrieved, comes from the MergeIndex. Only content for other seeds gets retrieved and then stored in the index.
+        """
+        merge_index_max_age = phase["phase"].merge_index_max_age
+        if not merge_index_max_age:
+            yield from self.build_content_iterator(phase, self.batch, *args, **kwargs)
+            return
+        merge_on = phase["contribute"].merge_on
+        index = MergeIndex.get_index_key(
+            phase["retrieve"].resource,
+            phase["phase"].phase,
+            phase["contribute"].objective
+        )
+        seed_hashes = {
+            str(seed[merge_on]): MergeIndex.hash_seed(seed)
+            for seed in self.batch
+        }
+        since = now() - timedelta(**merge_index_max_age)
+        entries = MergeIndex.objects.get_fresh_entries(index, seed_hashes, since)
+        for entry in entries.values():
+            yield from entry.contents
+        changed_seeds = [seed for seed in self.batch if str(seed[merge_on]) not in entries]
+        if not changed_seeds:
+            return
+        contents = defaultdict(list)
+        for content in self.build_content_iterator(phase, changed_seeds, *args, **kwargs):
+            contents[str(content.get(merge_on))].append(content)
+            yield content
+        MergeIndex.objects.store_entries(index, seed_hashes, contents)
+
+    def merge_seed_iterator(self, phase: Dict, *args, **kwargs) -> None:
+        """
+        Merges content into the batch while it gets retrieved, instead of collecting all content in the buffer first.
+        Content for the same merge value that arrives later takes precedence, just like it does with flush_buffer.
+        """
+        merge_on = phase["contribute"].merge_on
+        batch_index = defaultdict(list)
+        for seed in self.batch:
+            batch_index[seed[merge_on]].append(seed)
+        for content in self.build_merge_iterator(phase, *args, **kwargs):
+            for seed in batch_index.get(content[merge_on], []):
+                seed.update(content)
+
+    def build_back_fill_iterator(self, phase: Dict) -> Union[Iterator, None]:
+        """
+        Lazily yields the back fill content for the batch.
+        Returns None when the callback doesn't produce any content, to signal that the batch should stay as is.
+        """
+        back_fill_iterator = (
+            content
+            for batch in self.build_callback_iterator(phase, self.collection)
+            for content in batch if content
+        )
+        first = next(back_fill_iterator, None)
+        if first is None:
+            return
+        return chain([first], back_fill_iterator)
+
     def flush_buffer(self, phase: Dict, force: bool = False) -> None:
         if not self.buffer and not force:
             raise ValueError(f"Did not expect to encounter an empty buffer with strategy for phase {phase['phase']}")
@@ -83,7 +321,8 @@ class ResourceSeedingProcessor(Processor):
         strategy = phase["phase"].strategy
 
         if strategy in ["initial", "replace", "back_fill"]:
-            self.batch = deepcopy(self.buffer)
+            # When streaming the buffer is not used again after a flush, so copying it only costs memory
+            self.batch = self.buffer if self.is_streaming else deepcopy(self.buffer)
         elif strategy == "merge":
             merge_on = phase["contribute"].merge_on
             buffer = {
@@ -96,6 +335,12 @@ class ResourceSeedingProcessor(Processor):
         self.buffer = []
 
     def batch_to_documents(self) -> Iterator:
+        if self.is_streaming:
+            documents = (
+                doc for doc in (self.Document.build(seed, collection=self.collection) for seed in self.batch)
+                if doc.identity is not None
+            )
+            return self.collection.update_batches(documents, self.collection.identifier)
         documents = []
         for seed in self.batch:
             doc = self.Document.build(seed, collection=self.collection)
@@ -161,12 +406,17 @@ class ResourceSeedingProcessor(Processor):
                         del self.contents[phase_index]
                         # And retry phases before this phase (if any)
                         break
+                elif strategy == "merge" and self.is_streaming:
+                    if not isinstance(self.batch, list):
+                        self.batch = list(self.batch)
+                    self.merge_seed_iterator(phase, *args, **kwargs)
+                    continue
+                elif strategy == "back_fill" and self.is_streaming:
+                    self.buffer = self.build_back_fill_iterator(phase)
+                    if self.buffer is None:
+                        continue
                 elif strategy == "merge":
-                    self.buffer = [
-                        content
-                        for batch in self.build_seed_iterator(phase, *args, **kwargs)
-                        for content in batch
-                    ]
+                    self.buffer = list(self.build_merge_iterator(phase, *args, **kwargs))
                 elif strategy == "back_fill":
                     self.buffer = [
                         content
@@ -197,6 +447,14 @@ class HttpSeedingProcessor(ResourceSeedingProcessor):
 
     def get_resource_iterator(self, args_list: List[Any], kwargs_list: List[Dict],
                               resource_config: ConfigurationType) -> Iterator:
+        # Worker threads can't read data inside an open transaction, so we only send concurrently outside of them
+        if resource_config.concurrency > 1 and not connection.in_atomic_block:
+            return send_concurrent_serie_iterator(
+                args_list, kwargs_list,
+                method=resource_config.method,
+                config=resource_config,
+                session=self.get_session()
+            )
         return send_serie_iterator(
             args_list, kwargs_list,
             method=resource_config.method,
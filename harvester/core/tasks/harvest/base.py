@@ -20,8 +20,9 @@ class PendingHarvestSets(PendingHarvestObjects):
     pass
 
 
-def load_pending_harvest_instances(*args, model: Type[HarvestObject] = None,
-                                   as_list: bool = False) -> list[HarvestObject] | HarvestObject:
+def load_pending_harvest_instances(*args, model: Type[HarvestObject] = None, as_list: bool = False,
+                                   projection: str = None,
+                                   for_update: bool = False) -> list[HarvestObject] | HarvestObject:
     if not args:
         raise ValueError("load_pending_harvest_instances expects at least one model id or model instance")
     # We check that we didn't get already loaded instances and return them if we do
@@ -29,10 +30,13 @@ def load_pending_harvest_instances(*args, model: Type[HarvestObject] = None,
         if len(args) == 1 and not as_list:
             return args[0] if args[0].pending_at else None
         return [instance for instance in args if instance.pending_at]
-    # When getting ids we load them from the database
+    # When getting ids we load them from the database, possibly without fields that the caller doesn't need
+    queryset = model.objects.all() if not projection else model.objects.projection(projection)
+    if for_update:
+        queryset = queryset.select_for_update()
     if len(args) == 1 and not as_list:
-        return model.objects.filter(id=args[0], pending_at__isnull=False).first()
-    return list(model.objects.filter(id__in=args, pending_at__isnull=False))
+        return queryset.filter(id=args[0], pending_at__isnull=False).first()
+    return list(queryset.filter(id__in=args, pending_at__isnull=False))
 
 
 def validate_pending_harvest_instances(instances: list[HarvestObject] | HarvestObject,
@@ -40,6 +44,7 @@ def validate_pending_harvest_instances(instances: list[HarvestObject] | HarvestO
     if instances is None:
         return []
     instances = instances if isinstance(instances, list) else [instances]
+    pending_tasks = model.get_bulk_pending_tasks(instances)
     finished = []
     pending = []
     for instance in instances:
@@ -48,12 +53,12 @@ def validate_pending_harvest_instances(instances: list[HarvestObject] | HarvestO
             raise PendingHarvestDocuments()
         elif hasattr(instance, "collections") and instance.collections.filter(pending_at__isnull=False).exists():
             raise PendingHarvestSets()
-        # Then we check if the instance is done or is pending
-        elif not instance.get_pending_tasks():
+        # Then we check if the instance is done or is pending, where instances with running tasks are neither
+        elif not pending_tasks[instance.id] and not instance.get_dispatched_tasks():
             finished.append(instance)
             instance.pending_at = None
             instance.finished_at = now()
-        else:
+        elif pending_tasks[instance.id]:
             pending.append(instance)
     model.objects.bulk_update(finished, ["pending_at", "finished_at"])
     return pending
@@ -61,9 +66,10 @@ def validate_pending_harvest_instances(instances: list[HarvestObject] | HarvestO
 
 def dispatch_harvest_object_tasks(app_label: str, *args, callback=Signature, asynchronous=True) -> Signature | None:
     pending_tasks = defaultdict(list)
-    for obj in args:
-        for pending_task in obj.get_pending_tasks():
-            pending_tasks[pending_task].append(obj.id)
+    if args:
+        for obj_id, obj_pending_tasks in type(args[0]).get_bulk_pending_tasks(args).items():
+            for pending_task in obj_pending_tasks:
+                pending_tasks[pending_task].append(obj_id)
     if not pending_tasks:
         return
     task_signatures = [signature(task_name, args=(app_label, obj_ids,)) for task_name, obj_ids in pending_tasks.items()]
@@ -27,7 +27,11 @@ def dispatch_dataset_version_tasks(app_label: str, dataset_version: int, asynchr
 
     # Dispatch pending tasks
     pending = validate_pending_harvest_instances(dataset_version, model=models["DatasetVersion"])
-    pending_tasks = [task for instance in pending for task in instance.get_pending_tasks()]
+    pending_tasks = [
+        task
+        for instance_tasks in models["DatasetVersion"].get_bulk_pending_tasks(pending).values()
+        for task in instance_tasks
+    ]
     if len(pending) and pending_tasks != previous_tasks:  # we're not repeating the same tasks indefinitely
         recursive_callback_signature = dispatch_dataset_version_tasks.si(
             app_label,
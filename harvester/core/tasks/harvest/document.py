@@ -1,34 +1,48 @@
+from django.db.transaction import atomic
 from django.utils.timezone import now
 from celery import current_app as app
 
 from harvester.tasks.base import DatabaseConnectionResetTask
 from core.loading import load_harvest_models
 from core.models.datatypes import HarvestDocument
-from core.tasks.harvest.base import (load_pending_harvest_instances, dispatch_harvest_object_tasks,
-                                     validate_pending_harvest_instances)
+from core.tasks.harvest.base import load_pending_harvest_instances, validate_pending_harvest_instances
+from core.tasks.harvest.scheduler import load_task_graph, schedule_harvest_object_tasks
 
 
 @app.task(name="harvest_documents", base=DatabaseConnectionResetTask)
 def dispatch_document_tasks(app_label: str, documents: list[int | HarvestDocument], asynchronous: bool = True,
-                            recursion_depth: int = 0) -> None:
+                            recursion_depth: int = 0, finished_task: str = None) -> None:
     if not len(documents):
         return
-    if recursion_depth >= 10:
-        raise RecursionError("Maximum harvest_documents recursion reached")
     models = load_harvest_models(app_label)
-    documents = load_pending_harvest_instances(*documents, model=models["Document"], as_list=True)
-    pending = validate_pending_harvest_instances(documents, model=models["Document"])
-    if len(pending):
-        recursive_callback_signature = dispatch_document_tasks.si(
+    # Documents get locked, because tasks that complete at the same time may dispatch the same Documents
+    with atomic():
+        documents = load_pending_harvest_instances(*documents, model=models["Document"], as_list=True,
+                                                   projection="dispatch", for_update=True)
+        if finished_task:
+            # A finished task that didn't write a result for a Document is pending again, like it was before dispatch
+            unfinished = [
+                document for document in documents
+                if finished_task in document.get_dispatched_tasks()
+            ]
+            for document in unfinished:
+                del document.pipeline[finished_task]
+            models["Document"].objects.bulk_update(unfinished, ["pipeline"])
+        pending = validate_pending_harvest_instances(documents, model=models["Document"])
+        for document in pending:
+            if recursion_depth >= load_task_graph(document.tasks).max_rounds:
+                raise RecursionError("Maximum harvest_documents recursion reached")
+        # Documents of a task get scheduled again when that task is done
+        schedule_harvest_object_tasks(
             app_label,
-            [doc.id for doc in pending],
-            asynchronous=asynchronous,
-            recursion_depth=recursion_depth+1
-        )
-        dispatch_harvest_object_tasks(
-            app_label,
-            *pending,
-            callback=recursive_callback_signature,
+            pending,
+            callback=lambda task_name, document_ids: dispatch_document_tasks.si(
+                app_label,
+                document_ids,
+                asynchronous=asynchronous,
+                recursion_depth=recursion_depth+1,
+                finished_task=task_name
+            ),
             asynchronous=asynchronous
         )
 
@@ -38,13 +52,15 @@ def cancel_document_tasks(app_label: str, documents: list[int | HarvestDocument]
     if not len(documents):
         return
     models = load_harvest_models(app_label)
-    documents = load_pending_harvest_instances(*documents, model=models["Document"], as_list=True)
+    documents = load_pending_harvest_instances(*documents, model=models["Document"], as_list=True,
+                                               projection="dispatch")
     if not documents:
         return
     documents = documents if isinstance(documents, list) else [documents]
+    pending_tasks = models["Document"].get_bulk_pending_tasks(documents)
     stopped = []
     for document in documents:
-        for task in document.get_pending_tasks():
+        for task in pending_tasks[document.id] + document.get_dispatched_tasks():
             document.pipeline[task] = {"success": False, "canceled": True}
         document.pending_at = None
         document.finished_at = now()
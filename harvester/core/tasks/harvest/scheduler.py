@@ -0,0 +1,118 @@
+import json
+from typing import Callable
+from functools import lru_cache, partial
+from collections import defaultdict
+
+from django.db import transaction
+from celery import signature
+from celery.canvas import Signature  # for type checking only
+
+from core.models.datatypes.base import HarvestObjectMixin as HarvestObject
+
+
+class TaskGraph:
+    """
+    The dependency graph between the tasks of a harvest object, as declared by depends_on in the tasks JSON.
+    Dependencies on content (starting with "$") and on tasks that are not declared are not part of the graph.
+    Building the graph fails with a ValueError when tasks depend on each other in a circular way.
+    """
+
+    def __init__(self, tasks: dict) -> None:
+        self.dependencies = {
+            task_name: [
+                dependency for dependency in conditions.get("depends_on", [])
+                if not dependency.startswith("$") and dependency in tasks
+            ]
+            for task_name, conditions in tasks.items()
+        }
+        self.dependents = defaultdict(list)
+        for task_name, dependencies in self.dependencies.items():
+            for dependency in dependencies:
+                self.dependents[dependency].append(task_name)
+        self.order = self.sort_tasks()
+
+    def sort_tasks(self) -> list[str]:
+        in_degrees = {task_name: len(dependencies) for task_name, dependencies in self.dependencies.items()}
+        ready = [task_name for task_name, in_degree in in_degrees.items() if not in_degree]
+        order = []
+        while ready:
+            task_name = ready.pop(0)
+            order.append(task_name)
+            for dependent in self.dependents[task_name]:
+                in_degrees[dependent] -= 1
+                if not in_degrees[dependent]:
+                    ready.append(dependent)
+        if len(order) != len(self.dependencies):
+            circular = sorted(set(self.dependencies.keys()) - set(order))
+            raise ValueError(f"Tasks have circular dependencies: {circular}")
+        return order
+
+    @property
+    def max_rounds(self) -> int:
+        # Every task runs at most once for an object, so each round of tasks for an object runs at least one new task.
+        # With one extra round to finish the object this is the maximum amount of rounds.
+        return len(self.order) + 1
+
+    def sort(self, task_names: list[str]) -> list[str]:
+        return [task_name for task_name in self.order if task_name in task_names]
+
+    def sort_key(self, task_name: str) -> int:
+        return self.order.index(task_name) if task_name in self.order else len(self.order)
+
+
+@lru_cache(maxsize=64)
+def _load_task_graph(tasks_json: str) -> TaskGraph:
+    return TaskGraph(json.loads(tasks_json))
+
+
+def load_task_graph(tasks: dict) -> TaskGraph:
+    """
+    Returns the TaskGraph for given tasks JSON.
+    Objects of the same type nearly always share their tasks, so graphs get built only once for each tasks JSON.
+    """
+    return _load_task_graph(json.dumps(tasks, sort_keys=True))
+
+
+def schedule_harvest_object_tasks(app_label: str, objects: list[HarvestObject],
+                                  callback: Callable[[str, list[int]], Signature],
+                                  asynchronous: bool = True) -> None:
+    """
+    Dispatches a single task signature for every pending task, which carries the ids of all objects with that task.
+    Objects mark their dispatched tasks in their pipeline, which prevents dispatching tasks that are still running.
+    When a task completes the callback schedules the objects of only that task again,
+    which releases the dependent tasks of every object as soon as its own dependencies are done,
+    while other tasks for the same or other objects may still be running.
+
+    :param app_label: the app label of the objects
+    :param objects: the objects to dispatch pending tasks for
+    :param callback: a function that returns the signature to run for the objects of a task, after that task completed
+    :param asynchronous: whether to dispatch tasks through Celery or execute them directly
+    :return: None
+    """
+    if not objects:
+        return
+    model = type(objects[0])
+    pending_tasks = model.get_bulk_pending_tasks(objects)
+    task_object_ids = defaultdict(list)
+    dispatched = []
+    for obj in objects:
+        if not pending_tasks[obj.id]:
+            continue
+        obj.mark_dispatched_tasks(pending_tasks[obj.id])
+        dispatched.append(obj)
+        for task_name in pending_tasks[obj.id]:
+            task_object_ids[task_name].append(obj.id)
+    if not dispatched:
+        return
+    model.objects.bulk_update(dispatched, ["pipeline"])
+    # Pending tasks never depend on each other, but dispatching them in graph order keeps dispatching stable
+    graph = load_task_graph(dispatched[0].tasks)
+    for task_name in sorted(task_object_ids, key=graph.sort_key):
+        object_ids = task_object_ids[task_name]
+        task_signature = signature(task_name, args=(app_label, object_ids,))
+        if asynchronous:
+            # Other workers should see the dispatched tasks before any task completes
+            transaction.on_commit(partial(task_signature.apply_async, link=callback(task_name, object_ids)))
+            continue
+        task_signature()
+        callback(task_name, object_ids)()
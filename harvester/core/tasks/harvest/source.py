@@ -54,7 +54,8 @@ def harvest_source(app_label: str, source: str, set_specification: str, asynchro
 
     # Process new seeds to documents
     seeding_processor = HttpSeedingProcessor(harvest_set, {
-        "phases": configuration["seeding_phases"]
+        "phases": configuration["seeding_phases"],
+        "streaming": True
     })
     harvest_from = f"{harvest_state.harvested_at:%Y-%m-%dT%H:%M:%SZ}"
     for documents in seeding_processor(harvest_state.set_specification, harvest_from):
@@ -0,0 +1,157 @@
+from unittest.mock import patch
+
+from django.test import TestCase
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from core.processors import HttpPipelineProcessor
+from files.models import Batch, ProcessResult, FileDocument
+from files.sources.sharekit import SEQUENCE_PROPERTIES
+from files.tests.factories.check_url import CheckURLResourceFactory
+from testing.utils.factories import create_datatype_models
+from testing.utils.generators import seed_generator
+
+
+class TestProcessBatchWriteVolume(TestCase):
+    """
+    Benchmarks the database writes of process_batch for different batch sizes.
+    The amount of write queries should remain constant and the size of the writes should grow linearly.
+    """
+
+    batch_sizes = [20, 100, 500]
+
+    def setUp(self):
+        super().setUp()
+        self.processor = HttpPipelineProcessor({
+            "pipeline_app_label": "files",
+            "pipeline_models": {
+                "document": "FileDocument",
+                "process_result": "ProcessResult",
+                "batch": "Batch"
+            },
+            "pipeline_phase": "check_url",
+            "retrieve_data": {
+                "resource": "files.checkurlresource",
+                "method": "head",
+                "args": ["$.url"],
+                "kwargs": {}
+            },
+            "contribute_data": {}
+        })
+
+    def measure_writes(self, batch_size: int) -> tuple[int, int]:
+        seeds = list(seed_generator("sharekit", batch_size, app_label="files", sequence_properties=SEQUENCE_PROPERTIES))
+        _, _, _, documents = create_datatype_models("files", [f"test-{batch_size}"], seeds, batch_size)
+        batch = Batch.objects.create(processor="HttpPipelineProcessor")
+        ProcessResult.objects.bulk_create([ProcessResult(document=document, batch=batch) for document in documents])
+        # Every document gets a successful and a failed resource, which leads to an update and a create
+        with patch.object(self.processor, "dispatch_resource", return_value=([1], [2])), \
+                CaptureQueriesContext(connection) as queries:
+            self.processor.process_batch(batch)
+        writes = [
+            query["sql"] for query in queries.captured_queries
+            if query["sql"].startswith("INSERT") or query["sql"].startswith("UPDATE")
+        ]
+        self.assertEqual(ProcessResult.objects.filter(batch=batch).count(), batch_size * 2)
+        return len(writes), sum(len(sql) for sql in writes)
+
+    def test_write_volume(self):
+        measurements = {
+            batch_size: self.measure_writes(batch_size)
+            for batch_size in self.batch_sizes
+        }
+        for batch_size, (write_count, write_volume) in measurements.items():
+            self.assertEqual(write_count, 2, f"Expected one create and one update query for batch size {batch_size}")
+        smallest, largest = min(self.batch_sizes), max(self.batch_sizes)
+        volume_per_document_smallest = measurements[smallest][1] / smallest
+        volume_per_document_largest = measurements[largest][1] / largest
+        self.assertLess(
+            volume_per_document_largest, volume_per_document_smallest * 1.5,
+            "Expected write volume per document to remain roughly the same for different batch sizes"
+        )
+
+    def test_chunked_writes(self):
+        self.processor.config.update({"process_result_batch_size": 50})
+        write_count, write_volume = self.measure_writes(100)
+        self.assertEqual(write_count, 4, "Expected two create and two update queries for chunks of 50")
+
+
+class TestMergeBatchQueries(TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.processor = HttpPipelineProcessor({
+            "pipeline_app_label": "files",
+            "pipeline_models": {
+                "document": "FileDocument",
+                "process_result": "ProcessResult",
+                "batch": "Batch"
+            },
+            "pipeline_phase": "check_url",
+            "retrieve_data": {
+                "resource": "files.checkurlresource",
+                "method": "head",
+                "args": ["$.url"],
+                "kwargs": {}
+            },
+            "contribute_data": {
+                "to_property": "derivatives/check_url",
+                "extractor": "ExtractProcessor.pass_resource_through",
+                "apply_resource_to": ["status_code", "redirects", "is_not_found", "pending_at", "finished_at"],
+            }
+        })
+
+    def count_merge_queries(self, batch_size: int) -> int:
+        seeds = list(seed_generator("sharekit", batch_size, app_label="files", sequence_properties=SEQUENCE_PROPERTIES))
+        _, _, _, documents = create_datatype_models("files", [f"test-{batch_size}"], seeds, batch_size)
+        batch = Batch.objects.create(processor="HttpPipelineProcessor")
+        ProcessResult.objects.bulk_create([
+            ProcessResult(
+                document=document,
+                batch=batch,
+                result_type=self.processor.result_type,
+                result_id=CheckURLResourceFactory.create(url=document.properties["url"]).id
+            )
+            for document in documents
+        ])
+        with CaptureQueriesContext(connection) as queries:
+            self.processor.merge_batch(batch)
+        for document in FileDocument.objects.filter(id__in=[doc.id for doc in documents]):
+            self.assertTrue(document.pipeline["check_url"]["success"])
+            self.assertEqual(document.status_code, 200)
+        return len(queries.captured_queries)
+
+    def test_merge_batch_queries(self):
+        self.assertEqual(
+            self.count_merge_queries(20), self.count_merge_queries(100),
+            "Expected the amount of queries for merge_batch to be independent of the batch size"
+        )
+
+    def test_merge_batch_parallel_results(self):
+        seeds = list(seed_generator("sharekit", 5, app_label="files", sequence_properties=SEQUENCE_PROPERTIES))
+        _, _, _, documents = create_datatype_models("files", ["test-parallel"], seeds, 5)
+        batch = Batch.objects.create(processor="HttpPipelineProcessor")
+        ProcessResult.objects.bulk_create([
+            ProcessResult(
+                document=document,
+                batch=batch,
+                result_type=self.processor.result_type,
+                result_id=CheckURLResourceFactory.create(url=document.properties["url"]).id
+            )
+            for document in documents
+        ])
+        extract_from_resource = self.processor.extract_from_resource
+
+        def extract_during_parallel_merge(*args, **kwargs):
+            # Another worker merges the results of a different phase while this batch is being extracted
+            for document in FileDocument.objects.filter(id__in=[doc.id for doc in documents]):
+                document.pipeline["tika"] = {"success": True}
+                document.save()
+            return extract_from_resource(*args, **kwargs)
+
+        with patch.object(self.processor, "extract_from_resource", side_effect=extract_during_parallel_merge):
+            self.processor.merge_batch(batch)
+        for document in FileDocument.objects.filter(id__in=[doc.id for doc in documents]):
+            self.assertTrue(document.pipeline["check_url"]["success"])
+            self.assertEqual(document.pipeline["tika"], {"success": True}, "Expected parallel results to be kept")
+            self.assertEqual(document.status_code, 200)
@@ -0,0 +1,118 @@
+from unittest.mock import patch
+
+from django.test import TestCase
+from celery.canvas import Signature
+
+from core.tasks.harvest.scheduler import TaskGraph
+from core.tasks.harvest.document import dispatch_document_tasks
+from files.models import FileDocument
+from files.models.datatypes.file import default_document_tasks
+from files.tests.factories import create_file_document_set
+
+
+class TestTaskGraph(TestCase):
+
+    def test_file_document_tasks(self):
+        graph = TaskGraph(default_document_tasks())
+        self.assertEqual(graph.dependencies["tika"], ["check_url"], "Expected content dependencies to get ignored")
+        self.assertEqual(sorted(graph.dependents["check_url"]), ["image_preview", "pdf_preview", "tika"])
+        self.assertEqual(graph.order[0], "check_url")
+        self.assertEqual(graph.max_rounds, 7)
+        self.assertEqual(graph.sort(["pdf_preview", "youtube_api", "check_url"]), [
+            "check_url", "youtube_api", "pdf_preview"
+        ])
+
+    def test_circular_dependencies(self):
+        with self.assertRaises(ValueError):
+            TaskGraph({
+                "first": {"depends_on": ["$.url", "second"], "checks": [], "resources": []},
+                "second": {"depends_on": ["first"], "checks": [], "resources": []},
+                "third": {"depends_on": [], "checks": [], "resources": []},
+            })
+
+    def test_undeclared_dependencies(self):
+        graph = TaskGraph({
+            "first": {"depends_on": ["external"], "checks": [], "resources": []},
+        })
+        self.assertEqual(graph.dependencies, {"first": []})
+        self.assertEqual(graph.order, ["first"])
+
+
+TEST_TASKS = {
+    "fast": {"depends_on": [], "checks": [], "resources": []},
+    "slow": {"depends_on": [], "checks": [], "resources": []},
+    "after_fast": {"depends_on": ["fast"], "checks": [], "resources": []},
+}
+
+
+@patch("core.tasks.harvest.scheduler.signature")
+class TestScheduleHarvestObjectTasks(TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.dataset_version, self.set, documents = create_file_document_set(
+            "test",
+            [{"url": f"https://example.com/{ix}"} for ix in range(3)]
+        )
+        self.document_ids = [document.id for document in documents]
+        FileDocument.objects.filter(id__in=self.document_ids).update(tasks=TEST_TASKS, pipeline={})
+
+    def dispatch(self, signature_mock, task=None) -> dict[str, tuple[list[int], Signature]]:
+        signature_mock.reset_mock()
+        with self.captureOnCommitCallbacks(execute=True):
+            if task is None:
+                dispatch_document_tasks("files", self.document_ids)
+            else:
+                task()
+        return {
+            args[0]: (kwargs["args"][1], apply_kwargs["link"],)
+            for (args, kwargs), (apply_args, apply_kwargs) in zip(
+                signature_mock.call_args_list,
+                signature_mock.return_value.apply_async.call_args_list
+            )
+        }
+
+    def finish_task(self, task_name: str, document_ids: list[int]) -> None:
+        for document in FileDocument.objects.filter(id__in=document_ids):
+            document.pipeline[task_name] = {"success": True}
+            document.save()
+
+    def assert_pending_documents(self, expected_count: int) -> None:
+        self.assertEqual(
+            FileDocument.objects.filter(id__in=self.document_ids, pending_at__isnull=False).count(),
+            expected_count
+        )
+
+    def test_schedule_tasks(self, signature_mock):
+        dispatches = self.dispatch(signature_mock)
+        self.assertEqual(list(dispatches.keys()), ["fast", "slow"], "Expected one signature per task in graph order")
+        for task_name, (document_ids, callback) in dispatches.items():
+            self.assertEqual(document_ids, self.document_ids, f"Expected {task_name} to carry all Documents")
+        for document in FileDocument.objects.filter(id__in=self.document_ids):
+            self.assertEqual(document.get_dispatched_tasks(), ["fast", "slow"])
+            self.assertEqual(document.get_pending_tasks(), [])
+        # Running tasks don't get dispatched again and keep Documents pending
+        self.assertEqual(self.dispatch(signature_mock), {})
+        self.assert_pending_documents(3)
+
+    def test_slow_task(self, signature_mock):
+        dispatches = self.dispatch(signature_mock)
+        fast_ids, fast_callback = dispatches["fast"]
+        slow_ids, slow_callback = dispatches["slow"]
+        # Documents continue with tasks that depend on the fast task, while the slow task is still running
+        self.finish_task("fast", fast_ids)
+        dispatches = self.dispatch(signature_mock, fast_callback)
+        self.assertEqual(list(dispatches.keys()), ["after_fast"])
+        after_fast_ids, after_fast_callback = dispatches["after_fast"]
+        self.assertEqual(after_fast_ids, self.document_ids)
+        self.assert_pending_documents(3)
+        # The slow task finishes, but without a result for the last Document, which makes it pending again
+        self.finish_task("slow", slow_ids[:2])
+        dispatches = self.dispatch(signature_mock, slow_callback)
+        self.assertEqual(list(dispatches.keys()), ["slow"])
+        self.assertEqual(dispatches["slow"][0], self.document_ids[2:])
+        self.assert_pending_documents(3)
+        # Documents finish once all their tasks are done
+        self.finish_task("after_fast", after_fast_ids)
+        self.assertEqual(self.dispatch(signature_mock, after_fast_callback), {})
+        self.assert_pending_documents(1)
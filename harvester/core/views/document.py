@@ -27,6 +27,7 @@ class DatasetVersionDocumentBaseView(generics.GenericAPIView):
 
     schema = HarvesterSchema()
     exclude_deletes_unless_modified_since_filter = False
+    document_projection = None  # name of a projection that leaves out JSON fields that serializers don't need
 
     def get_queryset(self):
         if not self.request.resolver_match:
@@ -48,6 +49,8 @@ class DatasetVersionDocumentBaseView(generics.GenericAPIView):
                 .exclude(state=HarvestDocument.States.SKIPPED)
         if modified_since_filter:
             queryset = queryset.filter(metadata__modified_at__gte=modified_since_filter)
+        if self.document_projection:
+            queryset = queryset.projection(self.document_projection)
         queryset = queryset.order_by("-id")
         return queryset
 
@@ -92,6 +95,7 @@ class SearchDocumentGenericViewMixin:
     """
 
     entity = None
+    document_projection = "index"
 
     def get_serializer_class(self):
         app_config = apps.get_app_config(self.entity.value)
@@ -115,9 +119,12 @@ class SearchDocumentListViewMixin(SearchDocumentGenericViewMixin):
     def get_serializer(self, *args, **kwargs):
         transformer = self.get_transformer_class()
         if len(args):
+            documents = list(args[0])
+            if documents:
+                type(documents[0]).prefetch_to_data(documents)
             objects = [
                 transformer(**doc.to_data()).model_dump(mode="json")
-                for doc in args[0]
+                for doc in documents
             ]
             args = (objects, *args[1:])
         return super().get_serializer(*args, **kwargs)
@@ -14,7 +14,7 @@ class FileDocumentAdmin(DocumentAdmin):
     list_display = DocumentAdmin.list_display + \
         ("product_link", "is_not_found", "is_analysis_allowed", "redirects",)
     list_filter = DocumentAdmin.list_filter + ("type", "mime_type", "is_not_found", "is_analysis_allowed", "redirects",)
-    readonly_fields = DocumentAdmin.readonly_fields + ("is_analysis_allowed",)
+    readonly_fields = DocumentAdmin.readonly_fields + ("is_analysis_allowed", "text",)
 
     def product_link(self, obj):
         product_id = obj.properties.get("product_id", None)
@@ -24,6 +24,12 @@ class FileDocumentAdmin(DocumentAdmin):
         product_list_url += f"?q={product_id}&dataset_version__is_current__exact=1"
         return format_html('<a style="text-decoration: underline" href="{}">product</a>', product_list_url)
 
+    def text(self, obj):
+        # Tika texts are stored outside of the derivatives
+        if "tika" not in obj.derivatives:
+            return "(not set)"
+        return obj.get_text() or "(empty)"
+
 
 admin.site.register(Dataset, DatasetAdmin)
 admin.site.register(DatasetVersion, DatasetVersionAdmin)
@@ -0,0 +1,2 @@
+from files.benchmarks.stand_in import StandInServer, build_corpus, load_corpus
+from files.benchmarks.pipeline import run_files_benchmark, BENCHMARK_TASKS
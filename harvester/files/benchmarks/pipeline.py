@@ -0,0 +1,111 @@
+import tracemalloc
+from uuid import uuid4
+from time import perf_counter
+from hashlib import sha1
+from itertools import cycle, islice
+
+from django.apps import apps
+from django.test.utils import override_settings
+
+from datagrowth.configuration import DEFAULT_CONFIGURATION, register_defaults
+
+from files.models import Dataset, DatasetVersion, Set, FileDocument
+from files.tasks import tika_task, pdf_preview, image_preview
+from files.benchmarks.stand_in import StandInServer
+
+
+BENCHMARK_TASKS = {
+    "tika": (tika_task, [".pdf", ".png"]),
+    "pdf_preview": (pdf_preview, [".pdf"]),
+    "image_preview": (image_preview, [".png", ".jpg", ".jpeg", ".gif"]),
+}
+
+
+def create_benchmark_documents(collection: Set, stand_in: StandInServer, extensions: list[str],
+                               size: int) -> list[FileDocument]:
+    file_names = [file_name for file_name in stand_in.corpus.keys() if file_name.lower().endswith(tuple(extensions))]
+    if not file_names:
+        raise ValueError(f"Benchmark corpus has no files with extensions: {extensions}")
+    documents = []
+    for file_name in islice(cycle(file_names), size):
+        # Every Document gets a unique URL to prevent cached Resources from influencing measurements
+        url = f"{stand_in.get_file_url(file_name)}?benchmark={uuid4().hex}"
+        documents.append(collection.build_document({
+            "state": "active",
+            "set": collection.name,
+            "external_id": sha1(url.encode("utf-8")).hexdigest(),
+            "url": url,
+            "hash": sha1(url.encode("utf-8")).hexdigest(),
+            "title": file_name,
+            "copyright": "cc-by-40",
+            "access_rights": "OpenAccess",
+        }))
+    return FileDocument.objects.bulk_create(documents)
+
+
+def delete_benchmark_data(dataset: Dataset, phases: list[str]) -> None:
+    for doc in FileDocument.objects.filter(dataset_version__dataset=dataset):
+        for phase in phases:
+            if not (result := doc.pipeline.get(phase)):
+                continue
+            apps.get_model(result["resource"]).objects.filter(id=result["id"]).delete()
+    dataset.delete()
+
+
+def measure_task(task_name: str, collection: Set, stand_in: StandInServer, batch_size: int,
+                 concurrency: int) -> dict:
+    task, extensions = BENCHMARK_TASKS[task_name]
+    documents = create_benchmark_documents(collection, stand_in, extensions, batch_size)
+    document_ids = [doc.id for doc in documents]
+    tracemalloc.start()
+    start = perf_counter()
+    task("files", document_ids)
+    duration = perf_counter() - start
+    current_memory, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    successes = sum(
+        1 for doc in FileDocument.objects.filter(id__in=document_ids)
+        if doc.pipeline.get(task_name, {}).get("success")
+    )
+    return {
+        "task": task_name,
+        "batch_size": batch_size,
+        "concurrency": concurrency,
+        "successes": successes,
+        "duration": duration,
+        "documents_per_second": batch_size / duration if duration else 0.0,
+        "peak_memory": peak_memory,
+    }
+
+
+def run_files_benchmark(stand_in: StandInServer, task_names: list[str], batch_sizes: list[int],
+                        concurrencies: list[int]) -> list[dict]:
+    """
+    Runs the given file tasks against the stand in server for every combination of batch size and concurrency.
+    Documents for the benchmark get created in a separate Dataset, which gets deleted together with its Resources.
+
+    :param stand_in: a running StandInServer that serves the files and emulates Tika
+    :param task_names: the tasks to measure, which should be keys in BENCHMARK_TASKS
+    :param batch_sizes: the amounts of Documents to process with a single task call
+    :param concurrencies: the amounts of concurrent requests that tasks are allowed to make
+    :return: a list of measurements with documents per second and peak (Python) memory in bytes
+    """
+    default_concurrency = DEFAULT_CONFIGURATION["http_resource_concurrency"]
+    default_cache_only = DEFAULT_CONFIGURATION["global_cache_only"]
+    dataset = Dataset.objects.create(name=f"benchmark-{uuid4().hex[:8]}")
+    dataset_version = DatasetVersion.objects.create(dataset=dataset)
+    collection = Set.objects.create(name=dataset.name, dataset_version=dataset_version)
+    measurements = []
+    try:
+        register_defaults("global", {"cache_only": False})
+        with override_settings(TIKA_HOST=stand_in.url):
+            for task_name in task_names:
+                for concurrency in concurrencies:
+                    register_defaults("http_resource", {"concurrency": concurrency})
+                    for batch_size in batch_sizes:
+                        measurements.append(measure_task(task_name, collection, stand_in, batch_size, concurrency))
+    finally:
+        register_defaults("http_resource", {"concurrency": default_concurrency})
+        register_defaults("global", {"cache_only": default_cache_only})
+        delete_benchmark_data(dataset, task_names)
+    return measurements
@@ -0,0 +1,157 @@
+import os
+import json
+from io import BytesIO
+from time import sleep
+from threading import Thread
+from mimetypes import guess_type
+from urllib.parse import urlparse, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from PIL import Image
+
+
+def build_pdf(text: str) -> bytes:
+    """
+    Builds a minimal single page PDF with given text, which is enough for pdf2image to render a preview.
+    """
+    stream = f"BT /F1 24 Tf 72 720 Td ({text}) Tj ET".encode("latin-1")
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents 4 0 R "
+        b"/Resources << /Font << /F1 5 0 R >> >> >>",
+        b"<< /Length " + str(len(stream)).encode() + b" >>\nstream\n" + stream + b"\nendstream",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    pdf = BytesIO()
+    pdf.write(b"%PDF-1.4\n")
+    offsets = []
+    for ix, obj in enumerate(objects, start=1):
+        offsets.append(pdf.tell())
+        pdf.write(f"{ix} 0 obj\n".encode() + obj + b"\nendobj\n")
+    xref_offset = pdf.tell()
+    pdf.write(f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode())
+    for offset in offsets:
+        pdf.write(f"{offset:010d} 00000 n \n".encode())
+    pdf.write(f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n".encode())
+    return pdf.getvalue()
+
+
+def build_image(size: tuple[int, int], color: tuple[int, int, int]) -> bytes:
+    image = Image.new("RGB", size, color)
+    output = BytesIO()
+    image.save(output, format="PNG")
+    return output.getvalue()
+
+
+def build_corpus(size: int = 10) -> dict[str, bytes]:
+    """
+    Generates a corpus with an equal amount of PDF and PNG files.
+    Images get larger with each file to have some variation in the work that previews need to do.
+    """
+    corpus = {}
+    for ix in range(size):
+        if ix % 2:
+            dimension = 400 + ix * 100
+            corpus[f"image-{ix}.png"] = build_image((dimension, dimension), (ix * 20 % 256, 100, 150))
+        else:
+            corpus[f"document-{ix}.pdf"] = build_pdf(f"Benchmark document {ix}")
+    return corpus
+
+
+def load_corpus(directory: str) -> dict[str, bytes]:
+    corpus = {}
+    for file_name in sorted(os.listdir(directory)):
+        file_path = os.path.join(directory, file_name)
+        if not os.path.isfile(file_path):
+            continue
+        with open(file_path, "rb") as file:
+            corpus[file_name] = file.read()
+    return corpus
+
+
+class StandInRequestHandler(BaseHTTPRequestHandler):
+
+    server: "StandInServer"
+
+    def log_message(self, format, *args):
+        pass  # keeps benchmark output readable
+
+    def send_body(self, status: int, content_type: str, body: bytes) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        path = urlparse(self.path).path
+        file_name = os.path.basename(path)
+        if not path.startswith("/files/") or file_name not in self.server.corpus:
+            self.send_body(404, "text/plain", b"Not found")
+            return
+        sleep(self.server.file_latency)
+        content_type, encoding = guess_type(file_name)
+        self.send_body(200, content_type or "application/octet-stream", self.server.corpus[file_name])
+
+    def do_HEAD(self):
+        self.do_GET()
+
+    def do_PUT(self):
+        url = urlparse(self.path)
+        return_type = os.path.basename(url.path)
+        if not url.path.startswith("/rmeta/") or return_type not in ["xml", "text"]:
+            self.send_body(404, "text/plain", b"Not found")
+            return
+        # Tika fetches the file itself, which we skip here, but we do emulate the time that fetching and parsing takes
+        sleep(self.server.tika_latency)
+        fetch_key = parse_qs(url.query).get("fetchKey", [""])[0]
+        file_name = os.path.basename(urlparse(fetch_key).path)
+        content_type, encoding = guess_type(file_name)
+        text = " ".join([f"Benchmark content for {file_name}."] * self.server.tika_text_repeat)
+        if return_type == "xml":
+            content = f'<html xmlns="http://www.w3.org/1999/xhtml"><body><p>{text}</p></body></html>'
+        else:
+            content = text
+        body = json.dumps([{
+            "Content-Type": content_type or "application/octet-stream",
+            "X-TIKA:Parsed-By": ["org.apache.tika.parser.DefaultParser"],
+            "X-TIKA:content": content
+        }])
+        self.send_body(200, "application/json", body.encode("utf-8"))
+
+
+class StandInServer(ThreadingHTTPServer):
+    """
+    A local HTTP server that serves a corpus of files under /files/
+    and emulates the Tika /rmeta/xml and /rmeta/text endpoints with configurable latency.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, corpus: dict[str, bytes], tika_latency: float = 0.0, file_latency: float = 0.0,
+                 tika_text_repeat: int = 100):
+        super().__init__(("127.0.0.1", 0), StandInRequestHandler)
+        self.corpus = corpus
+        self.tika_latency = tika_latency
+        self.file_latency = file_latency
+        self.tika_text_repeat = tika_text_repeat
+        self.thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def get_file_url(self, file_name: str) -> str:
+        return f"{self.url}/files/{file_name}"
+
+    def __enter__(self):
+        self.thread = Thread(target=self.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self.shutdown()
+        self.thread.join()
+        super().__exit__(*args)
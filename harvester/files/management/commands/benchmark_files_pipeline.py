@@ -0,0 +1,49 @@
+import logging
+
+from django.core.management.base import BaseCommand, CommandError
+
+from files.benchmarks import StandInServer, build_corpus, load_corpus, run_files_benchmark, BENCHMARK_TASKS
+
+
+logger = logging.getLogger("harvester")
+
+
+class Command(BaseCommand):
+    """
+    Measures throughput and peak memory of file tasks against a local stand in for Tika and file hosts.
+    PDF previews need poppler to be installed, just like in production.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument('-t', '--tasks', type=str, nargs="+", default=list(BENCHMARK_TASKS.keys()))
+        parser.add_argument('-b', '--batch-sizes', type=int, nargs="+", default=[10, 50, 100])
+        parser.add_argument('-c', '--concurrencies', type=int, nargs="+", default=[1])
+        parser.add_argument('-l', '--tika-latency', type=float, default=0.1)
+        parser.add_argument('-fl', '--file-latency', type=float, default=0.0)
+        parser.add_argument('-d', '--corpus-directory', type=str, default="")
+
+    def handle(self, *args, **options):
+        unknown_tasks = set(options["tasks"]) - set(BENCHMARK_TASKS.keys())
+        if unknown_tasks:
+            raise CommandError(f"Can't benchmark unknown tasks: {unknown_tasks}")
+        corpus = load_corpus(options["corpus_directory"]) if options["corpus_directory"] else build_corpus()
+
+        logger.info(f"Benchmarking {options['tasks']} with {len(corpus)} corpus files")
+        with StandInServer(corpus, tika_latency=options["tika_latency"],
+                           file_latency=options["file_latency"]) as stand_in:
+            measurements = run_files_benchmark(
+                stand_in, options["tasks"], options["batch_sizes"], options["concurrencies"]
+            )
+
+        self.stdout.write(
+            f"{'task':<15}{'batch_size':>12}{'concurrency':>13}{'successes':>11}{'docs/sec':>11}{'peak_memory_mb':>16}"
+        )
+        for measurement in measurements:
+            self.stdout.write(
+                f"{measurement['task']:<15}"
+                f"{measurement['batch_size']:>12}"
+                f"{measurement['concurrency']:>13}"
+                f"{measurement['successes']:>11}"
+                f"{measurement['documents_per_second']:>11.2f}"
+                f"{measurement['peak_memory'] / 1024 / 1024:>16.2f}"
+            )
@@ -0,0 +1,34 @@
+import logging
+
+from django.core.management.base import BaseCommand
+from django.db.transaction import atomic
+
+from datagrowth.utils.iterators import ibatch
+
+from files.models import FileDocument, FileText
+
+
+logger = logging.getLogger("harvester")
+
+
+class Command(BaseCommand):
+    """
+    Moves Tika texts that are still stored in the derivatives of FileDocuments into FileText rows.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument('-b', '--batch-size', type=int, default=100)
+
+    def handle(self, *args, **options):
+        document_ids = list(
+            FileDocument.objects.filter(derivatives__tika__has_key="texts").values_list("id", flat=True)
+        )
+        stored_count = 0
+        for batch_ids in ibatch(document_ids, options["batch_size"]):
+            with atomic():
+                documents = FileText.objects.store_texts(
+                    FileDocument.objects.filter(id__in=batch_ids).select_for_update()
+                )
+                FileDocument.objects.bulk_update(documents, ["derivatives"])
+            stored_count += len(documents)
+        logger.info(f"Stored {stored_count} file texts")
@@ -0,0 +1,27 @@
+# Generated by Django 4.2.13 on 2026-10-18 11:02
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('files', '0009_improve_document_indices'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TikaExtraction',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hash', models.CharField(max_length=255)),
+                ('tika_return_type', models.CharField(max_length=50)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('resource', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='files.httptikaresource')),
+            ],
+            options={
+                'unique_together': {('hash', 'tika_return_type')},
+            },
+        ),
+    ]
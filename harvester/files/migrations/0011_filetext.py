@@ -0,0 +1,22 @@
+# Generated by Django 4.2.13 on 2026-10-18 15:40
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('files', '0010_tikaextraction'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FileText',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('text', models.TextField(blank=True)),
+                ('document', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='file_text', to='files.filedocument')),
+            ],
+        ),
+    ]
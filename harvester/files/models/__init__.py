@@ -2,9 +2,9 @@ from files.models.harvest import HarvestState
 from files.models.pipeline import Batch, ProcessResult
 
 from files.models.datatypes.containers import Dataset, DatasetVersion, Set
-from files.models.datatypes.file import FileDocument, Overwrite
+from files.models.datatypes.file import FileDocument, FileText, Overwrite
 
-from files.models.resources.metadata import HttpTikaResource, CheckURLResource
+from files.models.resources.metadata import HttpTikaResource, CheckURLResource, TikaExtraction
 from files.models.resources.pdf_thumbnail import PdfThumbnailResource
 from files.models.resources.youtube_thumbnail import YoutubeThumbnailResource
 from files.models.resources.youtube_api import YoutubeAPIResource
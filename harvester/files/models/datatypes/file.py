@@ -1,4 +1,7 @@
+from __future__ import annotations
+
 import re
+from typing import Iterable
 from urllib3.util import parse_url
 from urllib3.exceptions import LocationParseError
 from mimetypes import guess_type
@@ -73,6 +76,21 @@ WHITELISTED_OUTPUT_FIELDS = {
 }
 
 
+def truncate_text(text: str, max_length: int, max_words: int) -> str:
+    """
+    Truncates texts that reach the maximum length to the maximum amount of words.
+    Words get counted by scanning for spaces, which doesn't copy every word of a huge text into a list.
+    """
+    if not text or len(text) < max_length:
+        return text
+    position = -1
+    for _ in range(max_words):
+        position = text.find(" ", position + 1)
+        if position < 0:
+            return text
+    return text[:position]
+
+
 class Redirects(models.TextChoices):
     EXCLUSIVE_PERMANENT = "exclusive_permanent", "Exclusively permanent redirects"
     TEMPORARY = "temporary", "At least one temporary redirect"
@@ -92,6 +110,36 @@ class FileDocument(HarvestDocument):
     is_analysis_allowed = models.BooleanField(null=True, blank=True, db_index=True)
 
     property_defaults = SEED_DEFAULTS
+    text_cache = None  # holds the last Tika derivative and the text that belongs to it
+
+    @classmethod
+    def prefetch_texts(cls, instances: Iterable[FileDocument]) -> None:
+        """
+        Loads the texts that are stored outside of the derivatives for many FileDocuments with a single query.
+        """
+        instances = [instance for instance in instances if "tika" in instance.derivatives and instance.id]
+        if not instances:
+            return
+        texts = dict(
+            FileText.objects.filter(document__in=instances).values_list("document_id", "text")
+        )
+        for instance in instances:
+            instance.text_cache = (instance.derivatives["tika"], texts.get(instance.id),)
+
+    @classmethod
+    def prefetch_to_data(cls, instances: list[FileDocument]) -> None:
+        cls.prefetch_texts(instances)
+
+    @classmethod
+    def copy_related(cls, document_ids: dict[int, int]) -> None:
+        # Copies keep their Tika derivatives and pipeline, so they need the texts of their sources
+        file_texts = [
+            FileText(document_id=document_ids[document_id], text=text)
+            for document_id, text in FileText.objects.filter(document_id__in=document_ids.keys())
+            .values_list("document_id", "text")
+            .iterator()
+        ]
+        FileText.objects.bulk_create(file_texts)
 
     def apply_resource(self, resource: Resource):
         if isinstance(resource, CheckURLResource):
@@ -172,6 +220,19 @@ class FileDocument(HarvestDocument):
         self.properties["type"] = self.type
         self.is_analysis_allowed = self.get_analysis_allowed()
 
+    def get_text(self) -> str | None:
+        # Texts are stored outside the derivatives and get loaded once for the same Tika output.
+        # Derivatives that still hold Tika texts get their text extracted on the fly.
+        tika = self.derivatives["tika"]
+        if self.text_cache is not None and self.text_cache[0] is tika:
+            return self.text_cache[1]
+        if tika.get("texts"):
+            text = FileText.objects.extract_text(tika["texts"])
+        else:
+            text = FileText.objects.filter(document=self).values_list("text", flat=True).first()
+        self.text_cache = (tika, text,)
+        return text
+
     def to_data(self, merge_derivatives: bool = True, use_multilingual_fields: bool = False) -> dict:
         raw_data = super().to_data(merge_derivatives=False, use_multilingual_fields=use_multilingual_fields)
         data = {
@@ -179,10 +240,7 @@ class FileDocument(HarvestDocument):
             for key, value in raw_data.items() if key in WHITELISTED_OUTPUT_FIELDS
         }
         if "tika" in self.derivatives:
-            text = strip_tags(self.derivatives["tika"]["texts"][0])
-            if text and len(text) >= 1000000:
-                text = " ".join(text.split(" ")[:10000])
-            data["text"] = text
+            data["text"] = self.get_text()
         if "youtube_api" in self.derivatives:
             youtube_data = deepcopy(self.derivatives["youtube_api"])
             data["video"] = youtube_data
@@ -195,6 +253,46 @@ class FileDocument(HarvestDocument):
         return data
 
 
+class FileTextManager(models.Manager):
+
+    @staticmethod
+    def extract_text(texts: list[str]) -> str:
+        text = strip_tags(texts[0]) if texts else ""
+        return truncate_text(text, settings.FILE_TEXT_TRUNCATE_LENGTH, settings.FILE_TEXT_TRUNCATE_WORDS)
+
+    def store_texts(self, documents: Iterable[FileDocument]) -> list[FileDocument]:
+        """
+        Moves texts from Tika derivatives into FileText rows, where they only get loaded when to_data needs them.
+        Returns the FileDocuments that had their derivatives changed and should get saved.
+        """
+        file_texts = []
+        changed_documents = []
+        for document in documents:
+            tika = document.derivatives.get("tika")
+            if not tika or "texts" not in tika:
+                continue
+            text = self.extract_text(tika["texts"])
+            file_texts.append(self.model(document=document, text=text))
+            document.derivatives["tika"] = {"text_length": len(text)}
+            document.text_cache = (document.derivatives["tika"], text,)
+            changed_documents.append(document)
+        self.bulk_create(file_texts, update_conflicts=True, unique_fields=["document"], update_fields=["text"])
+        return changed_documents
+
+
+class FileText(models.Model):
+    """
+    Holds the text that Tika extracted from a file.
+    These texts can be huge and are kept out of the derivatives of FileDocument,
+    so that loading Documents doesn't deserialize texts that aren't used.
+    """
+
+    document = models.OneToOneField(FileDocument, on_delete=models.CASCADE, related_name="file_text")
+    text = models.TextField(blank=True)
+
+    objects = FileTextManager()
+
+
 class Overwrite(HarvestOverwrite):
 
     class Meta:
@@ -4,6 +4,7 @@ from urllib3.exceptions import LocationParseError
 from requests.exceptions import InvalidURL
 
 from django.conf import settings
+from django.db import models
 
 from datagrowth.resources import HttpResource, URLResource
 
@@ -55,6 +56,35 @@ class HttpTikaResource(HttpResource):
             self.status = 1
 
 
+class TikaExtractionManager(models.Manager):
+
+    def get_resource_ids(self, hashes: set[str], tika_return_type: str) -> dict[str, int]:
+        extractions = self.filter(hash__in=hashes, tika_return_type=tika_return_type)
+        return {
+            extraction.hash: extraction.resource_id
+            for extraction in extractions
+        }
+
+
+class TikaExtraction(models.Model):
+    """
+    A content addressed cache for Tika extractions, using the hash of a FileDocument and the Tika return type as key.
+    Files that are shared between Sets or DatasetVersions only need to get extracted once this way.
+    Entries get deleted together with their HttpTikaResource, which happens when clean_data purges the resource.
+    """
+
+    hash = models.CharField(max_length=255)
+    tika_return_type = models.CharField(max_length=50)
+    resource = models.ForeignKey(HttpTikaResource, on_delete=models.CASCADE)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = TikaExtractionManager()
+
+    class Meta:
+        unique_together = ("hash", "tika_return_type",)
+
+
 class CheckURLResource(URLResource):
 
     def _update_from_results(self, response):
@@ -12,4 +12,5 @@ class HanzeFileExtractor(PureFileExtraction):
 OBJECTIVE = build_objective(HanzeFileExtractor, "hanze:hanze")
 
 
-SEEDING_PHASES = build_seeding_phases(HanzeResearchObjectResource, OBJECTIVE)
+# Hanze pages are offsets of a known total, which allows fetching a few pages in parallel
+SEEDING_PHASES = build_seeding_phases(HanzeResearchObjectResource, OBJECTIVE, concurrency=3)
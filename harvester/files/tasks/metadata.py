@@ -1,11 +1,13 @@
 import re
 
 from django.conf import settings
+from django.db.transaction import atomic
 from celery import current_app as app
 
 from harvester.tasks.base import DatabaseConnectionResetTask
 from core.processors import HttpPipelineProcessor
 from core.loading import load_harvest_models
+from files.models import TikaExtraction, FileText
 
 
 @app.task(name="check_url", base=DatabaseConnectionResetTask)
@@ -51,6 +53,8 @@ def check_url_task(app_label: str, document_ids: list[int]) -> None:
             "method": "head",
             "args": ["$.url"],
             "kwargs": {},
+            "concurrency": 10,
+            "domain_concurrency": 2,
         },
         "contribute_data": {
             "to_property": "derivatives/check_url",
@@ -61,6 +65,44 @@ def check_url_task(app_label: str, document_ids: list[int]) -> None:
     check_url_processor(Document.objects.filter(id__in=check_document_ids))
 
 
+def extract_with_tika_cache(processor: HttpPipelineProcessor, queryset, tika_return_type: str) -> None:
+    """
+    Runs a Tika processor for Documents, but reuses earlier extractions of files with the same hash.
+    Cached extractions get merged into Documents like regular results, so only unknown files get sent to Tika.
+    """
+    pipeline_phase = processor.config.pipeline_phase
+    documents = list(processor.filter_documents(queryset).exclude(processresult__result_type=processor.result_type))
+    extractions = TikaExtraction.objects.get_resource_ids(
+        {doc.properties["hash"] for doc in documents if doc.properties.get("hash")},
+        tika_return_type
+    )
+    cached_documents = [doc for doc in documents if doc.properties.get("hash") in extractions]
+    if cached_documents:
+        batch = processor.Batch.objects.create(processor=processor.__class__.__name__)
+        processor.ProcessResult.objects.bulk_create([
+            processor.ProcessResult(
+                document=doc, batch=batch,
+                result_type=processor.result_type, result_id=extractions[doc.properties["hash"]]
+            )
+            for doc in cached_documents
+        ])
+        processor.merge_batch(batch)
+        processor.full_merge(queryset.filter(id__in=[doc.id for doc in cached_documents]))
+    # Extract the remaining Documents and remember successful extractions for other Documents with the same file
+    extract_ids = [doc.id for doc in documents if doc.properties.get("hash") not in extractions]
+    if not extract_ids:
+        return
+    processor(queryset.filter(id__in=extract_ids))
+    TikaExtraction.objects.bulk_create([
+        TikaExtraction(
+            hash=doc.properties["hash"], tika_return_type=tika_return_type,
+            resource_id=doc.pipeline[pipeline_phase]["id"]
+        )
+        for doc in queryset.filter(id__in=extract_ids)
+        if doc.properties.get("hash") and doc.pipeline.get(pipeline_phase, {}).get("success")
+    ], ignore_conflicts=True)
+
+
 def tika_content_extraction(results):
     return [
         result.get("X-TIKA:content", "").strip()
@@ -98,7 +140,11 @@ def tika_task(app_label: str, document_ids: list[int]) -> None:
             }
         }
     })
-    tika_processor(Document.objects.filter(id__in=document_ids))
+    extract_with_tika_cache(tika_processor, Document.objects.filter(id__in=document_ids), "xml")
+    # Texts get moved out of the derivatives, which keeps loading Documents cheap
+    with atomic():
+        documents = FileText.objects.store_texts(Document.objects.filter(id__in=document_ids).select_for_update())
+        Document.objects.bulk_update(documents, ["derivatives"])
 
 
 @app.task(name="tika_plain", base=DatabaseConnectionResetTask)
@@ -131,7 +177,7 @@ def tika_plain_task(app_label: str, document_ids: list[int]) -> None:
             }
         }
     })
-    tika_plain_processor(Document.objects.filter(id__in=document_ids))
+    extract_with_tika_cache(tika_plain_processor, Document.objects.filter(id__in=document_ids), "text")
 
 
 def get_embed_url(node):
@@ -179,6 +225,7 @@ def youtube_api_task(app_label, document_ids: list[int]) -> None:
             "method": "get",
             "args": ["$.url", "videos"],
             "kwargs": {},
+            "concurrency": 5,
         },
         "contribute_data": {
             "to_property": "derivatives/youtube_api",
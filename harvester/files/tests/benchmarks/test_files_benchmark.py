@@ -0,0 +1,43 @@
+import requests
+
+from django.test import TestCase
+
+from files.models import Dataset, FileDocument, HttpTikaResource
+from files.benchmarks import StandInServer, build_corpus, run_files_benchmark
+
+
+class TestStandInServer(TestCase):
+
+    def test_files_and_tika(self):
+        with StandInServer(build_corpus(2)) as stand_in:
+            response = requests.get(stand_in.get_file_url("document-0.pdf"))
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.headers["Content-Type"], "application/pdf")
+            self.assertTrue(response.content.startswith(b"%PDF"))
+            response = requests.get(stand_in.get_file_url("does-not-exist.pdf"))
+            self.assertEqual(response.status_code, 404)
+            response = requests.put(f"{stand_in.url}/rmeta/text", params={
+                "fetchKey": stand_in.get_file_url("image-1.png"),
+                "fetcherName": "http"
+            })
+            self.assertEqual(response.status_code, 200)
+            tika_output = response.json()
+            self.assertEqual(tika_output[0]["Content-Type"], "image/png")
+            self.assertTrue(tika_output[0]["X-TIKA:content"].startswith("Benchmark content for image-1.png."))
+
+
+class TestFilesBenchmark(TestCase):
+
+    def test_tika_benchmark(self):
+        with StandInServer(build_corpus(2)) as stand_in:
+            measurements = run_files_benchmark(stand_in, ["tika"], batch_sizes=[1, 3], concurrencies=[1])
+        self.assertEqual(len(measurements), 2)
+        for measurement, batch_size in zip(measurements, [1, 3]):
+            self.assertEqual(measurement["task"], "tika")
+            self.assertEqual(measurement["batch_size"], batch_size)
+            self.assertEqual(measurement["successes"], batch_size)
+            self.assertGreater(measurement["documents_per_second"], 0)
+            self.assertGreater(measurement["peak_memory"], 0)
+        self.assertFalse(Dataset.objects.exists(), "Expected benchmark data to get deleted")
+        self.assertFalse(FileDocument.objects.exists(), "Expected benchmark data to get deleted")
+        self.assertFalse(HttpTikaResource.objects.exists(), "Expected benchmark Resources to get deleted")
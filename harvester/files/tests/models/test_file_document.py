@@ -1,8 +1,9 @@
 from copy import deepcopy
 
-from django.test import TestCase
+from django.test import TestCase, override_settings
 
-from files.models import Set, FileDocument, CheckURLResource, HttpTikaResource
+from files.models import Set, FileDocument, FileText, CheckURLResource, HttpTikaResource
+from files.models.datatypes.file import truncate_text
 
 
 class FileDocumentTestCase(TestCase):
@@ -63,3 +64,42 @@ class FileDocumentTestCase(TestCase):
             )
             doc.clean()
             self.assertTrue(doc.is_not_found, f"Expected invalid URL to be marked as 'not found': {invalid_url}")
+
+    @override_settings(FILE_TEXT_TRUNCATE_LENGTH=20, FILE_TEXT_TRUNCATE_WORDS=3)
+    def test_store_texts(self):
+        file_document = FileDocument.objects.get(pk=1)
+        file_document.derivatives["tika"] = {"texts": ["<p>This text is long enough to get truncated</p>"]}
+        documents = FileText.objects.store_texts([file_document])
+        self.assertEqual(documents, [file_document])
+        self.assertEqual(file_document.derivatives["tika"], {"text_length": 12})
+        self.assertEqual(FileText.objects.get(document=file_document).text, "This text is")
+        # Texts load lazily and with a single query for many Documents
+        file_document.save()
+        file_document = FileDocument.objects.get(pk=1)
+        with self.assertNumQueries(1):
+            self.assertEqual(file_document.to_data()["text"], "This text is")
+            self.assertEqual(file_document.to_data()["text"], "This text is")
+        file_documents = list(FileDocument.objects.filter(pk=1))
+        with self.assertNumQueries(1):
+            FileDocument.prefetch_texts(file_documents)
+            self.assertEqual(file_documents[0].to_data()["text"], "This text is")
+
+    def test_copy_documents_texts(self):
+        file_document = FileDocument.objects.get(pk=1)
+        file_document.derivatives["tika"] = {"texts": ["<p>Text of the source document</p>"]}
+        FileText.objects.store_texts([file_document])
+        file_document.save()
+        source_set = file_document.collection
+        copy_set = Set.objects.create(name=source_set.name, dataset_version=source_set.dataset_version)
+        copy_set.copy_documents(source_set)
+        copy = FileDocument.objects.get(collection=copy_set, identity=file_document.identity)
+        self.assertNotEqual(copy.id, file_document.id)
+        self.assertEqual(copy.derivatives["tika"], {"text_length": 27})
+        self.assertEqual(copy.to_data()["text"], "Text of the source document")
+        self.assertEqual(FileText.objects.get(document=file_document).text, "Text of the source document")
+
+    def test_truncate_text(self):
+        self.assertEqual(truncate_text("one two three", 20, 2), "one two three")
+        self.assertEqual(truncate_text("one two three", 10, 2), "one two")
+        self.assertEqual(truncate_text("one two three", 10, 5), "one two three")
+        self.assertEqual(truncate_text("", 0, 5), "")
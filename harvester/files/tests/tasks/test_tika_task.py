@@ -0,0 +1,63 @@
+from django.test import TestCase
+from unittest.mock import patch
+
+from datagrowth.configuration import register_defaults
+
+from files.models import FileDocument, FileText, TikaExtraction
+from files.tasks.metadata import tika_task
+from files.tests.factories import create_file_document_set
+
+
+class TestTikaTaskCache(TestCase):
+
+    dataset_version = None
+    set = None
+    documents = []
+    document = None
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        register_defaults("global", {
+            "cache_only": True
+        })
+        cls.dataset_version, cls.set, cls.documents = create_file_document_set(
+            set_specification="test",
+            docs=[{"url": "https://example.com/1"},
+                  {"url": "https://mirror.example.com/1"}],
+            tikas=[{"url": "https://example.com/1"}]
+        )
+        cls.original, cls.copy, = cls.documents
+        # The copy is the same file at another location
+        cls.copy.properties["hash"] = cls.original.properties["hash"]
+        cls.copy.save()
+
+    @classmethod
+    def tearDownClass(cls):
+        register_defaults("global", {
+            "cache_only": False
+        })
+        super().tearDownClass()
+
+    @patch("files.models.resources.metadata.HttpTikaResource._send")
+    def test_task(self, send_mock):
+        tika_task("files", [self.original.id])
+        self.assertEqual(TikaExtraction.objects.count(), 1)
+        extraction = TikaExtraction.objects.get()
+        self.assertEqual(extraction.hash, self.original.properties["hash"])
+        self.assertEqual(extraction.tika_return_type, "xml")
+
+        tika_task("files", [self.copy.id])
+        self.assertEqual(send_mock.call_count, 0)
+        self.assertEqual(TikaExtraction.objects.count(), 1, "Expected cached extraction to get reused")
+        original = FileDocument.objects.get(id=self.original.id)
+        copy = FileDocument.objects.get(id=self.copy.id)
+        self.assertTrue(copy.pipeline["tika"]["success"])
+        self.assertEqual(copy.pipeline["tika"]["id"], original.pipeline["tika"]["id"])
+        self.assertEqual(copy.pipeline["tika"]["id"], extraction.resource_id)
+        # Texts get stored outside of the derivatives
+        text = "Tika content for https://example.com/1"
+        self.assertEqual(copy.derivatives["tika"], {"text_length": len(text)})
+        self.assertEqual(FileText.objects.get(document=copy).text, text)
+        self.assertEqual(copy.to_data()["text"], text)
+        self.assertFalse(copy.processresult_set.exists(), "Expected cached results to get cleaned up")
@@ -309,11 +309,60 @@ OPENSEARCH_ENABLE_DECOMPOUND_ANALYZERS = environment.opensearch.enable_decompoun
 OPENSEARCH_DECOMPOUND_WORD_LISTS = environment.opensearch.decompound_word_lists
 OPENSEARCH_PASSWORD = environment.secrets.opensearch.password
 OPENSEARCH_ALIAS_PREFIX = None
+# Bulk requests get sent in chunks limited by document count and size, using multiple threads per index
+OPENSEARCH_BULK_CHUNK_SIZE = 500
+OPENSEARCH_BULK_MAX_CHUNK_BYTES = 10 * 1024 * 1024
+OPENSEARCH_BULK_THREAD_COUNT = 2
+# Rebuilding an index replays changes that arrive during the build in at most this amount of rounds
+OPENSEARCH_CATCH_UP_ROUNDS = 10
+# Changes that are younger than this amount of seconds get read again, because they may have committed late
+INDEXING_CHANGE_LAG = 600
+
+
+# Caches
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "search": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": f"redis://{environment.redis.host}/1",
+    },
+    "metadata": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": f"redis://{environment.redis.host}/2",
+    }
+}
+if sys.argv[1:2] == ['test']:
+    # Tests shouldn't get search responses or metadata from other tests, but cache tests may override this
+    CACHES["search"] = {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}
+    CACHES["metadata"] = {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}
+# Search responses get cached for an amount of seconds per endpoint, where zero disables caching for an endpoint
+SEARCH_CACHE_ALIAS = "search"
+SEARCH_CACHE_TIMEOUTS = {
+    "search": 60,
+    "autocomplete": 300,
+    "similarity": 600,
+    "author_suggestions": 600,
+}
+# Workers keep metadata vocabularies in memory until the version in this cache changes
+METADATA_CACHE_ALIAS = "metadata"
+# Materialized metadata trees expire after this amount of seconds, unless metadata changes before that
+METADATA_TREE_CACHE_TIMEOUT = 24 * 60 * 60
+# Only trees for these max_children values get materialized, other trees get built for every request
+METADATA_TREE_CACHED_MAX_CHILDREN = [None, 5, 10, 20]
+# Metadata value frequencies get fetched from OpenSearch in pages of this amount of values
+METADATA_FREQUENCY_PAGE_SIZE = 1000
 
 
 # Tika
 
 TIKA_HOST = environment.tika.host
+# Texts from Tika that reach the length get truncated to a maximum amount of words
+FILE_TEXT_TRUNCATE_LENGTH = 1000000
+FILE_TEXT_TRUNCATE_WORDS = 10000
 
 
 # Logging
@@ -534,6 +583,10 @@ CELERY_BEAT_SCHEDULE = {
         'task': 'sync_metadata',
         'schedule': crontab(minute=30)
     },
+    'process_webhook_events': {
+        'task': 'process_webhook_events',
+        'schedule': 60
+    },
     'sync_product_indices': {
         'task': 'sync_opensearch_indices',
         'schedule': 30,
@@ -592,6 +645,9 @@ EDUTERM_API_KEY = environment.secrets.eduterm.api_key
 # Deepl
 
 DEEPL_API_KEY = environment.secrets.deepl.api_key
+# New metadata values get translated concurrently and found translations get cached for an amount of seconds
+METADATA_TRANSLATION_CONCURRENCY = 5
+METADATA_TRANSLATION_CACHE_TIMEOUT = 30 * 24 * 60 * 60
 
 
 # Google
@@ -696,6 +752,11 @@ WEBHOOKS["sharekit:nppo_acc"] = WEBHOOKS["sharekit:nppo"]
 WEBHOOKS["edusources"] = WEBHOOKS["sharekit:edusources"]
 WEBHOOKS["nppo"] = WEBHOOKS["sharekit:nppo"]
 WEBHOOKS["publinova"] = WEBHOOKS["publinova:publinova"]
+# Webhook events get committed after this amount of seconds and at most this amount of events at a time
+WEBHOOK_COALESCE_WINDOW = 10
+WEBHOOK_EVENT_BATCH_SIZE = 500
+WEBHOOK_EVENT_MAX_ATTEMPTS = 5
+WEBHOOK_EVENT_RETRY_BACKOFF = 60  # seconds, doubles with every failed attempt
 
 
 # Harvester tasks and logic
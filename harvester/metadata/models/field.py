@@ -1,41 +1,77 @@
 from collections import defaultdict
+from typing import Iterator
 
 from django.conf import settings
-from django.db import models
+from django.db import models, transaction
+from django.dispatch import receiver
 from rest_framework import serializers
 
 from search_client.opensearch.configuration.presets import get_all_preset_keys, is_valid_preset_search_configuration
 from search.clients import get_search_client
 from metadata.models import MetadataTranslation, MetadataTranslationSerializer, MetadataValueSerializer
+from metadata.models.value import get_max_children
+from metadata.utils.vocabulary import bump_vocabulary_version
 
 
 class MetadataFieldManager(models.Manager):
 
-    def fetch_value_frequencies(self, **kwargs) -> dict:
-        value_frequencies = {}
-
-        # Load relevant data from the database and prepare queries
-        aggregation_terms_by_entity = defaultdict(dict)
-        for field in self.annotate(size=models.Count("metadatavalue")).filter(**kwargs).iterator():
-            preset = is_valid_preset_search_configuration(settings.PLATFORM, field.entity)
-            aggregation_terms_by_entity[preset][field.name] = {
-                "terms": {
-                    "field": field.name,
-                    "size": field.size + 500,
-                }
+    @staticmethod
+    def iterate_frequency_pages(search_client, aliases: list[str], field_name: str) -> Iterator[dict[str, int]]:
+        """
+        Pages through the values of a field with a composite aggregation and yields the frequencies per page.
+        Only one page of buckets is kept in memory, no matter how many values a field has.
+        """
+        page_size = settings.METADATA_FREQUENCY_PAGE_SIZE
+        after_key = None
+        while True:
+            composite = {
+                "size": page_size,
+                "sources": [
+                    {"value": {"terms": {"field": field_name}}}
+                ]
+            }
+            if after_key:
+                composite["after"] = after_key
+            body = {
+                "size": 0,
+                "aggs": {field_name: {"composite": composite}}
             }
+            response = search_client.search(index=aliases, body=body)
+            aggregation = response["aggregations"][field_name]
+            buckets = aggregation["buckets"]
+            if buckets:
+                yield {
+                    bucket["key"]["value"]: bucket["doc_count"]
+                    for bucket in buckets
+                }
+            after_key = aggregation.get("after_key")
+            if not after_key or len(buckets) < page_size:
+                break
+
+    def iterate_value_frequencies(self, **kwargs) -> Iterator[tuple["MetadataField", Iterator[dict[str, int]]]]:
+        """
+        Yields MetadataFields that match the filter kwargs together with an iterator of their value frequency pages.
+        Pages should get consumed before continuing with the next field.
+        """
+        # Load relevant data from the database and group fields by the preset of their indices
+        fields_by_preset = defaultdict(list)
+        for field in self.filter(**kwargs).iterator():
+            preset = is_valid_preset_search_configuration(settings.PLATFORM, field.entity)
+            fields_by_preset[preset].append(field)
 
-        # Execute queries using the correct index for all terms
-        for preset, terms in aggregation_terms_by_entity.items():
+        # Execute queries using the correct index for all fields
+        for preset, fields in fields_by_preset.items():
             client = get_search_client(presets=[preset])
             aliases = client.configuration.get_aliases()
-            response = client.client.search(index=aliases, body={"aggs": terms})
-            for field_name, aggregation in response["aggregations"].items():
-                value_frequencies[field_name] = {
-                    bucket["key"]: bucket["doc_count"]
-                    for bucket in aggregation["buckets"]
-                }
+            for field in fields:
+                yield field, self.iterate_frequency_pages(client.client, aliases, field.name)
 
+    def fetch_value_frequencies(self, **kwargs) -> dict:
+        value_frequencies = {}
+        for field, pages in self.iterate_value_frequencies(**kwargs):
+            field_frequencies = value_frequencies.setdefault(field.name, {})
+            for page in pages:
+                field_frequencies.update(page)
         return value_frequencies
 
 
@@ -76,6 +112,12 @@ class MetadataField(models.Model):
         return cls._meta.model_name
 
 
+@receiver(models.signals.post_save, sender=MetadataField)
+@receiver(models.signals.post_delete, sender=MetadataField)
+def invalidate_metadata_field_vocabularies(sender, instance, **kwargs):
+    transaction.on_commit(bump_vocabulary_version)
+
+
 class MetadataFieldSerializer(serializers.ModelSerializer):
 
     parent = serializers.SerializerMethodField()
@@ -102,9 +144,8 @@ class MetadataFieldSerializer(serializers.ModelSerializer):
                 children.sort(key=lambda child: child.value)
             case _:
                 pass
-        max_children = self.context["request"].GET.get("max_children", "")
-        max_children = int(max_children) if max_children else None
-        return MetadataValueSerializer(children, many=True, context=self.context).data[:max_children]
+        max_children = get_max_children(self.context)
+        return MetadataValueSerializer(children[:max_children], many=True, context=self.context).data
 
     def get_children_count(self, obj):
         return obj.metadatavalue_set.filter(deleted_at__isnull=True, parent__isnull=True).count()
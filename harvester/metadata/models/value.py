@@ -1,5 +1,6 @@
 from django.conf import settings
-from django.db import models
+from django.db import models, transaction
+from django.dispatch import receiver
 from django.core.exceptions import ValidationError
 from django.utils import timezone
 from rest_framework import serializers
@@ -7,6 +8,7 @@ from mptt.models import MPTTModel, TreeForeignKey, TreeManager
 from mptt.exceptions import InvalidMove
 
 from metadata.models import MetadataTranslation, MetadataTranslationSerializer
+from metadata.utils.vocabulary import bump_vocabulary_version
 
 
 class MetadataValueManager(TreeManager):
@@ -16,6 +18,7 @@ class MetadataValueManager(TreeManager):
             raise InvalidMove(f"Can not move '{node.value}' relative to '{target.value}', "
                               f"because they do not share a field")
         super().move_node(node, target, position=position)
+        transaction.on_commit(bump_vocabulary_version)
 
 
 class MetadataValue(MPTTModel):
@@ -64,6 +67,25 @@ class MetadataValue(MPTTModel):
         unique_together = ("field", "value",)
 
 
+@receiver(models.signals.post_save, sender=MetadataValue)
+@receiver(models.signals.post_delete, sender=MetadataValue)
+@receiver(models.signals.post_save, sender=MetadataTranslation)
+@receiver(models.signals.post_delete, sender=MetadataTranslation)
+def invalidate_metadata_vocabularies(sender, instance, **kwargs):
+    # Other workers should only reload vocabularies once they're able to read the changes
+    transaction.on_commit(bump_vocabulary_version)
+
+
+def get_max_children(context: dict) -> int | None:
+    """
+    Returns the maximum amount of children to serialize from the serializer context or from the request otherwise.
+    """
+    if "max_children" in context:
+        return context["max_children"]
+    max_children = context["request"].GET.get("max_children", "")
+    return int(max_children) if max_children else None
+
+
 class MetadataValueSerializer(serializers.ModelSerializer):
 
     children = serializers.SerializerMethodField()
@@ -83,9 +105,8 @@ class MetadataValueSerializer(serializers.ModelSerializer):
                 children.sort(key=lambda child: child.value)
             case _:
                 pass
-        max_children = self.context["request"].GET.get("max_children", "")
-        max_children = int(max_children) if max_children else None
-        return MetadataValueSerializer(children, many=True, context=self.context).data[:max_children]
+        max_children = get_max_children(self.context)
+        return MetadataValueSerializer(children[:max_children], many=True, context=self.context).data
 
     def get_children_count(self, obj):
         return len(obj.get_children())
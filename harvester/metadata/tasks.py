@@ -1,5 +1,10 @@
 from datetime import timedelta
+from hashlib import sha1
+from concurrent.futures import ThreadPoolExecutor
 
+from django.conf import settings
+from django.db.models import Max
+from django.db.transaction import atomic
 from django.utils.timezone import now
 from django.urls import reverse
 from celery import current_app as app
@@ -7,57 +12,114 @@ from celery import current_app as app
 from harvester.tasks.base import DatabaseConnectionResetTask
 from core.utils.notifications import send_admin_notification
 from metadata.models import MetadataField, MetadataValue, MetadataTranslation
+from metadata.utils.vocabulary import get_metadata_cache, bump_vocabulary_version
+from metadata.utils.tree import prepare_metadata_trees
 from metadata.utils.translate import fetch_eduterm_translations, fetch_edustandaard_translations, translate_with_deepl
 
 
-def _translate_metadata_value(field, value):
-    if field.english_as_dutch:
-        return MetadataTranslation(nl=value, en=value, is_fuzzy=False)
+def _fetch_translations(value):
+    cache = get_metadata_cache()
+    cache_key = f"metadata:translation:{sha1(value.encode('utf-8')).hexdigest()}"
+    translations = cache.get(cache_key)
+    if translations is not None:
+        return tuple(translations)
 
     translations = fetch_eduterm_translations(value)
     if not translations:
         translations = fetch_edustandaard_translations(value)
+    if not translations:
+        return  # failures don't get cached, because they may be temporary
+
+    dutch, english = translations
+    if dutch == english:
+        english = translate_with_deepl(dutch)
+    cache.set(cache_key, [dutch, english], timeout=settings.METADATA_TRANSLATION_CACHE_TIMEOUT)
+    return dutch, english
+
+
+def _translate_metadata_value(field, value):
+    if field.english_as_dutch:
+        return MetadataTranslation(nl=value, en=value, is_fuzzy=False)
 
+    translations = _fetch_translations(value)
     if translations:
         dutch, english = translations
-        if dutch == english:
-            english = translate_with_deepl(dutch)
         translation = MetadataTranslation(nl=dutch, en=english, is_fuzzy=True)
     else:
         translation = MetadataTranslation(nl=value, en=value, is_fuzzy=True)
     return translation
 
 
+def _translate_metadata_values(field_values: list[tuple[MetadataField, str]]) -> list[MetadataTranslation]:
+    if not field_values:
+        return []
+    with ThreadPoolExecutor(max_workers=settings.METADATA_TRANSLATION_CONCURRENCY) as executor:
+        return list(executor.map(lambda field_value: _translate_metadata_value(*field_value), field_values))
+
+
+def _apply_frequency(metadata_value: MetadataValue, frequency: int, current_time) -> bool:
+    """
+    Sets the frequency and deletion state of a MetadataValue and returns whether any of these changed.
+    """
+    if not frequency and not metadata_value.is_manual:
+        deleted_at = metadata_value.deleted_at or current_time
+    else:
+        deleted_at = None
+    if frequency == metadata_value.frequency and deleted_at == metadata_value.deleted_at:
+        return False
+    metadata_value.frequency = frequency
+    metadata_value.deleted_at = deleted_at
+    metadata_value.updated_at = current_time
+    return True
+
+
+def _update_frequencies(metadata_updates: list[MetadataValue]) -> None:
+    MetadataValue.objects.bulk_update(
+        metadata_updates,
+        fields=["frequency", "updated_at", "deleted_at"],
+        batch_size=500
+    )
+
+
 @app.task(name="sync_metadata", base=DatabaseConnectionResetTask)
 def sync_metadata():
 
-    frequencies = MetadataField.objects.fetch_value_frequencies(is_manual=False)
-
+    # Pages of frequencies get merged into the values one at a time and only changed values get updated
     current_time = now()
-    metadata_updates = []
-    for metadata_value in MetadataValue.objects.all().iterator():
-        if metadata_value.field.name not in frequencies:
-            continue
-        frequency = frequencies[metadata_value.field.name].pop(metadata_value.value, 0)
-        if not frequency and not metadata_value.is_manual:
-            metadata_value.frequency = 0
-            metadata_value.updated_at = current_time
-            metadata_value.deleted_at = current_time
-            metadata_updates.append(metadata_value)
-            continue
-        metadata_value.frequency = frequency
-        metadata_value.deleted_at = None
-        metadata_value.updated_at = current_time
-        metadata_updates.append(metadata_value)
-    MetadataValue.objects.bulk_update(metadata_updates, fields=["value", "frequency", "updated_at", "deleted_at"])
+    update_count = 0
+    new_field_values = []
+    new_frequencies = []
+    frequency_fields = ("id", "value", "frequency", "deleted_at", "is_manual",)
+    for field, pages in MetadataField.objects.iterate_value_frequencies(is_manual=False):
+        synced_ids = set()
+        for page in pages:
+            metadata_updates = []
+            for metadata_value in field.metadatavalue_set.filter(value__in=page.keys()).only(*frequency_fields):
+                synced_ids.add(metadata_value.id)
+                if _apply_frequency(metadata_value, page.pop(metadata_value.value, 0), current_time):
+                    metadata_updates.append(metadata_value)
+            _update_frequencies(metadata_updates)
+            update_count += len(metadata_updates)
+            for value, frequency in page.items():
+                new_field_values.append((field, value,))
+                new_frequencies.append(frequency)
+        # Values that didn't appear in any page no longer occur
+        metadata_updates = []
+        for metadata_value in field.metadatavalue_set.only(*frequency_fields).iterator():
+            if metadata_value.id not in synced_ids and _apply_frequency(metadata_value, 0, current_time):
+                metadata_updates.append(metadata_value)
+        _update_frequencies(metadata_updates)
+        update_count += len(metadata_updates)
+
+    # Values that didn't exist yet get translated concurrently
+    translation_inserts = _translate_metadata_values(new_field_values)
 
     metadata_inserts = []
-    translation_inserts = []
-    for field_name, field_frequencies in frequencies.items():
-        field = MetadataField.objects.get(name=field_name)
-        for value, frequency in field_frequencies.items():
-            translation = _translate_metadata_value(field, value)
-            translation_inserts.append(translation)
+    with atomic():
+        # New values become roots of their own trees, which leaves all existing trees untouched
+        last_tree_id = MetadataValue.objects.aggregate(last_tree_id=Max("tree_id"))["last_tree_id"] or 0
+        new_values = zip(new_field_values, new_frequencies, translation_inserts)
+        for tree_id, ((field, value,), frequency, translation) in enumerate(new_values, start=last_tree_id + 1):
             metadata_value = MetadataValue(
                 field=field,
                 name=value,
@@ -65,15 +127,18 @@ def sync_metadata():
                 frequency=frequency,
                 translation=translation,
                 is_hidden=translation.is_fuzzy,
-                lft=0,
-                rght=0,
+                lft=1,
+                rght=2,
                 level=0,
-                tree_id=0
+                tree_id=tree_id
             )
             metadata_inserts.append(metadata_value)
-    MetadataTranslation.objects.bulk_create(translation_inserts)
-    MetadataValue.objects.bulk_create(metadata_inserts)
-    MetadataValue.objects.rebuild()
+        MetadataTranslation.objects.bulk_create(translation_inserts)
+        MetadataValue.objects.bulk_create(metadata_inserts)
+
+    if update_count or metadata_inserts:
+        bump_vocabulary_version()
+    prepare_metadata_trees()
 
     if metadata_inserts:
         send_admin_notification(
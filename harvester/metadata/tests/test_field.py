@@ -1,37 +1,43 @@
 from unittest.mock import patch, MagicMock
 
-from django.test import TestCase
+from django.test import TestCase, override_settings
 
 from metadata.models import MetadataField
 
 
-search_client_mock = MagicMock()
-search_client_mock.search = MagicMock(return_value={
-    "aggregations": {
-        "field1": {
-            "buckets": [
-                {
-                    "key": "value1",
-                    "doc_count": 1
-                },
-                {
-                    "key": "value2",
-                    "doc_count": 2
-                },
-                {
-                    "key": "value3",
-                    "doc_count": 3
-                }
-            ]
-        }
+VALUE_FREQUENCIES = {
+    "value1": 1,
+    "value2": 2,
+    "value3": 3
+}
+
+
+def search_composite_aggregation(index, body):
+    (field_name, aggregation), = body["aggs"].items()
+    composite = aggregation["composite"]
+    after = composite.get("after", {}).get("value")
+    values = [value for value in VALUE_FREQUENCIES.keys() if after is None or value > after][:composite["size"]]
+    response_aggregation = {
+        "buckets": [{"key": {"value": value}, "doc_count": VALUE_FREQUENCIES[value]} for value in values]
     }
-})
+    if values:
+        response_aggregation["after_key"] = {"value": values[-1]}
+    return {"aggregations": {field_name: response_aggregation}}
+
+
+search_client_mock = MagicMock()
+search_client_mock.search = MagicMock(side_effect=search_composite_aggregation)
 
 
+@override_settings(METADATA_FREQUENCY_PAGE_SIZE=2)
 class TestMetadataFieldManager(TestCase):
 
     fixtures = ["initial-metadata-edusources"]
 
+    def setUp(self):
+        super().setUp()
+        search_client_mock.search.reset_mock()
+
     @patch("search.clients.get_opensearch_client", return_value=search_client_mock)
     def test_fetch_value_frequencies(self, client_mock):
 
@@ -39,25 +45,47 @@ class TestMetadataFieldManager(TestCase):
         frequencies = MetadataField.objects.fetch_value_frequencies()
         # Check dummy return values
         self.assertEqual(client_mock.call_count, 2, "Expected a client initialization per entity type")
-        self.assertEqual(frequencies, {"field1": {"value1": 1, "value2": 2, "value3": 3}})
+        field_names = set(MetadataField.objects.values_list("name", flat=True))
+        self.assertEqual(set(frequencies.keys()), field_names)
+        for field_name, field_frequencies in frequencies.items():
+            self.assertEqual(field_frequencies, VALUE_FREQUENCIES)
         # See if calls to OpenSearch were made correctly
-        # First the default products call
+        self.assertEqual(
+            search_client_mock.search.call_count, MetadataField.objects.count() * 2,
+            "Expected two pages of frequencies for every field"
+        )
+        # First the default products calls
         products_args, products_kwargs = search_client_mock.search.call_args_list[0]
         self.assertEqual(
             products_kwargs["index"], ["edusources-products"],
             "Expected 'products' entity to result in 'products:default' configuration preset"
         )
-        fields = products_kwargs["body"]["aggs"]
-        for field in MetadataField.objects.filter(entity__in=["products:default", "products"]):
-            self.assertIn(field.name, fields)
-            self.assertEqual(fields[field.name]["terms"]["size"], field.metadatavalue_set.count() + 500)
-        # Now the multilingual indices products call
-        multilingual_indices_args, multilingual_indices_kwargs = search_client_mock.search.call_args_list[1]
+        self.assertEqual(products_kwargs["body"]["size"], 0)
+        (field_name, aggregation), = products_kwargs["body"]["aggs"].items()
+        self.assertIn(field_name, set(
+            MetadataField.objects.filter(entity__in=["products:default", "products"]).values_list("name", flat=True)
+        ))
+        self.assertEqual(aggregation["composite"]["size"], 2)
+        self.assertEqual(aggregation["composite"]["sources"], [{"value": {"terms": {"field": field_name}}}])
+        self.assertNotIn("after", aggregation["composite"])
+        next_page_args, next_page_kwargs = search_client_mock.search.call_args_list[1]
+        next_page_composite = next_page_kwargs["body"]["aggs"][field_name]["composite"]
+        self.assertEqual(next_page_composite["after"], {"value": "value2"}, "Expected pagination with after_key")
+        # Now the multilingual indices products calls
+        multilingual_indices_args, multilingual_indices_kwargs = search_client_mock.search.call_args_list[-1]
         self.assertEqual(
             multilingual_indices_kwargs["index"], ["edusources-nl", "edusources-en", "edusources-unk"],
             "Expected 'multilingual-indices' entity to use language specific indices."
         )
-        fields = multilingual_indices_kwargs["body"]["aggs"]
-        for field in MetadataField.objects.filter(entity="products:multilingual:indices"):
-            self.assertIn(field.name, fields)
-            self.assertEqual(fields[field.name]["terms"]["size"], field.metadatavalue_set.count() + 500)
+        (field_name, aggregation), = multilingual_indices_kwargs["body"]["aggs"].items()
+        self.assertIn(field_name, set(
+            MetadataField.objects.filter(entity="products:multilingual-indices").values_list("name", flat=True)
+        ))
+
+    @patch("search.clients.get_opensearch_client", return_value=search_client_mock)
+    def test_iterate_value_frequencies(self, client_mock):
+        for field, pages in MetadataField.objects.iterate_value_frequencies(is_manual=False):
+            self.assertFalse(field.is_manual)
+            self.assertEqual(list(pages), [{"value1": 1, "value2": 2}, {"value3": 3}])
+        field_count = MetadataField.objects.filter(is_manual=False).count()
+        self.assertEqual(search_client_mock.search.call_count, field_count * 2)
@@ -1,8 +1,13 @@
-from django.test import TestCase
+import gzip
+import json
+
+from django.test import TestCase, override_settings
 
 from django.contrib.auth.models import User
 
 from metadata.models import MetadataField, MetadataValue
+from metadata.utils.tree import get_metadata_tree_key
+from metadata.utils.vocabulary import get_metadata_cache, get_vocabulary_version
 
 
 class TestMetadataTreeView(TestCase):
@@ -131,3 +136,70 @@ class TestMetadataTreeView(TestCase):
             for child in field["children"]:
                 self.assertEqual(child["field"], field["value"])
                 self.assert_metadata_node_structure(child)
+
+    @override_settings(CACHES={
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+        "metadata": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "metadata-tree-tests"},
+    })
+    def test_metadata_tree_conditional_requests(self):
+        response = self.client.get("/api/v1/metadata/tree/")
+        etag = response["ETag"]
+        self.assertTrue(etag)
+        self.assertEqual(len(response.json()), self.expected_field_count)
+        # Compressed responses contain the same tree
+        response = self.client.get("/api/v1/metadata/tree/", HTTP_ACCEPT_ENCODING="gzip, deflate")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(response["ETag"], etag)
+        self.assertEqual(len(json.loads(gzip.decompress(response.content))), self.expected_field_count)
+        # Conditional requests get a 304 until metadata changes
+        response = self.client.get("/api/v1/metadata/tree/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+        response = self.client.get("/api/v1/metadata/tree/?max_children=2", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200, "Expected another ETag for other max_children")
+        document = MetadataValue.objects.get(field__name="technical_type", value="document")
+        with self.captureOnCommitCallbacks(execute=True):
+            document.delete()
+        response = self.client.get("/api/v1/metadata/tree/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        technical_type = self.find_field_in_response(response, "technical_type")
+        self.assertNotIn("document", [child["value"] for child in technical_type["children"]])
+
+    def test_metadata_tree_invalid_max_children(self):
+        response = self.client.get("/api/v1/metadata/tree/?max_children=many")
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get("/api/v1/metadata/tree/?max_children=-1")
+        self.assertEqual(response.status_code, 400)
+
+    @override_settings(CACHES={
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+        "metadata": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "metadata-tree-keys"},
+    }, METADATA_TREE_CACHED_MAX_CHILDREN=[None, 2])
+    def test_metadata_tree_cached_max_children(self):
+        cache = get_metadata_cache()
+        cache.clear()
+        for max_children in ["", "2", "3", "4"]:
+            response = self.client.get(f"/api/v1/metadata/tree/?max_children={max_children}")
+            self.assertEqual(response.status_code, 200)
+        version = get_vocabulary_version()
+        entities = ["products:multilingual-indices", "products"]
+        for max_children in [None, 2]:
+            self.assertIsNotNone(cache.get(get_metadata_tree_key(version, entities, max_children)))
+        for max_children in [3, 4]:
+            self.assertIsNone(
+                cache.get(get_metadata_tree_key(version, entities, max_children)),
+                "Expected trees for other max_children values not to get cached"
+            )
+        response = self.client.get("/api/v1/metadata/tree/?max_children=3")
+        for field in response.json():
+            self.assertLessEqual(len(field["children"]), 3)
+
+    def test_metadata_tree_accept_encoding(self):
+        for accept_encoding in ["gzip", "deflate, gzip;q=0.5", "*", "br;q=1.0, *;q=0.1"]:
+            response = self.client.get("/api/v1/metadata/tree/", HTTP_ACCEPT_ENCODING=accept_encoding)
+            self.assertEqual(response.get("Content-Encoding"), "gzip", accept_encoding)
+        for accept_encoding in ["", "deflate", "gzip;q=0", "gzip; q=0.0, deflate", "*;q=0", "*, gzip;q=0"]:
+            response = self.client.get("/api/v1/metadata/tree/", HTTP_ACCEPT_ENCODING=accept_encoding)
+            self.assertIsNone(response.get("Content-Encoding"), accept_encoding)
+            self.assertEqual(len(response.json()), self.expected_field_count)
@@ -1,11 +1,12 @@
 from unittest.mock import patch
 from copy import copy
 
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.utils.timezone import now
 
-from metadata.models import MetadataTranslation, MetadataValue
-from metadata.tasks import sync_metadata
+from metadata.models import MetadataTranslation, MetadataValue, MetadataField
+from metadata.tasks import sync_metadata, _fetch_translations
+from metadata.utils.vocabulary import get_metadata_cache
 
 
 def _translate_metadata_value_mock(field, value):
@@ -16,7 +17,16 @@ def _translate_metadata_value_mock(field, value):
 class TestSyncMetadata(TestCase):
 
     fixtures = ["test-metadata-edusources"]
-    fetch_value_frequencies_target = "metadata.models.field.MetadataFieldManager.fetch_value_frequencies"
+    iterate_value_frequencies_target = "metadata.models.field.MetadataFieldManager.iterate_value_frequencies"
+
+    def patch_frequencies(self, frequencies):
+        # Frequencies get returned in pages of two values, like OpenSearch composite aggregations would
+        def iterate_value_frequencies(**kwargs):
+            for field_name, field_frequencies in frequencies.items():
+                field = MetadataField.objects.get(name=field_name)
+                items = list(field_frequencies.items())
+                yield field, (dict(items[ix:ix + 2]) for ix in range(0, len(items), 2))
+        return patch(self.iterate_value_frequencies_target, side_effect=iterate_value_frequencies)
 
     def assert_metadata_value(self, field, value, frequency, is_update=True, is_deleted=False, is_insert=False,
                               parent=None):
@@ -53,7 +63,7 @@ class TestSyncMetadata(TestCase):
         }
 
     def test_sync_metadata(self):
-        with patch(self.fetch_value_frequencies_target, return_value=self.test_frequencies):
+        with self.patch_frequencies(self.test_frequencies):
             sync_metadata()
         # Check basic updates
         document = self.assert_metadata_value("technical_type", "document", 3)
@@ -92,11 +102,11 @@ class TestSyncMetadata(TestCase):
             "wikiwijsmaken": 0,
             "MIT": 1
         }
-        with patch(self.fetch_value_frequencies_target, return_value=frequencies):
+        with self.patch_frequencies(frequencies):
             sync_metadata()
 
         # Check basic updates
-        sharekit = self.assert_metadata_value("harvest_source", "sharekit", 0)
+        sharekit = self.assert_metadata_value("harvest_source", "sharekit", 0, is_update=False)
         self.assert_metadata_value("harvest_source", "edusources", 3, parent=sharekit)
         # Check deletes
         self.assert_metadata_value("harvest_source", "wikiwijsmaken", frequency=0, is_deleted=True)
@@ -111,9 +121,72 @@ class TestSyncMetadata(TestCase):
         frequencies["harvest_source"] = {
             "edusources": 3
         }
-        with patch(self.fetch_value_frequencies_target, return_value=frequencies):
+        with self.patch_frequencies(frequencies):
             sync_metadata()
         for document in MetadataValue.objects.filter(value="document"):
             self.assertIsNotNone(document.deleted_at)
         for edusources in MetadataValue.objects.filter(value="edusources"):
             self.assertIsNone(edusources.deleted_at)
+
+    def test_sync_metadata_unchanged(self):
+        frequencies = copy(self.test_frequencies)
+        frequencies["technical_type"] = {
+            **frequencies["technical_type"],
+            "image": 3910  # same frequency as in the fixture
+        }
+        with self.patch_frequencies(frequencies):
+            sync_metadata()
+        self.assert_metadata_value("technical_type", "image", 3910, is_update=False)
+        self.assert_metadata_value("technical_type", "document", 3)
+        # Values that were deleted before keep their deletion time
+        website = self.assert_metadata_value("technical_type", "website", frequency=0, is_deleted=True)
+        with self.patch_frequencies(copy(frequencies)):
+            sync_metadata()
+        self.assertEqual(MetadataValue.objects.get(id=website.id).deleted_at, website.deleted_at)
+
+    def test_sync_metadata_trees(self):
+        frequencies = copy(self.test_frequencies)
+        frequencies["harvest_source"] = {
+            "MIT": 1,
+            "OCW": 2
+        }
+        tree_ids = set(MetadataValue.objects.values_list("tree_id", flat=True))
+        with self.patch_frequencies(frequencies):
+            sync_metadata()
+        for value in ["MIT", "OCW"]:
+            metadata_value = self.assert_metadata_value("harvest_source", value, frequencies["harvest_source"][value],
+                                                        is_insert=True)
+            self.assertEqual((metadata_value.lft, metadata_value.rght, metadata_value.level), (1, 2, 0))
+            self.assertNotIn(metadata_value.tree_id, tree_ids, "Expected a new tree for a new value")
+            tree_ids.add(metadata_value.tree_id)
+            self.assertEqual(metadata_value.get_root(), metadata_value)
+        # Existing trees remain intact
+        sharekit = MetadataValue.objects.get(field__name="harvest_source", value="sharekit")
+        self.assertEqual([child.value for child in sharekit.get_children()], ["edusources"])
+
+
+@override_settings(CACHES={
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    "metadata": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "sync-metadata-tests"},
+})
+class TestFetchTranslations(TestCase):
+
+    def setUp(self):
+        super().setUp()
+        get_metadata_cache().clear()
+
+    @patch("metadata.tasks.translate_with_deepl", return_value="Value of information")
+    @patch("metadata.tasks.fetch_edustandaard_translations", return_value=("Waarde van informatie",) * 2)
+    @patch("metadata.tasks.fetch_eduterm_translations", return_value=None)
+    def test_fetch_translations(self, eduterm_mock, edustandaard_mock, deepl_mock):
+        for _ in range(2):
+            translations = _fetch_translations("c2d0aee0-19be-47f0-85b0-90ac17cd22c5")
+            self.assertEqual(translations, ("Waarde van informatie", "Value of information",))
+        self.assertEqual(eduterm_mock.call_count, 1, "Expected translations to get cached")
+        self.assertEqual(edustandaard_mock.call_count, 1)
+        self.assertEqual(deepl_mock.call_count, 1)
+        # Values without translations get looked up again
+        edustandaard_mock.return_value = None
+        for _ in range(2):
+            self.assertIsNone(_fetch_translations("unknown"))
+        self.assertEqual(eduterm_mock.call_count, 3)
@@ -0,0 +1,59 @@
+from django.test import TestCase, override_settings
+
+from metadata.models import MetadataValue
+from metadata.utils.vocabulary import get_vocabulary, get_metadata_cache, bump_vocabulary_version
+
+
+CRITICALLY_EVALUATE = "http://purl.edustandaard.nl/concept/f5e496d1-1585-4c7f-b15f-2345cd830877"
+
+
+@override_settings(CACHES={
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    "metadata": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "metadata-tests"},
+})
+class TestMetadataVocabulary(TestCase):
+
+    fixtures = ["test-study-vocabulary"]
+
+    def setUp(self):
+        super().setUp()
+        get_metadata_cache().clear()
+        bump_vocabulary_version()
+
+    def test_get_ancestors(self):
+        vocabulary = get_vocabulary("study_vocabulary")
+        ancestors = vocabulary.get_ancestors(CRITICALLY_EVALUATE, include_self=True)
+        self.assertEqual([ancestor.value for ancestor in ancestors], ["informatievaardigheid", CRITICALLY_EVALUATE])
+        self.assertEqual(ancestors[-1].translation.en, "Critically evaluate")
+        self.assertEqual(
+            [ancestor.value for ancestor in vocabulary.get_ancestors(CRITICALLY_EVALUATE)],
+            ["informatievaardigheid"]
+        )
+        self.assertEqual(vocabulary.get_root(CRITICALLY_EVALUATE).value, "informatievaardigheid")
+        self.assertEqual(vocabulary.get_root("informatievaardigheid").value, "informatievaardigheid")
+        self.assertEqual(vocabulary.get_ancestors("does-not-exist", include_self=True), [])
+        self.assertIsNone(vocabulary.get_root(None))
+
+    def test_get_vocabulary(self):
+        vocabulary = get_vocabulary("study_vocabulary")
+        with self.assertNumQueries(0):
+            self.assertIs(get_vocabulary("study_vocabulary"), vocabulary, "Expected vocabulary to be kept in memory")
+        # Edits of values and translations invalidate the vocabulary once they are committed
+        metadata_value = MetadataValue.objects.get(field__name="study_vocabulary", value=CRITICALLY_EVALUATE)
+        with self.captureOnCommitCallbacks() as callbacks:
+            metadata_value.translation.en = "Critically assess"
+            metadata_value.translation.save()
+            self.assertIs(
+                get_vocabulary("study_vocabulary"), vocabulary,
+                "Expected vocabulary to remain the same until changes are committed"
+            )
+        self.assertTrue(callbacks)
+        for callback in callbacks:
+            callback()
+        vocabulary = get_vocabulary("study_vocabulary")
+        self.assertEqual(vocabulary.get(CRITICALLY_EVALUATE).translation.en, "Critically assess")
+        with self.captureOnCommitCallbacks(execute=True):
+            metadata_value.parent = None
+            metadata_value.save()
+        vocabulary = get_vocabulary("study_vocabulary")
+        self.assertEqual(vocabulary.get_root(CRITICALLY_EVALUATE).value, CRITICALLY_EVALUATE)
@@ -5,7 +5,8 @@ from copy import copy
 
 from django.conf import settings
 
-from search_client.opensearch import SearchClient, OpenSearchClientBuilder
+from search_client.opensearch import SearchClient
+from search.clients import get_opensearch_client
 from system_configuration.main import create_configuration_and_session
 
 
@@ -29,11 +30,10 @@ class MetadataValueComparer:
 
     @staticmethod
     def load_search_client(environment: Config) -> SearchClient:
-        host = environment.opensearch.host
-        http_auth = None
-        if "amazonaws.com" in host:
-            http_auth = ("supersurf", environment.secrets.opensearch.password,)
-        opensearch_client = OpenSearchClientBuilder.from_host(host, http_auth).build()
+        opensearch_client = get_opensearch_client(
+            environment.opensearch.host,
+            environment.secrets.opensearch.password
+        )
         return SearchClient(opensearch_client, settings.PLATFORM)
 
     def __init__(self, reference_environment, peer_environment) -> None:
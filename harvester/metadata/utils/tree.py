@@ -0,0 +1,81 @@
+import gzip
+from hashlib import sha1
+
+from django.conf import settings
+from rest_framework.renderers import JSONRenderer
+
+from search_client.opensearch.client import SearchClient
+from search_client.opensearch.configuration import is_valid_preset_search_configuration
+from metadata.models import MetadataField, MetadataFieldSerializer
+from metadata.utils.vocabulary import get_metadata_cache, get_vocabulary_version
+
+
+def get_tree_entities(entity_input: str) -> list[str]:
+    """
+    Returns the entities that MetadataFields should have to appear in the metadata tree for an entity input.
+    Raises a ValueError when the entity input is not a valid search configuration for the platform.
+    """
+    entity_validated_input = is_valid_preset_search_configuration(settings.PLATFORM, entity_input)
+    entities = [entity_validated_input]
+    if ":" in entity_input:
+        entity, subtype = entity_input.split(":")
+        entities.append(entity)
+    else:
+        entities.append(entity_input)
+    return entities
+
+
+def build_metadata_tree(entities: list[str], max_children: int | None) -> dict:
+    """
+    Serializes the metadata tree for the given entities and returns it as JSON,
+    together with a gzip compressed version of the JSON and an ETag.
+    """
+    queryset = MetadataField.objects.filter(is_hidden=False).filter(entity__in=entities).select_related("translation")
+    serializer = MetadataFieldSerializer(queryset, many=True, context={"max_children": max_children})
+    content = JSONRenderer().render(serializer.data)
+    return {
+        "etag": f'W/"{sha1(content).hexdigest()}"',
+        "content": content,
+        "compressed_content": gzip.compress(content),
+    }
+
+
+def get_metadata_tree_key(version: str, entities: list[str], max_children: int | None) -> str:
+    entities_key = ",".join(sorted(set(entities)))
+    return f"metadata:tree:{version}:{settings.PLATFORM.value}:{entities_key}:{max_children}"
+
+
+def get_metadata_tree(entities: list[str], max_children: int | None) -> dict:
+    """
+    Returns a metadata tree from the cache and builds the tree when it wasn't materialized for the current
+    vocabulary version yet. Any change to metadata bumps the vocabulary version, which invalidates all trees.
+    Trees only get materialized for max_children values from METADATA_TREE_CACHED_MAX_CHILDREN,
+    which prevents arbitrary max_children values from filling the cache.
+    """
+    version = get_vocabulary_version()
+    if version is None or max_children not in settings.METADATA_TREE_CACHED_MAX_CHILDREN:
+        return build_metadata_tree(entities, max_children)
+    cache = get_metadata_cache()
+    key = get_metadata_tree_key(version, entities, max_children)
+    tree = cache.get(key)
+    if tree is None:
+        tree = build_metadata_tree(entities, max_children)
+        cache.set(key, tree, timeout=settings.METADATA_TREE_CACHE_TIMEOUT)
+    return tree
+
+
+def prepare_metadata_trees() -> None:
+    """
+    Materializes the full metadata trees of all entities with MetadataFields and of the default entity,
+    which means that requests for these trees don't need to wait for serialization.
+    """
+    if get_vocabulary_version() is None:
+        return  # trees can't get stored
+    entity_inputs = set(MetadataField.objects.values_list("entity", flat=True).distinct())
+    entity_inputs.add(SearchClient.preset_default)
+    for entity_input in sorted(entity_inputs):
+        try:
+            entities = get_tree_entities(entity_input)
+        except ValueError:
+            continue
+        get_metadata_tree(entities, None)
@@ -0,0 +1,94 @@
+from uuid import uuid4
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import caches, BaseCache
+
+
+VOCABULARY_VERSION_KEY = "metadata:vocabulary:version"
+
+
+def get_metadata_cache() -> BaseCache:
+    return caches[settings.METADATA_CACHE_ALIAS]
+
+
+def get_vocabulary_version() -> str | None:
+    cache = get_metadata_cache()
+    version = cache.get(VOCABULARY_VERSION_KEY)
+    if version is None:
+        cache.add(VOCABULARY_VERSION_KEY, uuid4().hex, timeout=None)
+        version = cache.get(VOCABULARY_VERSION_KEY)
+    return version
+
+
+def bump_vocabulary_version() -> None:
+    """
+    Switches to a new vocabulary version, which makes all workers reload the vocabularies they hold in memory.
+    """
+    get_metadata_cache().set(VOCABULARY_VERSION_KEY, uuid4().hex, timeout=None)
+
+
+class MetadataVocabulary(object):
+    """
+    Holds all MetadataValues of a MetadataField together with their translations in memory.
+    Ancestors and roots get resolved through parent ids, which prevents MPTT queries for every lookup.
+    """
+
+    def __init__(self, field_name: str, metadata_values: list):
+        self.field_name = field_name
+        self.nodes_by_id = {metadata_value.id: metadata_value for metadata_value in metadata_values}
+        self.nodes = {metadata_value.value: metadata_value for metadata_value in metadata_values}
+
+    def __contains__(self, value) -> bool:
+        return self.get(value) is not None
+
+    def get(self, value):
+        # Values get compared as strings, like the database does for values of other types (e.g. years)
+        if value is None:
+            return None
+        return self.nodes.get(str(value))
+
+    def get_ancestors(self, value, include_self: bool = False) -> list:
+        node = self.get(value)
+        if node is None:
+            return []
+        ancestors = [node] if include_self else []
+        visited = {node.id}
+        while node.parent_id is not None and node.parent_id in self.nodes_by_id and node.parent_id not in visited:
+            node = self.nodes_by_id[node.parent_id]
+            visited.add(node.id)
+            ancestors.append(node)
+        ancestors.reverse()
+        return ancestors
+
+    def get_root(self, value):
+        ancestors = self.get_ancestors(value, include_self=True)
+        return ancestors[0] if ancestors else None
+
+    @classmethod
+    def load(cls, field_name: str) -> "MetadataVocabulary":
+        MetadataValue = apps.get_model("metadata", "MetadataValue")
+        metadata_values = MetadataValue.objects.select_related("translation").filter(field__name=field_name) \
+            .order_by("id")
+        return cls(field_name, list(metadata_values))
+
+
+_vocabularies = {}
+_vocabularies_version = None
+
+
+def get_vocabulary(field_name: str) -> MetadataVocabulary:
+    """
+    Returns the in memory vocabulary for a MetadataField, which gets loaded at most once per vocabulary version.
+    When no version can be determined the vocabulary always gets loaded from the database.
+    """
+    global _vocabularies_version
+    version = get_vocabulary_version()
+    if version is None or version != _vocabularies_version:
+        _vocabularies.clear()
+        _vocabularies_version = version
+    if version is None:
+        return MetadataVocabulary.load(field_name)
+    if field_name not in _vocabularies:
+        _vocabularies[field_name] = MetadataVocabulary.load(field_name)
+    return _vocabularies[field_name]
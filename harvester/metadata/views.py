@@ -1,18 +1,40 @@
 from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified
 from django.views.decorators.gzip import gzip_page
 from django.utils.decorators import method_decorator
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags
 from rest_framework import generics
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.permissions import AllowAny
 from rest_framework.exceptions import ValidationError
 
 from search_client.opensearch.client import SearchClient
-from search_client.opensearch.configuration import is_valid_preset_search_configuration
 from harvester.schema import HarvesterSchema
 from metadata.models import MetadataField, MetadataFieldSerializer, MetadataValue, MetadataValueSerializer
+from metadata.utils.tree import get_tree_entities, get_metadata_tree
+
+
+def accepts_gzip(accept_encoding: str) -> bool:
+    """
+    Returns whether an Accept-Encoding header allows gzip, which isn't the case for codings with a quality of zero.
+    """
+    qualities = {}
+    for coding in accept_encoding.split(","):
+        name, *parameters = [part.strip() for part in coding.split(";")]
+        quality = 1.0
+        for parameter in parameters:
+            key, _, value = parameter.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if name:
+            qualities[name.lower()] = quality
+    return qualities.get("gzip", qualities.get("*", 0.0)) > 0
 
 
-@method_decorator(gzip_page, name="dispatch")
 class MetadataTreeView(generics.ListAPIView):
     """
     The metadata tree is used for filtering with the full text search endpoint.
@@ -55,6 +77,9 @@ class MetadataTreeView(generics.ListAPIView):
 
     **frequency**: How many results match this node in the entire dataset.
 
+    Responses contain an ETag header. Send its value in an If-None-Match header to get a 304 response,
+    when the metadata tree didn't change.
+
     """
     permission_classes = (AllowAny,)
     serializer_class = MetadataFieldSerializer
@@ -64,21 +89,39 @@ class MetadataTreeView(generics.ListAPIView):
     def get_entities(self) -> list[str]:
         entity_input = self.request.GET.get("entity", SearchClient.preset_default)
         try:
-            entity_validated_input = is_valid_preset_search_configuration(settings.PLATFORM, entity_input)
+            return get_tree_entities(entity_input)
         except ValueError:
             raise ValidationError(f"Invalid entity for {settings.PLATFORM.value}: {entity_input}")
-        entities = [entity_validated_input]
-        if ":" in entity_input:
-            entity, subtype = entity_input.split(":")
-            entities.append(entity)
-        else:
-            entities.append(entity_input)
-        return entities
+
+    def get_max_children(self) -> int | None:
+        max_children = self.request.GET.get("max_children", "")
+        try:
+            max_children = int(max_children) if max_children else None
+        except ValueError:
+            raise ValidationError(f"Invalid max_children: {max_children}")
+        if max_children is not None and max_children < 0:
+            raise ValidationError(f"Invalid max_children: {max_children}")
+        return max_children
 
     def get_queryset(self):
         entities = self.get_entities()
         return MetadataField.objects.filter(is_hidden=False).filter(entity__in=entities).select_related("translation")
 
+    def list(self, request, *args, **kwargs):
+        # The tree gets served from a materialized JSON blob instead of serializing it for every request
+        tree = get_metadata_tree(self.get_entities(), self.get_max_children())
+        if_none_match = parse_etags(request.headers.get("If-None-Match", ""))
+        if tree["etag"] in if_none_match or "*" in if_none_match:
+            response = HttpResponseNotModified()
+        elif accepts_gzip(request.headers.get("Accept-Encoding", "")):
+            response = HttpResponse(tree["compressed_content"], content_type="application/json")
+            response["Content-Encoding"] = "gzip"
+        else:
+            response = HttpResponse(tree["content"], content_type="application/json")
+        response["ETag"] = tree["etag"]
+        patch_vary_headers(response, ("Accept-Encoding",))
+        return response
+
 
 @method_decorator(gzip_page, name="dispatch")
 class MetadataFieldValuesView(generics.ListAPIView):
@@ -1,7 +1,9 @@
 import re
+from typing import Iterable
 from unidecode import unidecode
 from hashlib import sha1
 from copy import copy
+from dataclasses import replace
 
 from django.db import models
 from django.conf import settings
@@ -52,13 +54,45 @@ class ProductDocument(HarvestDocument):
 
     property_defaults = SEED_DEFAULTS
 
+    prefetched_metadata_values = None
+    prefetched_file_documents = None
+
+    @classmethod
+    def prefetch_task_checks(cls, instances: list["ProductDocument"]) -> None:
+        # Loads the metadata values that task checks need for all documents with a single query
+        lookups = {
+            "study_vocabulary.keyword": set(),
+            "publisher_year": set()
+        }
+        for instance in instances:
+            lookups["study_vocabulary.keyword"].update(instance.get_study_vocabulary_ids())
+            if publisher_year := instance.properties.get("publisher_year"):
+                lookups["publisher_year"].add(str(publisher_year))
+        metadata_filters = models.Q()
+        for field_name, values in lookups.items():
+            if values:
+                metadata_filters |= models.Q(field__name=field_name, value__in=values)
+        metadata_values = {field_name: set() for field_name in lookups.keys()}
+        if metadata_filters:
+            for field_name, value in MetadataValue.objects.filter(metadata_filters).values_list("field__name", "value"):
+                metadata_values[field_name].add(value)
+        for instance in instances:
+            instance.prefetched_metadata_values = metadata_values
+
+    def has_metadata_value(self, field_name: str, values: list[str]) -> bool:
+        if self.prefetched_metadata_values is not None:
+            return any(str(value) in self.prefetched_metadata_values[field_name] for value in values)
+        return MetadataValue.objects.filter(field__name=field_name, value__in=values).exists()
+
+    def get_study_vocabulary_ids(self) -> list[str]:
+        return self.properties.get("learning_material", {}).get("study_vocabulary", None) or []
+
     @property
     def has_study_vocabulary(self) -> bool:
-        study_vocabulary_ids = self.properties.get("learning_material", {}).get("study_vocabulary", [])
+        study_vocabulary_ids = self.get_study_vocabulary_ids()
         if not study_vocabulary_ids:
             return False
-        return MetadataValue.objects.filter(field__name="study_vocabulary.keyword", value__in=study_vocabulary_ids) \
-            .exists()
+        return self.has_metadata_value("study_vocabulary.keyword", study_vocabulary_ids)
 
     @property
     def has_disciplines(self) -> bool:
@@ -73,23 +107,67 @@ class ProductDocument(HarvestDocument):
         publisher_year = self.properties.get("publisher_year")
         if not publisher_year:
             return False
-        return MetadataValue.objects.filter(field__name="publisher_year", value=publisher_year).exists()
+        return self.has_metadata_value("publisher_year", [publisher_year])
 
     def get_analyzer_language(self) -> str:
         return self.metadata["language"]
 
     @staticmethod
-    def update_files_data(data: dict, content_container: ContentContainer,
-                          use_multilingual_fields: bool = False) -> dict:
-        # Prepare lookups
-        file_identities = [
+    def get_file_identities(data: dict) -> list[str]:
+        return [
             f"{data['set']}:{data['external_id']}:{sha1(url.encode('utf-8')).hexdigest()}"
-            for url in data["files"]
+            for url in data.get("files") or []
+        ]
+
+    @staticmethod
+    def load_file_documents(file_identities: Iterable[str]) -> dict[str, FileDocument]:
+        file_documents = list(
+            FileDocument.objects.filter(identity__in=file_identities, is_not_found=False,
+                                        dataset_version__is_current=True)
+        )
+        FileDocument.prefetch_texts(file_documents)
+        return {
+            file_document.identity: file_document
+            for file_document in file_documents
+        }
+
+    @classmethod
+    def prefetch_to_data(cls, instances: list["ProductDocument"]) -> None:
+        # Loads the files of all documents with a single query.
+        # Instances keep their files, which allows to_data calls for different indices to share file data.
+        instance_identities = [cls.get_file_identities(instance.properties) for instance in instances]
+        file_identities = {identity for identities in instance_identities for identity in identities}
+        file_documents = cls.load_file_documents(file_identities) if file_identities else {}
+        for instance, identities in zip(instances, instance_identities):
+            instance.prefetched_file_documents = {
+                identity: file_documents.get(identity)
+                for identity in identities
+            }
+
+    @classmethod
+    def get_file_documents(cls, data: dict,
+                           file_documents: dict[str, FileDocument | None] = None) -> dict[str, FileDocument | None]:
+        # File documents that weren't prefetched get loaded
+        file_documents = dict(file_documents or {})
+        missing_identities = [
+            identity for identity in cls.get_file_identities(data)
+            if identity not in file_documents
         ]
+        if missing_identities:
+            file_documents.update(cls.load_file_documents(missing_identities))
+        return file_documents
+
+    @classmethod
+    def update_files_data(cls, data: dict, content_container: ContentContainer,
+                          use_multilingual_fields: bool = False,
+                          file_documents: dict[str, FileDocument | None] = None) -> dict:
+        # Prepare lookups
+        file_identities = cls.get_file_identities(data)
+        file_documents = cls.get_file_documents(data, file_documents)
         files_by_identity = {
-            file_document.identity: file_document.to_data(use_multilingual_fields=use_multilingual_fields)
-            for file_document in FileDocument.objects.filter(identity__in=file_identities, is_not_found=False,
-                                                             dataset_version__is_current=True)
+            identity: file_documents[identity].to_data(use_multilingual_fields=use_multilingual_fields)
+            for identity in file_identities
+            if file_documents.get(identity) is not None
         }
         prioritized_file_identities = sorted(
             file_identities,
@@ -220,10 +298,57 @@ class ProductDocument(HarvestDocument):
 
     def to_data(self, merge_derivatives: bool = True, for_search: bool = True,
                 use_multilingual_fields: bool = False) -> dict:
-        # Generic transforms
         data = super().to_data(merge_derivatives, use_multilingual_fields)
+        return self.transform_data(data, for_search=for_search, use_multilingual_fields=use_multilingual_fields)
+
+    def to_data_targets(self) -> tuple[dict, dict]:
+        # Transforms run once and the multilingual output gets derived from their result
+        data = super().to_data(use_multilingual_fields=False)
+        multilingual_data = {}
+        data = self.transform_data(data, for_search=True, use_multilingual_fields=False,
+                                   multilingual_target=multilingual_data)
+        return data, multilingual_data
+
+    def build_multilingual_target(self, data: dict, content_container: ContentContainer,
+                                  file_documents: dict[str, FileDocument | None], derivatives_data: dict) -> dict:
+        """
+        Derives the multilingual output from data that got transformed without multilingual fields,
+        before any language dependent transforms happen.
+        Both outputs only differ in providers and in the fields that transform_multilingual_fields sets.
+        """
+        providers = {
+            file_document.properties["srn"]: file_document.metadata["provider"]
+            for file_document in file_documents.values()
+            if file_document is not None
+        }
+        providers[data["srn"]] = self.metadata["provider"]
+        multilingual_data = copy(data)
+        multilingual_data["provider"] = self.metadata["provider"]
+        if "files" in data:
+            multilingual_data["files"] = [
+                {**file_data, "provider": providers.get(file_data.get("srn"), file_data.get("provider"))}
+                for file_data in data["files"]
+            ]
+        # The multilingual output ignores the consortium of learning materials in favour of derivatives data
+        multilingual_data.pop("consortium", None)
+        multilingual_data.update(derivatives_data)
+        multilingual_content = ContentContainer(contents=[
+            replace(content, provider=providers.get(content.srn, content.provider))
+            for content in content_container.contents
+        ])
+        return self.transform_multilingual_fields(multilingual_data, multilingual_content, use_multilingual_fields=True)
+
+    def transform_data(self, data: dict, for_search: bool = True, use_multilingual_fields: bool = False,
+                       multilingual_target: dict = None) -> dict:
+        """
+        Transforms the output of to_data for a single index target.
+        When a multilingual_target is given it gets filled with the multilingual output as well,
+        which prevents running the transforms a second time.
+        """
         source, set_name = data["set"].split(":")
         data["harvest_source"] = set_name
+        # Derivatives data that learning materials may overwrite
+        derivatives_data = {"consortium": data["consortium"]} if "consortium" in data else {}
         # Add content of the product to a ContentContainer
         product_content = Content(
             srn=data["srn"],
@@ -235,8 +360,11 @@ class ProductDocument(HarvestDocument):
         )
         content_container = ContentContainer(contents=[product_content])
         # Transforms based on the files as well as content preparation
+        file_documents = {}
         if len(data["files"]):
-            data = self.update_files_data(data, content_container, use_multilingual_fields)
+            file_documents = self.get_file_documents(data, self.prefetched_file_documents)
+            data = self.update_files_data(data, content_container, use_multilingual_fields,
+                                          file_documents=file_documents)
         else:
             data.update({
                 "url": None, "mime_type": None, "previews": None, "video": None,
@@ -254,12 +382,19 @@ class ProductDocument(HarvestDocument):
             research_product.pop("parties", None)  # parties equals publishers for now and we ignore parties
             data.update(research_product)
         # Index related transforms
+        if multilingual_target is not None:
+            multilingual_target.update(
+                self.build_multilingual_target(data, content_container, file_documents, derivatives_data)
+            )
         data = self.transform_multilingual_fields(
             data, content_container,
             use_multilingual_fields=use_multilingual_fields
         )
         if for_search:
             data = self.transform_search_data(data, content_container)
+            if multilingual_target is not None:  # suggestions are the same for both targets
+                multilingual_target["suggest_phrase"] = data["suggest_phrase"]
+                multilingual_target["suggest_completion"] = data["suggest_completion"]
         # Done
         return data
 
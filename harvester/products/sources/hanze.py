@@ -57,4 +57,5 @@ class HanzeProductExtractor(PureProductExtraction):
 OBJECTIVE = build_objective(HanzeProductExtractor, "hanze:hanze")
 
 
-SEEDING_PHASES = build_seeding_phases(HanzeResearchObjectResource, OBJECTIVE)
+# Hanze pages are offsets of a known total, which allows fetching a few pages in parallel
+SEEDING_PHASES = build_seeding_phases(HanzeResearchObjectResource, OBJECTIVE, concurrency=3)
@@ -210,6 +210,7 @@ SEEDING_PHASES = [
             "method": "get",
             "args": [],
             "kwargs": {},
+            "concurrency": 4,  # Sharekit pages are numbered, which allows fetching a few pages in parallel
         },
         "contribute_data": {
             "objective": OBJECTIVE
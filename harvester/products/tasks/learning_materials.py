@@ -3,8 +3,8 @@ from celery import current_app as app
 
 from harvester.tasks.base import DatabaseConnectionResetTask
 from core.loading import load_harvest_models
-from metadata.models import MetadataValue
 from metadata.utils.operations import normalize_field_values
+from metadata.utils.vocabulary import get_vocabulary
 
 
 @app.task(name="lookup_study_vocabulary_parents", base=DatabaseConnectionResetTask)
@@ -12,16 +12,13 @@ from metadata.utils.operations import normalize_field_values
 def lookup_study_vocabulary_parents(app_label: str, document_ids: list[int]) -> None:
     models = load_harvest_models(app_label)
     Document = models["Document"]
+    vocabulary = get_vocabulary("study_vocabulary")
     for document in Document.objects.filter(id__in=document_ids).select_for_update():
-        metadata_values = MetadataValue.objects.select_related("translation").filter(
-            value__in=document.properties["learning_material"]["study_vocabulary"],
-            field__name="study_vocabulary"
-        )
         study_vocabulary_ids = set()
         study_vocabulary_nl = set()
         study_vocabulary_en = set()
-        for metadata_value in metadata_values:
-            for ancestor in metadata_value.get_ancestors(include_self=True):
+        for value in document.properties["learning_material"]["study_vocabulary"]:
+            for ancestor in vocabulary.get_ancestors(value, include_self=True):
                 study_vocabulary_ids.add(ancestor.value)
                 study_vocabulary_nl.add(ancestor.translation.nl)
                 study_vocabulary_en.add(ancestor.translation.en)
@@ -75,11 +72,9 @@ def normalize_disciplines(app_label: str, document_ids: list[int]) -> None:
 def lookup_consortium_translations(app_label: str, document_ids: list[int]) -> None:
     models = load_harvest_models(app_label)
     Document = models["Document"]
+    vocabulary = get_vocabulary("consortium.keyword")
     for document in Document.objects.filter(id__in=document_ids).select_for_update():
-        consortium_value = MetadataValue.objects \
-            .select_related("translation") \
-            .filter(value=document.properties["learning_material"]["consortium"], field__name="consortium.keyword") \
-            .last()
+        consortium_value = vocabulary.get(document.properties["learning_material"]["consortium"])
         default_consortium = document.properties.get("learning_material").get("consortium")
         document.derivatives["lookup_consortium_translations"] = {
             "consortium": {
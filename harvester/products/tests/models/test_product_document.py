@@ -1,5 +1,8 @@
+from unittest.mock import patch
+
 from django.test import TestCase, override_settings
 
+from testing.utils.factories import create_datatype_models
 from products.models import ProductDocument
 from files.models import FileDocument
 
@@ -418,3 +421,71 @@ class FileDocumentTestCase(TestCase):
                 "contents": []
             }
         })
+
+    def test_prefetch_to_data(self):
+        products = list(ProductDocument.objects.all())
+        expected_data = [
+            (product.to_data(use_multilingual_fields=False), product.to_data(use_multilingual_fields=True))
+            for product in products
+        ]
+        products = list(ProductDocument.objects.all())
+        with self.assertNumQueries(1):
+            ProductDocument.prefetch_to_data(products)
+        with self.assertNumQueries(0):
+            data = [
+                (product.to_data(use_multilingual_fields=False), product.to_data(use_multilingual_fields=True))
+                for product in products
+            ]
+        self.assertEqual(data, expected_data, "Expected prefetching to not influence output of to_data")
+
+    def test_to_search_targets(self):
+        for product in ProductDocument.objects.all():
+            language = product.get_analyzer_language()
+            self.assertEqual(product.to_search_targets(), [
+                (language, product.to_search(use_multilingual_fields=False)),
+                ("all", product.to_search(use_multilingual_fields=True)),
+            ])
+        product.state = ProductDocument.States.DELETED
+        self.assertEqual(product.to_search_targets(), [
+            (language, {"_id": product.properties["srn"], "_op_type": "delete"}),
+            ("all", {"_id": product.properties["srn"], "_op_type": "delete"}),
+        ])
+
+    def test_to_search_targets_transforms(self):
+        products = list(ProductDocument.objects.all())
+        transform_data = ProductDocument.transform_data
+        with patch.object(ProductDocument, "transform_data", autospec=True,
+                          side_effect=transform_data) as transform_mock:
+            for product in products:
+                product.to_search_targets()
+        self.assertEqual(transform_mock.call_count, len(products), "Expected transforms to run once per document")
+
+
+class TestProductDocumentPendingTasks(TestCase):
+
+    fixtures = ["test-metadata-edusources"]
+
+    def setUp(self) -> None:
+        super().setUp()
+        seeds = [
+            {"state": "active", "external_id": 1, "set": "surf:testing", "publisher_year": 2022},
+            {"state": "active", "external_id": 2, "set": "surf:testing", "publisher_year": 1500},
+            {"state": "active", "external_id": 3, "set": "surf:testing", "publisher_year": None},
+        ]
+        self.dataset, self.dataset_version, self.sets, self.documents = create_datatype_models(
+            "products", ["surf:testing"],
+            seeds, len(seeds)
+        )
+
+    def test_get_bulk_pending_tasks(self):
+        documents = ProductDocument.objects.filter(id__in=[doc.id for doc in self.documents])
+        with self.assertNumQueries(2):  # one to load documents and one to load all metadata values
+            pending_tasks = ProductDocument.get_bulk_pending_tasks(documents)
+        for document in ProductDocument.objects.filter(id__in=[doc.id for doc in self.documents]):
+            self.assertEqual(pending_tasks[document.id], document.get_pending_tasks())
+        known_year_document = ProductDocument.objects.get(identity="surf:testing:1")
+        self.assertIn("normalize_publisher_year", pending_tasks[known_year_document.id])
+        unknown_year_document = ProductDocument.objects.get(identity="surf:testing:2")
+        self.assertNotIn("normalize_publisher_year", pending_tasks[unknown_year_document.id])
+        no_year_document = ProductDocument.objects.get(identity="surf:testing:3")
+        self.assertNotIn("normalize_publisher_year", pending_tasks[no_year_document.id])
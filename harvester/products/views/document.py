@@ -35,6 +35,7 @@ class RawProductListView(DatasetVersionDocumentListView):
     This endpoint is mostly meant for debugging purposes.
     """
     serializer_class = RawProductDocumentSerializer
+    document_projection = "raw"
 
 
 class MetadataProductListView(DatasetVersionDocumentListView):
@@ -43,6 +44,7 @@ class MetadataProductListView(DatasetVersionDocumentListView):
     This is useful for things like a sitemap where only the metadata is important.
     """
     serializer_class = MetadataProductDocumentSerializer
+    document_projection = "metadata"
     exclude_deletes_unless_modified_since_filter = True
 
 
@@ -53,6 +55,7 @@ class RawProductDetailView(DatasetVersionDocumentDetailView):
     This endpoint is mostly meant for debugging purposes.
     """
     serializer_class = RawProductDocumentSerializer
+    document_projection = "raw"
 
 
 class MetadataProductDetailView(DatasetVersionDocumentDetailView):
@@ -61,6 +64,7 @@ class MetadataProductDetailView(DatasetVersionDocumentDetailView):
     but it only returns the metadata. This is useful for things like a sitemap where only the metadata is important.
     """
     serializer_class = MetadataProductDocumentSerializer
+    document_projection = "metadata"
     exclude_deletes_unless_modified_since_filter = True
 
 
@@ -104,6 +104,10 @@ SEEDING_PHASES = [
         "phase": "details",
         "strategy": "merge",
         "batch_size": None,
+        # The ids phase gives no signal for changed projects.
+        # Details of a (daily) harvest get reused by the next harvest and are refreshed by the harvest after that,
+        # which keeps details at most one harvest interval behind.
+        "merge_index_max_age": {"hours": 36},
         "retrieve_data": {
             "resource": "projects.siaprojectdetailsresource",
             "method": "get",
@@ -111,6 +115,7 @@ SEEDING_PHASES = [
                 "$.merge_id"
             ],
             "kwargs": {},
+            "concurrency": 5
         },
         "contribute_data": {
             "merge_on": "merge_id",
@@ -34,6 +34,7 @@ class RawProjectListView(DatasetVersionDocumentListView):
     This endpoint is mostly meant for debugging purposes.
     """
     serializer_class = RawProjectDocumentSerializer
+    document_projection = "raw"
 
 
 class MetadataProjectListView(DatasetVersionDocumentListView):
@@ -42,6 +43,7 @@ class MetadataProjectListView(DatasetVersionDocumentListView):
     This is useful for things like a sitemap where only the metadata is important.
     """
     serializer_class = MetadataProjectDocumentSerializer
+    document_projection = "metadata"
     exclude_deletes_unless_modified_since_filter = True
 
 
@@ -52,6 +54,7 @@ class RawProjectDetailView(DatasetVersionDocumentDetailView):
     This endpoint is mostly meant for debugging purposes.
     """
     serializer_class = RawProjectDocumentSerializer
+    document_projection = "raw"
 
 
 class MetadataProjectDetailView(DatasetVersionDocumentDetailView):
@@ -60,6 +63,7 @@ class MetadataProjectDetailView(DatasetVersionDocumentDetailView):
     but it only returns the metadata. This is useful for things like a sitemap where only the metadata is important.
     """
     serializer_class = MetadataProjectDocumentSerializer
+    document_projection = "metadata"
     exclude_deletes_unless_modified_since_filter = True
 
 
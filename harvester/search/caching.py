@@ -0,0 +1,111 @@
+import json
+from typing import Any, Callable
+from uuid import uuid4
+from hashlib import sha1
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import caches, BaseCache
+
+
+SEARCH_CACHE_VERSION_KEY = "search:version"
+
+
+def get_search_cache() -> BaseCache:
+    return caches[settings.SEARCH_CACHE_ALIAS]
+
+
+def get_promoted_index_names() -> list[str]:
+    """
+    Returns the remote names of all indices that have been promoted for a DatasetVersion of any harvested entity.
+    """
+    OpenSearchIndex = apps.get_model("search.OpenSearchIndex")
+    index_ids = set()
+    for app_config in apps.get_app_configs():
+        if not hasattr(app_config, "document_model") or app_config.label == "core":
+            continue
+        DatasetVersion = apps.get_model(f"{app_config.label}.DatasetVersion")
+        index_ids.update(
+            DatasetVersion.objects.filter(is_index_promoted=True, index__isnull=False)
+            .values_list("index_id", flat=True)
+        )
+    return sorted(index.get_remote_name() for index in OpenSearchIndex.objects.filter(id__in=index_ids))
+
+
+def build_search_cache_version() -> str:
+    # The random part makes sure that a new version gets used when promoted indices receive new data
+    promoted_index_names = ",".join(get_promoted_index_names())
+    return sha1(f"{promoted_index_names}:{uuid4().hex}".encode("utf-8")).hexdigest()
+
+
+def get_search_cache_version() -> str:
+    cache = get_search_cache()
+    version = cache.get(SEARCH_CACHE_VERSION_KEY)
+    if version is None:
+        cache.add(SEARCH_CACHE_VERSION_KEY, build_search_cache_version(), timeout=None)
+        version = cache.get(SEARCH_CACHE_VERSION_KEY, "")
+    return version
+
+
+def invalidate_search_cache() -> None:
+    """
+    Switches to a new cache version, which makes all earlier cached responses unreachable until they expire.
+    """
+    get_search_cache().set(SEARCH_CACHE_VERSION_KEY, build_search_cache_version(), timeout=None)
+
+
+def get_search_cache_key(endpoint: str, parameters: dict) -> str:
+    parameters = {
+        "platform": settings.PLATFORM.value,
+        "alias_prefix": settings.OPENSEARCH_ALIAS_PREFIX,
+        **parameters
+    }
+    parameters_hash = sha1(json.dumps(parameters, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+    return f"search:{endpoint}:{get_search_cache_version()}:{parameters_hash}"
+
+
+def record_search_cache_metric(endpoint: str, metric: str) -> None:
+    cache = get_search_cache()
+    key = f"search:metrics:{endpoint}:{metric}"
+    try:
+        cache.incr(key)
+    except ValueError:  # the metric doesn't exist yet
+        cache.add(key, 1, timeout=None)
+
+
+def get_search_cache_metrics() -> dict[str, dict]:
+    cache = get_search_cache()
+    metrics = {}
+    for endpoint in settings.SEARCH_CACHE_TIMEOUTS.keys():
+        hits = cache.get(f"search:metrics:{endpoint}:hits", 0)
+        misses = cache.get(f"search:metrics:{endpoint}:misses", 0)
+        metrics[endpoint] = {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / (hits + misses) if hits + misses else None
+        }
+    return metrics
+
+
+def get_cached_response_data(endpoint: str, parameters: dict, build_response_data: Callable[[], Any]) -> Any:
+    """
+    Returns response data for an endpoint from the search cache or builds and caches the data when it's missing.
+
+    :param endpoint: the name of the endpoint, which should be a key of SEARCH_CACHE_TIMEOUTS
+    :param parameters: the normalized request parameters that determine the response
+    :param build_response_data: a function without arguments that returns the (serializable) response data
+    :return: response data
+    """
+    timeout = settings.SEARCH_CACHE_TIMEOUTS.get(endpoint)
+    if not timeout:
+        return build_response_data()
+    cache = get_search_cache()
+    key = get_search_cache_key(endpoint, parameters)
+    response_data = cache.get(key)
+    if response_data is not None:
+        record_search_cache_metric(endpoint, "hits")
+        return response_data
+    record_search_cache_metric(endpoint, "misses")
+    response_data = build_response_data()
+    cache.set(key, response_data, timeout=timeout)
+    return response_data
@@ -1,4 +1,6 @@
+import os
 from typing import Type
+from threading import Lock
 
 from django.conf import settings
 from rest_framework.serializers import Serializer
@@ -21,12 +23,40 @@ def prepare_results_for_response(models: list[BaseModel], serializers: dict[Enti
     return results
 
 
-def get_opensearch_client() -> OpenSearch:
-    host = settings.OPENSEARCH_HOST
+_opensearch_clients: dict[tuple, OpenSearch] = {}
+_opensearch_clients_lock = Lock()
+
+
+def _reset_opensearch_clients() -> None:
+    # Forked processes (like Celery workers) shouldn't share connections or locks with their parent
+    global _opensearch_clients_lock
+    _opensearch_clients.clear()
+    _opensearch_clients_lock = Lock()
+
+
+os.register_at_fork(after_in_child=_reset_opensearch_clients)
+
+
+def get_opensearch_client(host: str = None, password: str = None) -> OpenSearch:
+    """
+    Returns the OpenSearch client of this process for the configured host, or for the given host and password.
+    The client gets created when first needed and is reused afterwards,
+    which keeps HTTP connections alive in the connection pool of the client.
+    """
+    if host is None:
+        host = settings.OPENSEARCH_HOST
+        password = settings.OPENSEARCH_PASSWORD
     http_auth = None
     if "amazonaws.com" in host:
-        http_auth = ("supersurf", settings.OPENSEARCH_PASSWORD)
-    return OpenSearchClientBuilder.from_host(host, http_auth).build()
+        http_auth = ("supersurf", password)
+    client_key = (host, http_auth,)
+    client = _opensearch_clients.get(client_key)
+    if client is not None:
+        return client
+    with _opensearch_clients_lock:
+        if client_key not in _opensearch_clients:
+            _opensearch_clients[client_key] = OpenSearchClientBuilder.from_host(host, http_auth).build()
+        return _opensearch_clients[client_key]
 
 
 def get_search_client(configuration: SearchConfiguration = None, presets: list[str] = None) -> SearchClient:
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from search.caching import get_search_cache_metrics, invalidate_search_cache
+
+
+class Command(BaseCommand):
+    """
+    Prints hits, misses and hit rates of cached search responses per endpoint.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument('-i', '--invalidate', action="store_true")
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{'endpoint':<20}{'hits':>10}{'misses':>10}{'hit_rate':>10}")
+        for endpoint, metrics in get_search_cache_metrics().items():
+            hit_rate = f"{metrics['hit_rate']:.2f}" if metrics["hit_rate"] is not None else "-"
+            self.stdout.write(f"{endpoint:<20}{metrics['hits']:>10}{metrics['misses']:>10}{hit_rate:>10}")
+        if options["invalidate"]:
+            invalidate_search_cache()
+            self.stdout.write("Invalidated cached search responses")
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.15 on 2026-10-18 12:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('search', '0002_multi_entity_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='opensearchindex',
+            name='change_cursor',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+    ]
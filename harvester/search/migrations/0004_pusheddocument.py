@@ -0,0 +1,27 @@
+# Generated by Django 4.2.15 on 2026-10-18 13:20
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('search', '0003_opensearchindex_change_cursor'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PushedDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('language', models.CharField(max_length=10)),
+                ('document_id', models.CharField(max_length=255)),
+                ('payload_hash', models.CharField(max_length=40)),
+                ('index', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='pushed_documents', to='search.opensearchindex')),
+            ],
+            options={
+                'unique_together': {('index', 'language', 'document_id')},
+            },
+        ),
+    ]
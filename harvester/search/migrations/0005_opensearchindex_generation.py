@@ -0,0 +1,18 @@
+# Generated by Django 4.2.15 on 2026-10-18 15:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('search', '0004_pusheddocument'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='opensearchindex',
+            name='generation',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -1,17 +1,24 @@
 from __future__ import annotations
 
+import json
+from copy import deepcopy
+from typing import Iterator
+from hashlib import sha1
 from datetime import datetime
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 
 from django.conf import settings
 from django.db import models
 from django.utils.timezone import make_aware
-from opensearchpy.helpers import streaming_bulk
+from opensearchpy import OpenSearch
+from opensearchpy.helpers import parallel_bulk
 from opensearchpy.exceptions import NotFoundError
 
 from search_client.opensearch.indices import build_products_index_configuration
 from search_client.opensearch.indices.legacy import create_open_search_index_configuration
 from search.clients import get_opensearch_client
+from search.caching import invalidate_search_cache
 
 
 class OpenSearchIndex(models.Model):
@@ -24,6 +31,8 @@ class OpenSearchIndex(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     modified_at = models.DateTimeField(auto_now=True)
     pushed_at = models.DateTimeField(null=True, blank=True)
+    change_cursor = models.BigIntegerField(null=True, blank=True)  # last IndexingChange that got pushed
+    generation = models.PositiveIntegerField(default=0)  # increments with every rebuild of the remotes
 
     @classmethod
     def build(cls, app_label: str, dataset: str, version: str) -> OpenSearchIndex:
@@ -36,7 +45,13 @@ class OpenSearchIndex(models.Model):
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self.client = get_opensearch_client()
+        self.skipped_count = 0  # amount of unchanged search documents that the last push didn't send
+        self.sent_count = 0  # amount of search documents that the last push did send
+
+    @property
+    def client(self) -> OpenSearch:
+        # Loading instances shouldn't connect to OpenSearch, so we get the shared client only when it's needed
+        return get_opensearch_client()
 
     def delete(self, using=None, keep_parents=False):
         """
@@ -50,8 +65,11 @@ class OpenSearchIndex(models.Model):
             self.client.indices.delete(index=self.get_remote_name())
         super().delete(using=using, keep_parents=keep_parents)
 
-    def get_remote_name(self, language: str = None) -> str:
+    def get_remote_name(self, language: str = None, generation: int = None) -> str:
         name = self.name
+        generation = self.generation if generation is None else generation
+        if generation:
+            name += f"-g{generation}"
         if language and language != "all":
             name += f"-{language}"
         return name.replace(".", "")
@@ -69,47 +87,254 @@ class OpenSearchIndex(models.Model):
         remote_name = self.get_remote_name(language)
         return self.client.indices.exists(remote_name)
 
-    def prepare_push(self, recreate: bool = None) -> None:
+    def prepare_push(self, recreate: bool = None) -> list[str]:
+        """
+        Prepares the remotes of this index for a push and creates remotes that don't exist.
+        Returns the languages of remotes that got created, which are empty and need all documents.
+        """
         # Set the state of this instance
         if recreate:
             self.configuration = {}
             self.error_count = 0
+            self.change_cursor = None
+            if self.id:
+                self.pushed_documents.all()._raw_delete("default")
         self.clean()
         self.save()
         # Guarantee that the remotes exist.
-        for remote_name in self.get_remote_names():
-            # As long as we support indices per language we need to defer the language from remote name.
-            # This is expected to get deprecated soon.
-            language_postfix = remote_name.replace(
-                self.name.replace(".", ""), ""
-            )
-            language = language_postfix[1:] if language_postfix else "all"
-            # Actual checks and creation of remotes
+        created_languages = []
+        for language in [*settings.OPENSEARCH_LANGUAGE_CODES, "all"]:
+            remote_name = self.get_remote_name(language)
             remote_exists = self.client.indices.exists(remote_name)
             if remote_exists and recreate:
                 self.client.indices.delete(index=remote_name)
             if remote_exists and recreate or not remote_exists:
                 self.client.indices.create(index=remote_name, body=self.configuration.get(language, "unk"))
+                created_languages.append(language)
+        # The ledger shouldn't skip documents for remotes that were created empty
+        if created_languages and not recreate:
+            self.pushed_documents.filter(language__in=created_languages)._raw_delete("default")
+            self.change_cursor = None
+            self.save()
+        return created_languages
 
-    def push(self, search_documents: list[tuple[str, dict]], request_timeout=300, is_done: bool = True) -> list[str]:
-        current_time = make_aware(datetime.now())
+    def get_build_configuration(self, language: str) -> dict:
+        """
+        Returns the index configuration for a language with replicas and refreshes disabled for bulk loading.
+        """
+        configuration = deepcopy(self.configuration.get(language, {}))
+        index_settings = configuration.setdefault("settings", {})
+        index_settings = index_settings.get("index", index_settings)
+        index_settings["number_of_replicas"] = 0
+        index_settings["refresh_interval"] = "-1"
+        return configuration
+
+    def get_serving_settings(self, language: str) -> dict:
+        """
+        Returns the replica and refresh settings for a language from the configuration.
+        Settings that are not configured become None, which resets them to the OpenSearch defaults.
+        """
+        index_settings = self.configuration.get(language, {}).get("settings", {})
+        index_settings = index_settings.get("index", index_settings)
+        return {
+            "index": {
+                "number_of_replicas": index_settings.get("number_of_replicas"),
+                "refresh_interval": index_settings.get("refresh_interval"),
+            }
+        }
+
+    def prepare_build(self) -> int:
+        """
+        Creates the remotes for the next generation of this index, while the current generation keeps serving.
+        The new remotes have replicas and refreshes disabled until finish_build gets called.
+        The ledger gets cleared, because it should describe the new remotes once the build is done.
+        Returns the generation that is being built.
+        """
+        generation = self.generation + 1
+        self.configuration = {}
+        self.error_count = 0
+        self.clean()
+        self.save()
+        self.pushed_documents.all()._raw_delete("default")
+        for language in [*settings.OPENSEARCH_LANGUAGE_CODES, "all"]:
+            remote_name = self.get_remote_name(language, generation)
+            if self.client.indices.exists(remote_name):  # residue from a build that didn't finish
+                self.client.indices.delete(index=remote_name)
+            self.client.indices.create(index=remote_name, body=self.get_build_configuration(language))
+        return generation
+
+    def finish_build(self, generation: int) -> None:
+        for language in [*settings.OPENSEARCH_LANGUAGE_CODES, "all"]:
+            self.client.indices.put_settings(
+                index=self.get_remote_name(language, generation),
+                body=self.get_serving_settings(language)
+            )
+
+    def abort_build(self, generation: int) -> None:
+        for language in [*settings.OPENSEARCH_LANGUAGE_CODES, "all"]:
+            remote_name = self.get_remote_name(language, generation)
+            if self.client.indices.exists(remote_name):
+                self.client.indices.delete(index=remote_name)
+
+    def swap_generation(self, generation: int) -> None:
+        """
+        Moves all aliases from the current remotes to the remotes of given generation in a single atomic request.
+        Afterwards the remotes of the current generation get deleted and given generation becomes current.
+        """
+        actions = []
+        previous_remote_names = []
+        for language in [*settings.OPENSEARCH_LANGUAGE_CODES, "all"]:
+            previous_remote_name = self.get_remote_name(language)
+            remote_name = self.get_remote_name(language, generation)
+            if previous_remote_name == remote_name or not self.client.indices.exists(previous_remote_name):
+                continue
+            previous_remote_names.append(previous_remote_name)
+            try:
+                aliases = self.client.indices.get_alias(index=previous_remote_name)
+            except NotFoundError:
+                continue
+            for alias in aliases.get(previous_remote_name, {}).get("aliases", {}):
+                actions += [
+                    {"remove": {"index": previous_remote_name, "alias": alias}},
+                    {"add": {"index": remote_name, "alias": alias}},
+                ]
+        if actions:
+            self.client.indices.update_aliases(body={"actions": actions})
+            invalidate_search_cache()
+        for previous_remote_name in previous_remote_names:
+            self.client.indices.delete(index=previous_remote_name)
+        self.generation = generation
+        self.save()
+
+    def push_remote(self, remote_name: str, documents: list[dict], request_timeout: int = 300) -> list[dict]:
         errors = []
+        for is_ok, result in parallel_bulk(self.client, documents, index=remote_name,
+                                           thread_count=settings.OPENSEARCH_BULK_THREAD_COUNT,
+                                           chunk_size=settings.OPENSEARCH_BULK_CHUNK_SIZE,
+                                           max_chunk_bytes=settings.OPENSEARCH_BULK_MAX_CHUNK_BYTES,
+                                           raise_on_error=False, raise_on_exception=False,
+                                           request_timeout=request_timeout):
+            if not is_ok:
+                errors.append(result)
+        return errors
+
+    def send(self, search_documents: list[tuple[str, dict]], request_timeout: int = 300,
+             generation: int = None) -> list[dict]:
+        """
+        Sends documents to their remotes without touching the database, which makes it safe to call from a thread.
+        Every remote gets its documents concurrently with the other remotes.
+        Remotes of the current generation receive the documents, unless another generation is given.
+        """
         search_documents_by_language = defaultdict(list)
         for language, search_document in search_documents:
             search_documents_by_language[language].append(search_document)
-        for language, documents in search_documents_by_language.items():
-            remote_name = self.get_remote_name(language)
-            for is_ok, result in streaming_bulk(self.client, documents, index=remote_name,
-                                                chunk_size=100, yield_ok=False, raise_on_error=False,
-                                                request_timeout=request_timeout):
-                if not is_ok:
-                    self.error_count += 1
-                    errors.append(result)
+        if not search_documents_by_language:
+            return []
+        with ThreadPoolExecutor(max_workers=len(search_documents_by_language)) as executor:
+            futures = [
+                executor.submit(
+                    self.push_remote, self.get_remote_name(language, generation), documents, request_timeout
+                )
+                for language, documents in search_documents_by_language.items()
+            ]
+            return [error for future in futures for error in future.result()]
+
+    @staticmethod
+    def hash_search_document(search_document: dict) -> str:
+        search_document_string = json.dumps(search_document, sort_keys=True, default=str)
+        return sha1(search_document_string.encode("utf-8")).hexdigest()
+
+    def filter_unchanged(self, search_documents: list[tuple[str, dict]]) -> tuple[list[tuple[str, dict]], dict]:
+        """
+        Removes search documents that were pushed before with identical content, according to the ledger.
+        Deletes are never removed. Returns the remaining search documents and their hashes for the ledger.
+        """
+        hashes = {
+            (language, search_document["_id"]): self.hash_search_document(search_document)
+            for language, search_document in search_documents
+            if search_document.get("_op_type") != "delete"
+        }
+        pushed_hashes = {
+            (language, document_id): payload_hash
+            for language, document_id, payload_hash in self.pushed_documents
+            .filter(document_id__in={document_id for language, document_id in hashes.keys()})
+            .values_list("language", "document_id", "payload_hash")
+        }
+        changed_documents = [
+            (language, search_document)
+            for language, search_document in search_documents
+            if search_document.get("_op_type") == "delete" or
+            pushed_hashes.get((language, search_document["_id"])) != hashes[(language, search_document["_id"])]
+        ]
+        changed_hashes = {
+            key: payload_hash
+            for key, payload_hash in hashes.items() if pushed_hashes.get(key) != payload_hash
+        }
+        return changed_documents, changed_hashes
+
+    def update_ledger(self, search_documents: list[tuple[str, dict]], hashes: dict, errors: list[dict]) -> None:
+        failed_ids = {
+            result.get("_id")
+            for error in errors
+            for result in error.values() if isinstance(result, dict)
+        }
+        deleted_ids = {
+            search_document["_id"] for language, search_document in search_documents
+            if search_document.get("_op_type") == "delete" and search_document["_id"] not in failed_ids
+        }
+        if deleted_ids:
+            self.pushed_documents.filter(document_id__in=deleted_ids).delete()
+        PushedDocument.objects.bulk_create(
+            [
+                PushedDocument(index=self, language=language, document_id=document_id, payload_hash=payload_hash)
+                for (language, document_id), payload_hash in hashes.items()
+                if document_id not in failed_ids
+            ],
+            update_conflicts=True,
+            unique_fields=["index", "language", "document_id"],
+            update_fields=["payload_hash"]
+        )
+
+    def push(self, search_documents: list[tuple[str, dict]], request_timeout=300, is_done: bool = True) -> list[str]:
+        return self.push_batches([search_documents], request_timeout=request_timeout, is_done=is_done)
+
+    def push_batches(self, search_document_batches: Iterator[list[tuple[str, dict]]], request_timeout=300,
+                     is_done: bool = True, generation: int = None) -> list[str]:
+        """
+        Pushes batches of documents while the next batch gets prepared.
+        The batches iterator runs in the calling thread, so it may load from the database.
+        At most one batch is in flight while the next batch gets serialized.
+        Documents that are unchanged since their last push get skipped and are counted by skipped_count.
+        Documents that do get sent are counted by sent_count.
+        A generation can be given to push to remotes that are being built by prepare_build.
+        """
+        current_time = make_aware(datetime.now())
+        errors = []
+        self.skipped_count = 0
+        self.sent_count = 0
+        in_flight = None
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            for search_documents in search_document_batches:
+                changed_documents, hashes = self.filter_unchanged(search_documents)
+                self.skipped_count += len(search_documents) - len(changed_documents)
+                self.sent_count += len(changed_documents)
+                future = executor.submit(self.send, changed_documents, request_timeout, generation)
+                if in_flight is not None:
+                    errors += self._finish_batch(*in_flight)
+                in_flight = (future, changed_documents, hashes,)
+            if in_flight is not None:
+                errors += self._finish_batch(*in_flight)
+        self.error_count += len(errors)
         self.pushed_at = current_time
         if is_done:
             self.save()
         return errors
 
+    def _finish_batch(self, future, search_documents: list[tuple[str, dict]], hashes: dict) -> list[dict]:
+        batch_errors = future.result()
+        self.update_ledger(search_documents, hashes, batch_errors)
+        return batch_errors
+
     def promote_all_to_latest(self) -> None:
         # The legacy language indices we only create for products
         if self.entity in ["products", "testing"]:
@@ -117,6 +342,8 @@ class OpenSearchIndex(models.Model):
                 self.promote_language_index_to_latest(language)
         # New style indices are created for all entities
         self.promote_to_latest()
+        # Responses from the previous indices are no longer valid
+        invalidate_search_cache()
 
     def promote_language_index_to_latest(self, language: str) -> None:
         alias_prefix, dataset_info = self.name.split("--")
@@ -186,3 +413,18 @@ class OpenSearchIndex(models.Model):
             settings.DOCUMENT_TYPE,
             decompound_word_list=decompound_word_list
         )
+
+
+class PushedDocument(models.Model):
+    """
+    A ledger entry with the hash of a search document as it was last pushed to a remote of an OpenSearchIndex.
+    Pushes use the ledger to skip documents that remotes already hold.
+    """
+
+    index = models.ForeignKey(OpenSearchIndex, on_delete=models.CASCADE, related_name="pushed_documents")
+    language = models.CharField(max_length=10)
+    document_id = models.CharField(max_length=255)
+    payload_hash = models.CharField(max_length=40)
+
+    class Meta:
+        unique_together = ("index", "language", "document_id",)
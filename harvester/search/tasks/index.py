@@ -1,6 +1,8 @@
+from typing import Iterator
 from datetime import datetime
 
 from django.apps import apps
+from django.conf import settings
 from django.db.transaction import atomic, DatabaseError
 from django.utils.timezone import make_aware
 from celery import current_app as app
@@ -8,14 +10,25 @@ from celery import current_app as app
 from datagrowth.utils.iterators import ibatch
 from harvester.tasks.base import DatabaseConnectionResetTask
 from core.logging import HarvestLogger
+from core.models import IndexingChange
 from core.models.datatypes import HarvestDatasetVersion, HarvestDocument
 from search.loading import load_data_models
 from search.models import OpenSearchIndex
+from search.caching import invalidate_search_cache
+
+
+def _iterate_search_document_batches(documents, batch_size: int) -> Iterator[list[tuple[str, dict]]]:
+    for batch in ibatch(documents.projection("index").iterator(), batch_size):
+        type(batch[0]).prefetch_to_data(batch)
+        search_document_batch = []
+        for document in batch:
+            search_document_batch += document.to_search_targets()
+        yield search_document_batch
 
 
 def _push_dataset_version_to_index(dataset_version: HarvestDatasetVersion, logger: HarvestLogger,
                                    recreate: bool = False, push_since: datetime = None,
-                                   batch_size: int = 100, context: str = None) -> OpenSearchIndex | None:
+                                   batch_size: int = 500, context: str = None) -> OpenSearchIndex | None:
     # Prepare variables.
     errors = []
     current_time = make_aware(datetime.now())
@@ -23,25 +36,106 @@ def _push_dataset_version_to_index(dataset_version: HarvestDatasetVersion, logge
         with atomic():
             # Load the relevant index and prepare loading Documents.
             index = OpenSearchIndex.objects.select_for_update(nowait=True).get(id=dataset_version.index.id)
-            push_since = push_since or index.pushed_at
-            # See if any Documents match the criteria for pushing to indices.
-            filters = {"metadata__modified_at__gte": push_since} if push_since else {}
-            if recreate:
-                filters["state"] = HarvestDocument.States.ACTIVE
-            documents = dataset_version.documents.filter(**filters)
-            if not documents.exists():
-                return
+            last_change_id = IndexingChange.objects.get_last_id()
+            if not recreate and push_since is None and index.change_cursor is not None:
+                # Incremental pushes only load Documents that have changes after the cursor of the index.
+                changes = IndexingChange.objects.get_changes(dataset_version, index.change_cursor, last_change_id)
+                if not changes.exists():
+                    return
+                documents = dataset_version.documents.filter(id__in=changes.values("document_id"))
+            else:
+                push_since = push_since or index.pushed_at
+                # See if any Documents match the criteria for pushing to indices.
+                filters = {"metadata__modified_at__gte": push_since} if push_since else {}
+                if recreate:
+                    filters["state"] = HarvestDocument.States.ACTIVE
+                documents = dataset_version.documents.filter(**filters)
+                if not documents.exists():
+                    return
             # Preparation and batching of documents to push to relevant indices.
-            index.prepare_push(recreate=recreate)
-            for batch in ibatch(documents.iterator(), batch_size):
-                search_document_batch = []
-                for document in batch:
-                    language = document.get_analyzer_language()
-                    search_document_batch.append((language, document.to_search(use_multilingual_fields=False)))
-                    search_document_batch.append(("all", document.to_search(use_multilingual_fields=True)))
-                errors += index.push(search_document_batch, is_done=False)
+            # Pushing a batch to the indices happens while the next batch gets serialized.
+            created_languages = index.prepare_push(recreate=recreate)
+            if created_languages and not recreate:
+                # Remotes that got created are empty and need all Documents instead of only changed Documents
+                documents = dataset_version.documents.all()
+            errors += index.push_batches(_iterate_search_document_batches(documents, batch_size), is_done=False)
             # All documents have been pushed. We'll mark the push as done.
             index.pushed_at = current_time
+            index.change_cursor = last_change_id
+            index.save()
+    except DatabaseError:
+        index = None
+        message_context = "" if not context else f"for {context}"
+        logger.warning(f"Unable to acquire a database lock {message_context}")
+    logger.open_search_errors(errors)
+    if index and index.skipped_count:
+        logger.info(f"Skipped {index.skipped_count} unchanged search documents")
+    return index
+
+
+def _catch_up_index_build(index: OpenSearchIndex, dataset_version: HarvestDatasetVersion, generation: int,
+                          change_cursor: int, batch_size: int = 500) -> tuple[int, list]:
+    """
+    Replays the changes that arrived after the cursor on the remotes that are being built.
+    Rounds continue until no changes arrive or until OPENSEARCH_CATCH_UP_ROUNDS is reached.
+    Returns the cursor of the last replayed change together with any errors.
+    """
+    errors = []
+    for _ in range(settings.OPENSEARCH_CATCH_UP_ROUNDS):
+        last_change_id = IndexingChange.objects.get_last_id()
+        changes = IndexingChange.objects.get_changes(dataset_version, change_cursor, last_change_id)
+        # Rounds only continue for new changes, because lagging changes get returned until they're old enough
+        if not changes.filter(id__gt=change_cursor).exists():
+            break
+        documents = dataset_version.documents.filter(id__in=changes.values("document_id"))
+        errors += index.push_batches(
+            _iterate_search_document_batches(documents, batch_size),
+            is_done=False, generation=generation
+        )
+        change_cursor = last_change_id
+    return change_cursor, errors
+
+
+def _rebuild_dataset_version_index(dataset_version: HarvestDatasetVersion, logger: HarvestLogger,
+                                   batch_size: int = 500, context: str = None) -> OpenSearchIndex | None:
+    """
+    Builds new remotes for the index of a DatasetVersion while the current remotes keep serving searches.
+    Active Documents get bulk loaded with replicas and refreshes disabled.
+    Changes that arrive during the build get replayed from the outbox
+    and only once the new remotes are complete and serving settings are restored do aliases move over atomically.
+    """
+    errors = []
+    current_time = make_aware(datetime.now())
+    try:
+        with atomic():
+            index = OpenSearchIndex.objects.select_for_update(nowait=True).get(id=dataset_version.index.id)
+            documents = dataset_version.documents.filter(state=HarvestDocument.States.ACTIVE)
+            if not documents.exists():
+                return
+            # The cursor is taken before loading Documents, so anything that changes during the load gets replayed.
+            change_cursor = IndexingChange.objects.get_last_id()
+            generation = index.prepare_build()
+            try:
+                errors += index.push_batches(
+                    _iterate_search_document_batches(documents, batch_size),
+                    is_done=False, generation=generation
+                )
+                change_cursor, catch_up_errors = _catch_up_index_build(
+                    index, dataset_version, generation, change_cursor, batch_size
+                )
+                errors += catch_up_errors
+                index.finish_build(generation)
+                # Restoring replicas may take a moment and changes that arrived meanwhile get replayed as well.
+                change_cursor, catch_up_errors = _catch_up_index_build(
+                    index, dataset_version, generation, change_cursor, batch_size
+                )
+                errors += catch_up_errors
+                index.swap_generation(generation)
+            except Exception:
+                index.abort_build(generation)
+                raise
+            index.pushed_at = current_time
+            index.change_cursor = change_cursor
             index.save()
     except DatabaseError:
         index = None
@@ -76,13 +170,16 @@ def sync_opensearch_indices(app_label: str) -> None:
     )
 
     # Acquire lock and push recently modified documents to the index
-    _push_dataset_version_to_index(dataset_version, logger, context="sync_opensearch_indices")
+    index = _push_dataset_version_to_index(dataset_version, logger, context="sync_opensearch_indices")
+    # Cached search responses may contain outdated documents after a push that sent documents to a promoted index.
+    # Lagging changes get read again for a while without being sent, which shouldn't wipe the cache every time.
+    if index is not None and index.sent_count > 0 and dataset_version.is_index_promoted:
+        invalidate_search_cache()
 
 
 @app.task(name="index_dataset_versions", base=DatabaseConnectionResetTask)
 def index_dataset_versions(dataset_versions: list[tuple[str, int]], recreate_indices: bool = False,
                            index_since: datetime = None) -> None:
-    index_since = index_since if not recreate_indices else make_aware(datetime(year=1970, month=1, day=1))
     for dataset_version_model, dataset_version_id in dataset_versions:
         # Load the dataset version
         Dataset, DatasetVersion, dataset_version = load_data_models(dataset_version_model, dataset_version_id)
@@ -101,14 +198,22 @@ def index_dataset_versions(dataset_versions: list[tuple[str, int]], recreate_ind
             warn_delete_does_not_exist=False
         )
         # Acquire lock and push recently modified documents to the index
-        logger.info(f"Pushing index for: {app_label}")
-        index = _push_dataset_version_to_index(
-            dataset_version, logger,
-            recreate=recreate_indices, push_since=index_since,
-            context="index_dataset_versions"
-        )
-        # Switch the aliases to the new indices if required
-        if index and dataset_version.dataset.indexing == Dataset.IndexingOptions.INDEX_AND_PROMOTE:
+        # or build new remotes that replace the current remotes without downtime.
+        was_promoted = dataset_version.is_index_promoted
+        if recreate_indices:
+            logger.info(f"Rebuilding index for: {app_label}")
+            index = _rebuild_dataset_version_index(dataset_version, logger, context="index_dataset_versions")
+        else:
+            logger.info(f"Pushing index for: {app_label}")
+            index = _push_dataset_version_to_index(
+                dataset_version, logger,
+                push_since=index_since,
+                context="index_dataset_versions"
+            )
+        # Switch the aliases to the new indices if required.
+        # Rebuilds of promoted indices already moved their aliases, which shouldn't get interrupted again.
+        is_swapped = recreate_indices and was_promoted
+        if index and not is_swapped and dataset_version.dataset.indexing == Dataset.IndexingOptions.INDEX_AND_PROMOTE:
             logger.info(f"Promoting to latest: {app_label}")
             index.promote_all_to_latest()
             dataset_version.set_index_promoted()
@@ -31,6 +31,14 @@ class TestOpenSearchIndexModel(TestCase):
             self.search_client.indices.delete.assert_any_call(index=f"edusources-testing--test-001-{language}")
         self.search_client.indices.delete.assert_any_call(index="edusources-testing--test-001")
 
+    @patch("search.models.index.get_opensearch_client", return_value=search_client)
+    def test_client(self, get_search_client_mock):
+        instance = OpenSearchIndex.build("testing", "test", "0.0.1")
+        instance.save()
+        list(OpenSearchIndex.objects.all())
+        self.assertEqual(get_search_client_mock.call_count, 0, "Expected loading instances not to create clients")
+        self.assertIs(instance.client, self.search_client)
+
     def test_get_remote_names(self):
         instance = OpenSearchIndex.build("testing", "test", "0.0.1")
         instance.save()
@@ -41,3 +49,104 @@ class TestOpenSearchIndexModel(TestCase):
             "edusources-testing--test-001-unk",
             "edusources-testing--test-001",
         })
+
+    @patch("search.models.index.get_opensearch_client", return_value=search_client)
+    @patch("search.models.index.parallel_bulk")
+    def test_push_batches(self, parallel_bulk_mock, get_search_client_mock):
+        parallel_bulk_mock.side_effect = lambda client, documents, **kwargs: [
+            (document["_id"] != "error", {"index": {"_id": document["_id"]}})
+            for document in documents
+        ]
+        instance = OpenSearchIndex.build("testing", "test", "0.0.1")
+        instance.save()
+        batches = [
+            [("nl", {"_id": "1"}), ("all", {"_id": "1"})],
+            [("en", {"_id": "2"}), ("all", {"_id": "2"}), ("en", {"_id": "error"}), ("all", {"_id": "error"})],
+        ]
+        errors = instance.push_batches(iter(batches))
+        # Each batch pushes to all its remotes separately
+        self.assertEqual(parallel_bulk_mock.call_count, 4)
+        pushed_documents = {}
+        for args, kwargs in parallel_bulk_mock.call_args_list:
+            client, documents = args
+            pushed_documents.setdefault(kwargs["index"], []).extend([doc["_id"] for doc in documents])
+            self.assertEqual(kwargs["chunk_size"], 500)
+            self.assertFalse(kwargs["raise_on_error"])
+        self.assertEqual(pushed_documents, {
+            "edusources-testing--test-001-nl": ["1"],
+            "edusources-testing--test-001-en": ["2", "error"],
+            "edusources-testing--test-001": ["1", "2", "error"],
+        })
+        # Errors get reported and the push gets registered
+        self.assertEqual(len(errors), 2)
+        instance.refresh_from_db()
+        self.assertEqual(instance.error_count, 2)
+        self.assertIsNotNone(instance.pushed_at)
+
+    @patch("search.models.index.get_opensearch_client", return_value=search_client)
+    @patch("search.models.index.parallel_bulk")
+    def test_push_skips_unchanged(self, parallel_bulk_mock, get_search_client_mock):
+        parallel_bulk_mock.side_effect = lambda client, documents, **kwargs: [
+            (True, {"index": {"_id": document["_id"]}})
+            for document in documents
+        ]
+        instance = OpenSearchIndex.build("testing", "test", "0.0.1")
+        instance.save()
+        instance.push([("nl", {"_id": "1", "title": "one"}), ("nl", {"_id": "2", "title": "two"})])
+        self.assertEqual(instance.skipped_count, 0)
+        self.assertEqual(instance.pushed_documents.count(), 2)
+        # Pushing again only sends changes and deletes
+        parallel_bulk_mock.reset_mock()
+        instance.push([
+            ("nl", {"_id": "1", "title": "one"}),
+            ("nl", {"_id": "2", "title": "changed"}),
+            ("en", {"_id": "1", "_op_type": "delete"}),
+        ])
+        self.assertEqual(instance.skipped_count, 1)
+        pushed_documents = {
+            kwargs["index"]: documents
+            for (client, documents), kwargs in parallel_bulk_mock.call_args_list
+        }
+        self.assertEqual(pushed_documents, {
+            "edusources-testing--test-001-nl": [{"_id": "2", "title": "changed"}],
+            "edusources-testing--test-001-en": [{"_id": "1", "_op_type": "delete"}],
+        })
+        self.assertEqual(
+            list(instance.pushed_documents.values_list("document_id", flat=True)), ["2"],
+            "Expected deletes to remove ledger entries"
+        )
+        # Recreating an index clears the ledger
+        instance.prepare_push(recreate=True)
+        self.assertFalse(instance.pushed_documents.exists())
+
+    @patch("search.models.index.get_opensearch_client", return_value=search_client)
+    @patch("search.models.index.parallel_bulk")
+    def test_prepare_push_missing_remote(self, parallel_bulk_mock, get_search_client_mock):
+        parallel_bulk_mock.side_effect = lambda client, documents, **kwargs: [
+            (True, {"index": {"_id": document["_id"]}})
+            for document in documents
+        ]
+        instance = OpenSearchIndex.build("testing", "test", "0.0.1")
+        instance.change_cursor = 10
+        instance.save()
+        search_documents = [("nl", {"_id": "1", "title": "one"}), ("en", {"_id": "2", "title": "two"})]
+        instance.push(search_documents)
+        self.assertEqual(instance.prepare_push(), [], "Expected no remotes to get created when they all exist")
+        self.assertEqual(instance.pushed_documents.count(), 2)
+        # A remote that went missing gets created empty and loses its ledger entries
+        missing_remote = instance.get_remote_name("nl")
+        with patch.object(self.search_client.indices, "exists", side_effect=lambda name: name != missing_remote):
+            self.assertEqual(instance.prepare_push(), ["nl"])
+        self.search_client.indices.create.assert_called_once_with(
+            index=missing_remote,
+            body=instance.configuration["nl"]
+        )
+        self.assertEqual(list(instance.pushed_documents.values_list("language", flat=True)), ["en"])
+        instance.refresh_from_db()
+        self.assertIsNone(instance.change_cursor)
+        # Unchanged documents get pushed to the new remote
+        parallel_bulk_mock.reset_mock()
+        instance.push(search_documents)
+        self.assertEqual(instance.skipped_count, 1)
+        self.assertEqual(parallel_bulk_mock.call_count, 1)
+        self.assertEqual(parallel_bulk_mock.call_args.kwargs["index"], missing_remote)
@@ -1,9 +1,12 @@
 from unittest.mock import patch, ANY
 from datetime import timedelta
 
+from django.conf import settings
 from django.test import TestCase
 from django.utils.timezone import now
+from django.contrib.contenttypes.models import ContentType
 
+from core.models import IndexingChange
 from search.tests.mocks import get_search_client_mock
 from search.models import OpenSearchIndex
 from search.tasks import index_dataset_versions
@@ -49,10 +52,14 @@ class TestIndexDatasetVersions(TestCase):
         self.search_client.indices.delete_alias.reset_mock()
         self.search_client.indices.create.reset_mock()
         self.search_client.indices.delete.reset_mock()
+        self.search_client.indices.put_settings.reset_mock()
+        self.search_client.indices.update_aliases.reset_mock()
+        self.search_client.indices.get_alias.reset_mock(side_effect=True)
 
-    def assert_document_stream(self, streaming_bulk_mock, exclude_deletes=False, include_old_documents=False):
-        self.assertEqual(streaming_bulk_mock.call_count, 4, "Expected a separate call for nl, en, unk and all")
-        for args, kwargs in streaming_bulk_mock.call_args_list:
+    def assert_document_stream(self, parallel_bulk_mock, exclude_deletes=False, include_old_documents=False,
+                               generation=0):
+        self.assertEqual(parallel_bulk_mock.call_count, 4, "Expected a separate call for nl, en, unk and all")
+        for args, kwargs in parallel_bulk_mock.call_args_list:
             client, docs = args
             alias, dataset_info = kwargs["index"].split("--")
             # Check language based call when appropriate and strip the language postfix
@@ -67,6 +74,9 @@ class TestIndexDatasetVersions(TestCase):
             elif dataset_info.endswith("unk"):
                 self.assertEqual(len(docs), 3)
                 dataset_info = dataset_info[:-4]
+            if generation:
+                self.assertTrue(dataset_info.endswith(f"-g{generation}"), "Expected remote of new generation")
+                dataset_info = dataset_info[:-len(f"-g{generation}")]
             # Non-language asserts from here
             dataset, version = dataset_info.split("-")
             self.assertEqual(dataset, "test")
@@ -91,14 +101,16 @@ class TestIndexDatasetVersions(TestCase):
                 name=f"{platform}-{entity}"
             )
 
-    def assert_alias_creation(self, platform: str, entity: str, languages: list[str]):
+    def assert_alias_creation(self, platform: str, entity: str, languages: list[str], generation: int = 0):
+        remote_name = f"{platform}-{entity}--test-003" if not generation else \
+            f"{platform}-{entity}--test-003-g{generation}"
         for language in languages:
             self.search_client.indices.put_alias.assert_any_call(
-                index=f"{platform}-{entity}--test-003",
+                index=remote_name,
                 name=f"{platform}-{entity}"
             )
             self.search_client.indices.put_alias.assert_any_call(
-                index=f"{platform}-{entity}--test-003-{language}",
+                index=f"{remote_name}-{language}",
                 name=f"{platform}-{language}"
             )
 
@@ -108,19 +120,21 @@ class TestIndexDatasetVersions(TestCase):
                 index=f"{platform}-{entity}--test-003-{language}"
             )
 
-    def assert_index_creation(self, platform: str, entity: str, languages: list[str]):
+    def assert_index_creation(self, platform: str, entity: str, languages: list[str], generation: int = 0):
+        remote_name = f"{platform}-{entity}--test-003" if not generation else \
+            f"{platform}-{entity}--test-003-g{generation}"
         for language in languages:
             self.search_client.indices.create.assert_any_call(
-                index=f"{platform}-{entity}--test-003-{language}",
+                index=f"{remote_name}-{language}",
                 body=ANY
             )
 
     @patch("search.models.index.get_opensearch_client", return_value=search_client)
-    @patch("search.models.index.streaming_bulk")
-    def test_index_promote(self, streaming_bulk_mock, get_search_client_mock):
+    @patch("search.models.index.parallel_bulk")
+    def test_index_promote(self, parallel_bulk_mock, get_search_client_mock):
         index_dataset_versions([("testing.DatasetVersion", self.dataset_version.id,)])
         # Check if data was sent to search engine
-        self.assert_document_stream(streaming_bulk_mock)
+        self.assert_document_stream(parallel_bulk_mock)
         # Check DatasetVersion and OpensearchIndex updates
         self.dataset_version.refresh_from_db()
         self.assertTrue(self.dataset_version.is_index_promoted, "Expected DatasetVersion to be marked promoted.")
@@ -134,15 +148,15 @@ class TestIndexDatasetVersions(TestCase):
         self.assertEqual(self.search_client.indices.create.call_count, 0, "Expected index not to be recreated")
 
     @patch("search.models.index.get_opensearch_client", return_value=search_client)
-    @patch("search.models.index.streaming_bulk")
-    def test_index_no_promote(self, streaming_bulk_mock, get_search_client_mock):
+    @patch("search.models.index.parallel_bulk")
+    def test_index_no_promote(self, parallel_bulk_mock, get_search_client_mock):
         self.dataset_version.dataset.indexing = Dataset.IndexingOptions.INDEX_ONLY
         self.dataset_version.dataset.save()
 
         index_dataset_versions([("testing.DatasetVersion", self.dataset_version.id,)])
 
         # Check if data was sent to search engine
-        self.assert_document_stream(streaming_bulk_mock)
+        self.assert_document_stream(parallel_bulk_mock)
         # Check DatasetVersion and OpensearchIndex updates
         self.dataset_version.refresh_from_db()
         self.assertFalse(self.dataset_version.is_index_promoted, "Expected DatasetVersion to be not promoted.")
@@ -159,8 +173,8 @@ class TestIndexDatasetVersions(TestCase):
         )
 
     @patch("search.models.index.get_opensearch_client", return_value=search_client)
-    @patch("search.models.index.streaming_bulk")
-    def test_missing_dataset_version_index(self, streaming_bulk_mock, get_search_client_mock):
+    @patch("search.models.index.parallel_bulk")
+    def test_missing_dataset_version_index(self, parallel_bulk_mock, get_search_client_mock):
         index = self.dataset_version.index
         self.dataset_version.index = None
         self.dataset_version.save()
@@ -168,7 +182,7 @@ class TestIndexDatasetVersions(TestCase):
         index_dataset_versions([("testing.DatasetVersion", self.dataset_version.id,)])
 
         # Check documents aren't pushed
-        self.assertEqual(streaming_bulk_mock.call_count, 0, "Expected no documents to get added without an index")
+        self.assertEqual(parallel_bulk_mock.call_count, 0, "Expected no documents to get added without an index")
         # Check DatasetVersion and OpensearchIndex updates
         self.dataset_version.refresh_from_db()
         self.assertFalse(self.dataset_version.is_index_promoted, "Expected DatasetVersion to be not promoted.")
@@ -185,30 +199,97 @@ class TestIndexDatasetVersions(TestCase):
         )
 
     @patch("search.models.index.get_opensearch_client", return_value=search_client)
-    @patch("search.models.index.streaming_bulk")
-    def test_index_recreate(self, streaming_bulk_mock, get_search_client_mock):
+    @patch("search.models.index.parallel_bulk")
+    def test_index_recreate(self, parallel_bulk_mock, get_search_client_mock):
         index_dataset_versions([("testing.DatasetVersion", self.dataset_version.id,)], recreate_indices=True)
-        # Check if data was sent to search engine
-        self.assert_document_stream(streaming_bulk_mock, exclude_deletes=True, include_old_documents=True)
+        # Check if data was sent to the remotes of the new generation
+        self.assert_document_stream(
+            parallel_bulk_mock, exclude_deletes=True, include_old_documents=True, generation=1
+        )
         # Check DatasetVersion and OpensearchIndex updates
         self.dataset_version.refresh_from_db()
         self.assertTrue(self.dataset_version.is_index_promoted, "Expected DatasetVersion to be marked promoted.")
         self.dataset_version.index.refresh_from_db()
         self.assertGreater(self.dataset_version.index.pushed_at, self.start_time)
+        self.assertEqual(self.dataset_version.index.generation, 1)
         # Check alias modifications
         self.assert_alias_deletion("edusources", "testing", ["en", "nl", "unk"])
-        self.assert_alias_creation("edusources", "testing", ["en", "nl", "unk"])
-        # Check index recreation
+        self.assert_alias_creation("edusources", "testing", ["en", "nl", "unk"], generation=1)
+        # Check that new remotes got built and old remotes got removed
+        self.assert_index_creation("edusources", "testing", ["en", "nl", "unk"], generation=1)
         self.assert_index_deletion("edusources", "testing", ["en", "nl", "unk"])
-        self.assert_index_creation("edusources", "testing", ["en", "nl", "unk"])
+        for args, kwargs in self.search_client.indices.create.call_args_list:
+            index_settings = kwargs["body"]["settings"]
+            index_settings = index_settings.get("index", index_settings)
+            self.assertEqual(index_settings["number_of_replicas"], 0)
+            self.assertEqual(index_settings["refresh_interval"], "-1")
+        self.assertEqual(self.search_client.indices.put_settings.call_count, 4, "Expected settings to get restored")
+
+    @patch("search.models.index.get_opensearch_client", return_value=search_client)
+    @patch("search.models.index.parallel_bulk")
+    def test_index_recreate_promoted(self, parallel_bulk_mock, get_search_client_mock):
+        self.dataset_version.set_index_promoted()
+        self.search_client.indices.get_alias.side_effect = lambda index: {
+            index: {"aliases": {"edusources-testing": {}}}
+        }
+        index_dataset_versions([("testing.DatasetVersion", self.dataset_version.id,)], recreate_indices=True)
+        # Aliases move to the new generation in a single request and promotion doesn't touch them again
+        self.assertEqual(self.search_client.indices.update_aliases.call_count, 1)
+        args, kwargs = self.search_client.indices.update_aliases.call_args
+        actions = kwargs["body"]["actions"]
+        self.assertIn({"remove": {"index": "edusources-testing--test-003", "alias": "edusources-testing"}}, actions)
+        self.assertIn({"add": {"index": "edusources-testing--test-003-g1", "alias": "edusources-testing"}}, actions)
+        self.assertIn({"add": {"index": "edusources-testing--test-003-g1-nl", "alias": "edusources-testing"}}, actions)
+        self.assertEqual(len(actions), 8)
+        self.assertEqual(self.search_client.indices.delete_alias.call_count, 0)
+        self.assertEqual(self.search_client.indices.put_alias.call_count, 0)
+        self.dataset_version.refresh_from_db()
+        self.assertTrue(self.dataset_version.is_index_promoted)
+
+    @patch("search.models.index.get_opensearch_client", return_value=search_client)
+    @patch("search.models.index.parallel_bulk")
+    def test_index_recreate_catch_up(self, parallel_bulk_mock, get_search_client_mock):
+        # Changes from creating the Documents are older than the lag and won't get read again
+        IndexingChange.objects.update(created_at=now() - timedelta(seconds=settings.INDEXING_CHANGE_LAG * 2))
+        changed_document = self.documents[2]
+        prepare_build = OpenSearchIndex.prepare_build
+        changes = []
+
+        def prepare_build_during_change(index):
+            generation = prepare_build(index)
+            # The Document gets deleted while the new remotes are being built
+            type(changed_document).objects.filter(id=changed_document.id).update(
+                state=changed_document.States.DELETED
+            )
+            changes.append(IndexingChange.objects.create(
+                document_type=ContentType.objects.get_for_model(changed_document),
+                document_id=changed_document.id,
+                dataset_version_id=self.dataset_version.id
+            ))
+            return generation
+
+        with patch.object(OpenSearchIndex, "prepare_build", autospec=True, side_effect=prepare_build_during_change):
+            index_dataset_versions([("testing.DatasetVersion", self.dataset_version.id,)], recreate_indices=True)
+        # Besides the bulk load the delete gets replayed for the language remote and the multilingual remote
+        self.assertEqual(parallel_bulk_mock.call_count, 6)
+        replayed_documents = [
+            document
+            for (client, documents), kwargs in parallel_bulk_mock.call_args_list[4:]
+            for document in documents
+        ]
+        self.assertEqual(replayed_documents, [{"_id": changed_document.properties["srn"], "_op_type": "delete"}] * 2)
+        for (client, documents), kwargs in parallel_bulk_mock.call_args_list[4:]:
+            self.assertIn("-g1", kwargs["index"], "Expected changes to get replayed on the new generation")
+        self.dataset_version.index.refresh_from_db()
+        self.assertEqual(self.dataset_version.index.change_cursor, changes[0].id)
 
     @patch("search.models.index.get_opensearch_client", return_value=search_client)
-    @patch("search.models.index.streaming_bulk")
-    def test_index_since(self, streaming_bulk_mock, get_search_client_mock):
+    @patch("search.models.index.parallel_bulk")
+    def test_index_since(self, parallel_bulk_mock, get_search_client_mock):
         index_since = self.start_time - timedelta(days=2)
         index_dataset_versions([("testing.DatasetVersion", self.dataset_version.id,)], index_since=index_since)
         # Check if data was sent to search engine
-        self.assert_document_stream(streaming_bulk_mock, include_old_documents=True)
+        self.assert_document_stream(parallel_bulk_mock, include_old_documents=True)
         # Check DatasetVersion and OpensearchIndex updates
         self.dataset_version.refresh_from_db()
         self.assertTrue(self.dataset_version.is_index_promoted, "Expected DatasetVersion to be marked promoted.")
@@ -1,10 +1,12 @@
 from unittest.mock import patch
 from datetime import timedelta
 
+from django.conf import settings
 from django.test import TestCase
 from django.utils.timezone import now
 
 from search.tests.mocks import get_search_client_mock
+from core.models import IndexingChange
 from search.models import OpenSearchIndex
 from search.tasks import sync_opensearch_indices
 from testing.constants import ENTITY_SEQUENCE_PROPERTIES
@@ -66,12 +68,12 @@ class TestSyncOpenSearchIndices(TestCase):
         self.dataset_version.save()
 
     @patch("search.models.index.get_opensearch_client", return_value=search_client)
-    @patch("search.models.index.streaming_bulk")
-    def test_sync_opensearch_indices(self, streaming_bulk_mock, get_search_client_mock):
+    @patch("search.models.index.parallel_bulk")
+    def test_sync_opensearch_indices(self, parallel_bulk_mock, get_search_client_mock):
         sync_opensearch_indices("testing")
         # Check if data was sent to search engine
-        self.assertEqual(streaming_bulk_mock.call_count, 4, "Expected a separate call for nl, en, unk and all")
-        for args, kwargs in streaming_bulk_mock.call_args_list:
+        self.assertEqual(parallel_bulk_mock.call_count, 4, "Expected a separate call for nl, en, unk and all")
+        for args, kwargs in parallel_bulk_mock.call_args_list:
             client, docs = args
             alias, dataset_info = kwargs["index"].split("--")
             # Check language based call when appropriate and strip the language postfix
@@ -96,16 +98,93 @@ class TestSyncOpenSearchIndices(TestCase):
                              "Only the latest DatasetVersions of the newest Dataset should get pushed")
 
     @patch("search.models.index.get_opensearch_client", return_value=search_client)
-    @patch("search.models.index.streaming_bulk")
-    def test_sync_indices_new(self, streaming_bulk_mock, get_search_client_mock):
+    @patch("search.models.index.parallel_bulk")
+    def test_sync_indices_new(self, parallel_bulk_mock, get_search_client_mock):
         the_future = self.start_time + timedelta(days=3)
         self.index.pushed_at = the_future
         self.index.save()
         sync_opensearch_indices("testing")
-        self.assertEqual(streaming_bulk_mock.call_count, 0)
+        self.assertEqual(parallel_bulk_mock.call_count, 0)
         # Check that pushed_at was not updated
         for index in OpenSearchIndex.objects.filter(name__contains="test-0.0.3"):
             self.assertEqual(index.pushed_at, the_future)
         for index in OpenSearchIndex.objects.exclude(name__contains="test-0.0.3"):
             self.assertEqual(index.pushed_at, self.start_time,
                              "Only the latest DatasetVersions of the newest Dataset should get pushed")
+
+    @patch("search.models.index.get_opensearch_client", return_value=search_client)
+    @patch("search.models.index.parallel_bulk")
+    def test_sync_indices_change_cursor(self, parallel_bulk_mock, get_search_client_mock):
+        # Any existing changes are considered pushed by the index and are older than the lag
+        IndexingChange.objects.update(created_at=now() - timedelta(seconds=settings.INDEXING_CHANGE_LAG * 2))
+        self.index.change_cursor = IndexingChange.objects.get_last_id()
+        self.index.save()
+        sync_opensearch_indices("testing")
+        self.assertEqual(parallel_bulk_mock.call_count, 0)
+        # Changing a Document appends to the outbox and only that Document gets pushed
+        document = self.documents[0]
+        document.properties["title"] = "changed"
+        document.clean()
+        document.save()
+        sync_opensearch_indices("testing")
+        self.assertEqual(parallel_bulk_mock.call_count, 2, "Expected a call for the language index and for all")
+        for args, kwargs in parallel_bulk_mock.call_args_list:
+            client, docs = args
+            self.assertEqual([doc["_id"] for doc in docs], [document.properties["srn"]])
+        self.index.refresh_from_db()
+        self.assertEqual(self.index.change_cursor, IndexingChange.objects.get_last_id())
+        # Without new changes nothing gets pushed again
+        parallel_bulk_mock.reset_mock()
+        sync_opensearch_indices("testing")
+        self.assertEqual(parallel_bulk_mock.call_count, 0)
+
+    @patch("search.models.index.get_opensearch_client", return_value=search_client)
+    @patch("search.models.index.parallel_bulk")
+    def test_sync_indices_lagging_change(self, parallel_bulk_mock, get_search_client_mock):
+        IndexingChange.objects.update(created_at=now() - timedelta(seconds=settings.INDEXING_CHANGE_LAG * 2))
+        document = self.documents[0]
+        document.properties["title"] = "changed"
+        document.clean()
+        document.save()
+        # The change commits after the cursor moved past its id, like a change of a long running transaction would
+        self.index.change_cursor = IndexingChange.objects.get_last_id()
+        self.index.save()
+        sync_opensearch_indices("testing")
+        self.assertEqual(parallel_bulk_mock.call_count, 2, "Expected the lagging change to get pushed")
+        for args, kwargs in parallel_bulk_mock.call_args_list:
+            client, docs = args
+            self.assertEqual([doc["_id"] for doc in docs], [document.properties["srn"]])
+        # Once pushed the lagging change gets read again, but the unchanged Document doesn't get pushed again
+        parallel_bulk_mock.reset_mock()
+        sync_opensearch_indices("testing")
+        self.assertEqual(parallel_bulk_mock.call_count, 0)
+
+    @patch("search.tasks.index.invalidate_search_cache")
+    @patch("search.models.index.get_opensearch_client", return_value=search_client)
+    @patch("search.models.index.parallel_bulk")
+    def test_sync_indices_invalidate_cache(self, parallel_bulk_mock, get_search_client_mock,
+                                           invalidate_search_cache_mock):
+        self.dataset_version.is_index_promoted = True
+        self.dataset_version.save()
+        IndexingChange.objects.update(created_at=now() - timedelta(seconds=settings.INDEXING_CHANGE_LAG * 2))
+        self.index.change_cursor = IndexingChange.objects.get_last_id()
+        self.index.save()
+        document = self.documents[0]
+        document.properties["title"] = "changed"
+        document.clean()
+        document.save()
+        sync_opensearch_indices("testing")
+        self.assertEqual(invalidate_search_cache_mock.call_count, 1, "Expected sent documents to invalidate the cache")
+        # The change gets read again during the lag, but nothing gets sent and the cache stays valid
+        sync_opensearch_indices("testing")
+        self.assertEqual(parallel_bulk_mock.call_count, 2)
+        self.assertEqual(invalidate_search_cache_mock.call_count, 1, "Expected no invalidation without sent documents")
+        # Pushes to indices that are not promoted don't invalidate the cache
+        self.dataset_version.is_index_promoted = False
+        self.dataset_version.save()
+        document.properties["title"] = "changed again"
+        document.clean()
+        document.save()
+        sync_opensearch_indices("testing")
+        self.assertEqual(parallel_bulk_mock.call_count, 4)
+        self.assertEqual(invalidate_search_cache_mock.call_count, 1)
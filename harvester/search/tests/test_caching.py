@@ -0,0 +1,47 @@
+from unittest.mock import Mock
+
+from django.test import TestCase, override_settings
+
+from search.caching import (get_cached_response_data, get_search_cache_metrics, invalidate_search_cache,
+                            get_search_cache)
+from search.models import OpenSearchIndex
+from testing.models import Dataset, DatasetVersion
+
+
+@override_settings(CACHES={
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    "search": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "search-tests"},
+})
+class TestSearchCaching(TestCase):
+
+    def setUp(self):
+        super().setUp()
+        get_search_cache().clear()
+        index = OpenSearchIndex.build("testing", "test", "0.0.1")
+        index.save()
+        dataset = Dataset.objects.create(name="test")
+        DatasetVersion.objects.create(dataset=dataset, index=index, is_index_promoted=True)
+
+    def test_get_cached_response_data(self):
+        build_response_data = Mock(return_value={"results": []})
+        for query in ["did", "did", "didactiek", "did"]:
+            response_data = get_cached_response_data("autocomplete", {"query": query}, build_response_data)
+            self.assertEqual(response_data, {"results": []})
+        self.assertEqual(build_response_data.call_count, 2, "Expected identical parameters to use the cache")
+        metrics = get_search_cache_metrics()
+        self.assertEqual(metrics["autocomplete"], {"hits": 2, "misses": 2, "hit_rate": 0.5})
+        self.assertEqual(metrics["search"], {"hits": 0, "misses": 0, "hit_rate": None})
+        # Endpoints use separate cache entries
+        get_cached_response_data("similarity", {"query": "did"}, build_response_data)
+        self.assertEqual(build_response_data.call_count, 3)
+        # Invalidation makes responses get built again
+        invalidate_search_cache()
+        get_cached_response_data("autocomplete", {"query": "did"}, build_response_data)
+        self.assertEqual(build_response_data.call_count, 4)
+
+    @override_settings(SEARCH_CACHE_TIMEOUTS={"autocomplete": 0})
+    def test_disabled_endpoint(self):
+        build_response_data = Mock(return_value=[])
+        get_cached_response_data("autocomplete", {"query": "did"}, build_response_data)
+        get_cached_response_data("autocomplete", {"query": "did"}, build_response_data)
+        self.assertEqual(build_response_data.call_count, 2)
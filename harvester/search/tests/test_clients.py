@@ -0,0 +1,35 @@
+from unittest.mock import patch
+
+from django.test import SimpleTestCase, override_settings
+
+from search import clients
+from search.clients import get_opensearch_client
+
+
+class TestOpenSearchClients(SimpleTestCase):
+
+    def setUp(self):
+        super().setUp()
+        clients._reset_opensearch_clients()
+
+    def tearDown(self):
+        clients._reset_opensearch_clients()
+        super().tearDown()
+
+    @patch("search.clients.OpenSearchClientBuilder")
+    def test_get_opensearch_client(self, builder_mock):
+        client = get_opensearch_client()
+        self.assertIs(get_opensearch_client(), client, "Expected client to get reused")
+        self.assertEqual(builder_mock.from_host.call_count, 1)
+        # Other hosts get their own client
+        with override_settings(OPENSEARCH_HOST="http://other-host:9200"):
+            get_opensearch_client()
+        self.assertEqual(builder_mock.from_host.call_count, 2)
+        # Clients for other environments are shared in the same way
+        other_client = get_opensearch_client("http://other-host:9200")
+        self.assertIs(get_opensearch_client("http://other-host:9200"), other_client)
+        self.assertEqual(builder_mock.from_host.call_count, 2)
+        # Forked processes create their own clients
+        clients._reset_opensearch_clients()
+        get_opensearch_client()
+        self.assertEqual(builder_mock.from_host.call_count, 3)
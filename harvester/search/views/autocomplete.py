@@ -5,6 +5,7 @@ from rest_framework.response import Response
 
 from harvester.schema import HarvesterSchema
 from search.clients import get_search_client
+from search.caching import get_cached_response_data
 from search.views.base import validate_presets
 
 
@@ -28,6 +29,10 @@ class AutocompleteAPIView(generics.GenericAPIView):
         serializer.is_valid(raise_exception=True)
         data = serializer.validated_data
         presets = validate_presets(request)
-        client = get_search_client(presets=presets)
-        response = client.autocomplete(**data)
+
+        def autocomplete():
+            client = get_search_client(presets=presets)
+            return client.autocomplete(**data)
+
+        response = get_cached_response_data("autocomplete", {"presets": presets, **data}, autocomplete)
         return Response(response)
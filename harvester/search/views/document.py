@@ -10,6 +10,7 @@ from rest_framework.exceptions import ValidationError
 
 from harvester.schema import HarvesterSchema
 from search.clients import get_search_client, prepare_results_for_response
+from search.caching import get_cached_response_data
 from search.views.base import validate_presets, load_results_serializers
 
 
@@ -129,18 +130,31 @@ class DocumentSearchAPIView(GenericAPIView):
         include_filter_counts = request.GET.get("include_filter_counts", None) == "1"
         if not data["search_text"] and not data["ordering"] and client.configuration.distance_feature_field:
             data["ordering"] = f"-{client.configuration.distance_feature_field}"
+
         # Execute search and return results
-        response = client.search(aggregate_filter_counts=include_filter_counts, **data)
-        result_serializers = load_results_serializers(presets)
-        results = prepare_results_for_response(response["results"], result_serializers)
-        return Response({
-            "results": results,
-            "results_total": response["results_total"],
-            "did_you_mean": response["did_you_mean"],
-            "page": data["page"],
-            "page_size": data["page_size"],
-            "filter_counts": response.get("aggregations", response.get("drilldowns")) if include_filter_counts else None
-        })
+        def search():
+            response = client.search(aggregate_filter_counts=include_filter_counts, **data)
+            result_serializers = load_results_serializers(presets)
+            results = prepare_results_for_response(response["results"], result_serializers)
+            return {
+                "results": results,
+                "results_total": response["results_total"],
+                "did_you_mean": response["did_you_mean"],
+                "page": data["page"],
+                "page_size": data["page_size"],
+                "filter_counts": (
+                    response.get("aggregations", response.get("drilldowns")) if include_filter_counts else None
+                )
+            }
+
+        # The order of filters for different fields doesn't influence results
+        parameters = {
+            **data,
+            "filters": sorted(data["filters"], key=lambda metadata_filter: metadata_filter["external_id"]),
+            "presets": presets,
+            "include_filter_counts": include_filter_counts
+        }
+        return Response(get_cached_response_data("search", parameters, search))
 
 
 class DocumentSearchDetailSerializer(serializers.Serializer):
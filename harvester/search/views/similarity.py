@@ -9,6 +9,7 @@ from rest_framework.exceptions import ValidationError
 
 from search_client.constants import Platforms
 from search.clients import get_search_client, prepare_results_for_response
+from search.caching import get_cached_response_data
 from search.views.base import validate_presets, load_results_serializers
 from harvester.schema import HarvesterSchema
 from products.views.serializers import SimpleLearningMaterialResultSerializer, ResearchProductResultSerializer
@@ -74,11 +75,21 @@ class SimilarityAPIView(GenericAPIView):
         external_id = serializer.validated_data.get("external_id", None)
         identifier = serializer.validated_data.get("srn", external_id)
         language = serializer.validated_data["language"]
-        client = get_search_client(presets=presets)
-        response = client.more_like_this(identifier, language, is_external_identifier=bool(external_id))
-        result_serializers = load_results_serializers(presets)
-        response["results"] = prepare_results_for_response(response["results"], result_serializers)
-        return Response(response)
+
+        def more_like_this():
+            client = get_search_client(presets=presets)
+            response = client.more_like_this(identifier, language, is_external_identifier=bool(external_id))
+            result_serializers = load_results_serializers(presets)
+            response["results"] = prepare_results_for_response(response["results"], result_serializers)
+            return response
+
+        parameters = {
+            "presets": presets,
+            "identifier": identifier,
+            "language": language,
+            "is_external_identifier": bool(external_id)
+        }
+        return Response(get_cached_response_data("similarity", parameters, more_like_this))
 
 
 class AuthorSuggestionsAPIView(GenericAPIView):
@@ -103,8 +114,16 @@ class AuthorSuggestionsAPIView(GenericAPIView):
         serializer = self.get_serializer(data=request.GET)
         serializer.is_valid(raise_exception=True)
         author_name = serializer.validated_data["author_name"]
-        client = get_search_client(presets=presets)
-        response = client.author_suggestions(author_name)
-        result_serializers = load_results_serializers(presets)
-        response["results"] = prepare_results_for_response(response["results"], result_serializers)
-        return Response(response)
+
+        def author_suggestions():
+            client = get_search_client(presets=presets)
+            response = client.author_suggestions(author_name)
+            result_serializers = load_results_serializers(presets)
+            response["results"] = prepare_results_for_response(response["results"], result_serializers)
+            return response
+
+        parameters = {
+            "presets": presets,
+            "author_name": author_name
+        }
+        return Response(get_cached_response_data("author_suggestions", parameters, author_suggestions))
@@ -1,5 +1,6 @@
 from django.conf import settings
 from django.contrib import admin, messages
+from django.db.models import Exists, OuterRef
 from django.utils.timezone import now
 from django.utils.html import format_html
 from django.urls import reverse
@@ -10,6 +11,7 @@ from sources.models import (HvaPureResource, HkuMetadataResource, GreeniOAIPMHRe
                             HanzeResearchObjectResource, PublinovaMetadataResource, SharekitMetadataHarvest,
                             SaxionOAIPMHResource, AnatomyToolOAIPMH, EdurepOAIPMH)
 from sources.models.harvest import HarvestSource, HarvestEntity
+from sources.models.webhook import WebhookEvent
 
 
 class HarvestSourceAdmin(admin.ModelAdmin):
@@ -56,6 +58,22 @@ class HarvestEntityAdmin(admin.ModelAdmin):
     list_filter = ("source", "type",)
 
 
+class WebhookEventAdmin(admin.ModelAdmin):
+    list_display = ("__str__", "source", "set_specification", "created_at", "retry_count", "failed_at",)
+    list_filter = ("source", "set_specification",)
+    search_fields = ("srn",)
+    readonly_fields = ("created_at",)
+    actions = ["retry_webhook_events"]
+
+    def retry_webhook_events(self, request, queryset):
+        # Events with a newer event for the same record would overwrite the latest state of that record
+        newer_events = WebhookEvent.objects.filter(srn=OuterRef("srn"), id__gt=OuterRef("id"))
+        superseded_count = queryset.filter(Exists(newer_events)).count()
+        update_count = queryset.exclude(Exists(newer_events)) \
+            .update(failed_at=None, next_attempt_at=None, retry_count=0, error="")
+        messages.info(request, f"Retrying {update_count} webhook events, skipped {superseded_count} superseded events")
+
+
 admin.site.register(HvaPureResource, HttpResourceAdmin)
 admin.site.register(HkuMetadataResource, HttpResourceAdmin)
 admin.site.register(GreeniOAIPMHResource, HttpResourceAdmin)
@@ -69,3 +87,4 @@ admin.site.register(AnatomyToolOAIPMH, HttpResourceAdmin)
 
 admin.site.register(HarvestSource, HarvestSourceAdmin)
 admin.site.register(HarvestEntity, HarvestEntityAdmin)
+admin.site.register(WebhookEvent, WebhookEventAdmin)
@@ -0,0 +1,26 @@
+# Generated by Django 4.2.15 on 2026-10-18 16:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sources', '0002_projects'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WebhookEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(max_length=50)),
+                ('set_specification', models.CharField(max_length=255)),
+                ('srn', models.CharField(blank=True, db_index=True, max_length=255, null=True)),
+                ('data', models.JSONField(default=dict)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('failed_at', models.DateTimeField(blank=True, db_index=True, null=True)),
+                ('error', models.TextField(blank=True)),
+            ],
+        ),
+    ]
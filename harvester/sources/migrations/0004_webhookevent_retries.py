@@ -0,0 +1,23 @@
+# Generated by Django 4.2.15 on 2026-10-18 18:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sources', '0003_webhookevent'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='webhookevent',
+            name='retry_count',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='webhookevent',
+            name='next_attempt_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+    ]
@@ -30,3 +30,17 @@ class HanzeResearchObjectResource(HttpResource):
             "size": size,
             "offset": offset + size
         }
+
+    def next_parameters_window(self, window):
+        content_type, data = self.content
+        count = data["count"]
+        page_info = data["pageInformation"]
+        offset = page_info["offset"]
+        size = page_info["size"]
+        return [
+            {
+                "size": size,
+                "offset": next_offset
+            }
+            for next_offset in range(offset + size, min(count, offset + size * (window + 1)), size)
+        ]
@@ -27,6 +27,21 @@ class SharekitMetadataHarvest(HttpResource):
             "page[number]": next_url.query_dict["page[number]"]
         }
 
+    def next_parameters_window(self, window):
+        content_type, data = self.content
+        last_link = data["links"].get("last", None)
+        if not last_link:
+            next_parameters = self.next_parameters()
+            return [next_parameters] if next_parameters else []
+        current_number = int(URLObject(self.request["url"]).query_dict.get("page[number]", 1))
+        last_number = int(URLObject(last_link).query_dict["page[number]"])
+        return [
+            {
+                "page[number]": str(number)
+            }
+            for number in range(current_number + 1, min(last_number, current_number + window) + 1)
+        ]
+
     def handle_errors(self):
         content_type, data = self.content
         if data and not len(data.get("data", [])):
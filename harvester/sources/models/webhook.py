@@ -0,0 +1,46 @@
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db import models
+
+
+class WebhookEvent(models.Model):
+    """
+    Stores webhook bodies until a worker commits them as seeds.
+    Events for the same SRN that are waiting together get coalesced into the latest event.
+    Events that fail get retried with an increasing delay and are marked as failed after WEBHOOK_EVENT_MAX_ATTEMPTS.
+    """
+
+    source = models.CharField(max_length=50)
+    set_specification = models.CharField(max_length=255)
+    srn = models.CharField(max_length=255, null=True, blank=True, db_index=True)
+    data = models.JSONField(default=dict)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    retry_count = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(null=True, blank=True, db_index=True)
+    failed_at = models.DateTimeField(null=True, blank=True, db_index=True)
+    error = models.TextField(blank=True)
+
+    @property
+    def set_name(self) -> str:
+        return f"{self.source}:{self.set_specification}"
+
+    def register_failure(self, error: str, current_time: datetime) -> None:
+        self.retry_count += 1
+        self.error = error
+        if self.retry_count >= settings.WEBHOOK_EVENT_MAX_ATTEMPTS:
+            self.failed_at = current_time
+            self.next_attempt_at = None
+        else:
+            backoff = settings.WEBHOOK_EVENT_RETRY_BACKOFF * 2 ** (self.retry_count - 1)
+            self.next_attempt_at = current_time + timedelta(seconds=backoff)
+
+    def __str__(self) -> str:
+        return self.srn or f"{self.set_name} ({self.id})"
+
+    @classmethod
+    def build(cls, source: str, set_specification: str, data: dict) -> "WebhookEvent":
+        record_id = data.get("id") if isinstance(data, dict) else None
+        srn = f"{source}:{set_specification}:{record_id}" if record_id else None
+        return cls(source=source, set_specification=set_specification, srn=srn, data=data)
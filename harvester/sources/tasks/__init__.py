@@ -1 +1,2 @@
 from sources.tasks.entities import harvest_entities
+from sources.tasks.webhooks import process_webhook_events
@@ -0,0 +1,154 @@
+from collections import defaultdict
+from sentry_sdk import capture_exception
+
+from django.conf import settings
+from django.db.models import Q
+from django.db.transaction import atomic
+from django.utils.timezone import now
+from celery import current_app as app
+
+from harvester.tasks.base import DatabaseConnectionResetTask
+from core.loading import load_source_configuration
+from core.logging import HarvestLogger
+from core.models.datatypes.document import HarvestDocument
+from core.tasks.harvest.document import dispatch_document_tasks
+from sources.models import WebhookEvent
+from sources.webhooks.utils import get_webhook_destination, commit_webhook_seeds
+
+
+WEBHOOK_ENTITY_TYPES = ["products", "files"]
+
+
+def coalesce_webhook_events(events: list[WebhookEvent]) -> tuple[list[WebhookEvent], list[WebhookEvent]]:
+    """
+    Keeps only the latest event for every SRN, because that event contains the latest state of a record.
+
+    :param events: webhook events ordered by their arrival
+    :return: the latest events and the events that were replaced by a later event
+    """
+    latest_events = {}
+    for event in events:
+        key = event.srn or f"event:{event.id}"
+        latest_events[key] = event
+    latest_ids = {event.id for event in latest_events.values()}
+    replaced_events = [event for event in events if event.id not in latest_ids]
+    return list(latest_events.values()), replaced_events
+
+
+def lock_record_events(events: list[WebhookEvent]) -> list[WebhookEvent]:
+    """
+    Locks the other events for the SRNs of given events, including events that wait for a retry or that failed,
+    to make sure that the latest event of every record gets committed and supersedes all older events.
+    Records with an older event that is locked by another worker are left alone until that worker is done,
+    because committing them now would commit events for the same record out of order.
+
+    :param events: webhook events that are locked by the current transaction
+    :return: all locked events for records that can get processed, ordered by their arrival
+    """
+    srns = {event.srn for event in events if event.srn}
+    if not srns:
+        return events
+    record_events = events + list(
+        WebhookEvent.objects.select_for_update(skip_locked=True)
+        .filter(srn__in=srns)
+        .exclude(id__in=[event.id for event in events])
+    )
+    latest_event_ids = defaultdict(int)
+    for event in record_events:
+        if event.srn:
+            latest_event_ids[event.srn] = max(latest_event_ids[event.srn], event.id)
+    # Any older event that we couldn't lock belongs to another worker
+    blocked_srns = {
+        srn for event_id, srn in
+        WebhookEvent.objects.filter(srn__in=srns)
+        .exclude(id__in=[event.id for event in record_events])
+        .values_list("id", "srn")
+        if event_id < latest_event_ids[srn]
+    }
+    return sorted(
+        [event for event in record_events if event.srn not in blocked_srns],
+        key=lambda event: event.id
+    )
+
+
+def commit_webhook_events(source: str, set_specification: str,
+                          events: list[WebhookEvent]) -> dict[str, list[int]]:
+    """
+    Commits the data of webhook events for a single set as seeds for every webhook entity type.
+
+    :return: the ids of Documents that need processing per entity type
+    """
+    set_name = f"{source}:{set_specification}"
+    dispatch_ids = {}
+    for entity_type in WEBHOOK_ENTITY_TYPES:
+        dataset_version, set_instance = get_webhook_destination(set_name, app_label=entity_type)
+        if not dataset_version or not set_instance:
+            raise ValueError(f"No current dataset version or set for {set_name} and {entity_type}")
+        configuration = load_source_configuration(entity_type, source)
+        objective = configuration["objective"]
+        logger = HarvestLogger(dataset_version.dataset.name, "product_webhook", {}, is_legacy_logger=False)
+        # Processing and storage of incoming data
+        documents = commit_webhook_seeds(objective, [event.data for event in events], set_instance, configuration)
+        dispatch_ids[entity_type] = [doc.id for doc in documents if doc.state != HarvestDocument.States.DELETED]
+        for document in documents:
+            logger.report_document(
+                document.identity,
+                entity_type,
+                state=document.state,
+                title=document.properties.get("title", None)
+            )
+    return dispatch_ids
+
+
+@app.task(name="process_webhook_events", base=DatabaseConnectionResetTask)
+def process_webhook_events(batch_size: int = None) -> int:
+    """
+    Commits waiting webhook events in batches per set, after coalescing events for the same SRN.
+    Events for the same SRN never get processed by different workers at the same time.
+    Events that fail get retried after a backoff and are only marked as failed after WEBHOOK_EVENT_MAX_ATTEMPTS.
+
+    :param batch_size: maximum amount of events to process (default is WEBHOOK_EVENT_BATCH_SIZE)
+    :return: the amount of events that got processed
+    """
+    batch_size = batch_size or settings.WEBHOOK_EVENT_BATCH_SIZE
+    dispatches = defaultdict(list)
+    current_time = now()
+    with atomic():
+        # Locked events are being processed by another worker and get skipped
+        events = list(
+            WebhookEvent.objects.select_for_update(skip_locked=True)
+            .filter(failed_at__isnull=True)
+            .filter(Q(next_attempt_at__isnull=True) | Q(next_attempt_at__lte=current_time))
+            .order_by("id")[:batch_size]
+        )
+        record_events = lock_record_events(events)
+        latest_events, replaced_events = coalesce_webhook_events(record_events)
+        events_by_set = defaultdict(list)
+        for event in latest_events:
+            events_by_set[(event.source, event.set_specification,)].append(event)
+
+        processed_ids = [event.id for event in replaced_events]
+        for (source, set_specification), set_events in events_by_set.items():
+            try:
+                with atomic():
+                    dispatch_ids = commit_webhook_events(source, set_specification, set_events)
+            except Exception as exc:
+                capture_exception(exc)
+                for event in set_events:
+                    event.register_failure(str(exc), current_time)
+                WebhookEvent.objects.bulk_update(
+                    set_events, ["retry_count", "next_attempt_at", "failed_at", "error"]
+                )
+                continue
+            for entity_type, document_ids in dispatch_ids.items():
+                dispatches[entity_type] += document_ids
+            processed_ids += [event.id for event in set_events]
+        WebhookEvent.objects.filter(id__in=processed_ids).delete()
+
+    # Documents get dispatched after the commit to make sure that other workers can see all changes
+    for entity_type, document_ids in dispatches.items():
+        dispatch_document_tasks.delay(entity_type, document_ids)
+    # A full batch indicates that more events are waiting, unless all events are waiting for other workers
+    if len(events) >= batch_size and record_events:
+        process_webhook_events.delay(batch_size=batch_size)
+    return len(record_events)
@@ -46,7 +46,7 @@ class PureExtractor(BaseExtractor):
         return [cls.source_name]
 
 
-def build_seeding_phases(resource: Type[HttpResource], objective: dict) -> list[dict]:
+def build_seeding_phases(resource: Type[HttpResource], objective: dict, concurrency: int = 1) -> list[dict]:
     resource_label = f"{resource._meta.app_label}.{resource._meta.model_name}"
     return [
         {
@@ -58,6 +58,7 @@ def build_seeding_phases(resource: Type[HttpResource], objective: dict) -> list[
                 "method": "get",
                 "args": [],
                 "kwargs": {},
+                "concurrency": concurrency,
             },
             "contribute_data": {
                 "objective": objective
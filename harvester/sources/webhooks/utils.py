@@ -57,26 +57,29 @@ def get_webhook_destination(set_name, app_label="core"):
     return dataset_version, set_instance
 
 
-def commit_webhook_seeds(objective: dict, webhook_data: dict, set_instance: HarvestSet,
+def commit_webhook_seeds(objective: dict, webhook_data: dict | list[dict], set_instance: HarvestSet,
                          source_configuration: dict) -> list[HarvestDocument]:
     """
     Extracts the relevant data from the raw webhook data and commits the seeds as Documents
 
     :param objective: mapping to extract relevant data
-    :param webhook_data: the webhook data to extract seeds from
+    :param webhook_data: the webhook data to extract seeds from or a list of webhook data to commit as one batch
     :param set_instance: the set instance to commit the data to
     :param source_configuration: the configuration of the source of the webhook
     :return: the Documents that were upserted
     """
+    webhook_data = webhook_data if isinstance(webhook_data, list) else [webhook_data]
     # Transform raw data to something the system can work with
     webhook_transformer = source_configuration["webhook_data_transformer"]
-    data = webhook_data if not webhook_transformer else webhook_transformer(webhook_data, set_instance.name)
     # Extract seeds
     extract_config = create_config("extract_processor", {
         "objective": objective
     })
     extractor = ExtractProcessor(config=extract_config)
-    seed_content = list(extractor.extract("application/json", data))
+    seed_content = []
+    for record_data in webhook_data:
+        data = record_data if not webhook_transformer else webhook_transformer(record_data, set_instance.name)
+        seed_content += list(extractor.extract("application/json", data))
     # Commit seeds using the same processor that processes other data from the source
     # We'll return the outcome of the commits
     seeding_config = create_config("seeding_processor", {
@@ -3,10 +3,14 @@ from copy import deepcopy
 from unittest.mock import patch
 
 from django.test import TestCase, override_settings
+from django.utils.timezone import now
 
 from core.loading import load_harvest_models
 from products.models import ProductDocument
 from files.models import FileDocument
+from sources.models import WebhookEvent
+from sources.tasks.webhooks import process_webhook_events
+from sources.webhooks.utils import commit_webhook_seeds
 
 
 TEST_WEBHOOK_SECRET = "aaaaaaaa-aaaa-aaaa-aaaa-aaaaaaaaaaaa"
@@ -183,48 +187,53 @@ class TestProductWebhookTestCase(TestCase):
         self.assertEqual(invalid_data_response.status_code, 400)
         self.assertEqual(invalid_data_response.reason_phrase, "Invalid JSON")
 
-    @patch("products.views.webhook.dispatch_document_tasks.delay")
+    @patch("sources.tasks.webhooks.dispatch_document_tasks.delay")
     def test_create(self, dispatch_mock):
         self.assert_create_models_dont_exist()
         create_response = self.call_webhook(self.webhook_url)
         self.assertEqual(create_response.status_code, 200)
+        process_webhook_events()
         create_product, create_file = self.assert_create_models()
         self.assert_dispatch_mock_calls(dispatch_mock, [create_product.id], [create_file.id])
 
-    @patch("products.views.webhook.dispatch_document_tasks.delay")
+    @patch("sources.tasks.webhooks.dispatch_document_tasks.delay")
     def test_update(self, dispatch_mock):
         update_response = self.call_webhook(self.webhook_url, verb="update")
         self.assertEqual(update_response.status_code, 200)
+        process_webhook_events()
         update_product, update_files = self.assert_update_models()
         self.assert_dispatch_mock_calls(
             dispatch_mock, [update_product.id], [update_file.id for update_file in update_files]
         )
 
-    @patch("products.views.webhook.dispatch_document_tasks.delay")
+    @patch("sources.tasks.webhooks.dispatch_document_tasks.delay")
     def test_delete(self, dispatch_mock):
         delete_response = self.call_webhook(self.webhook_url, verb="delete")
         self.assertEqual(delete_response.status_code, 200)
+        process_webhook_events()
         self.assert_delete_models()
         self.assert_dispatch_mock_calls(dispatch_mock, [], [])
 
-    @patch("products.views.webhook.dispatch_document_tasks.delay")
+    @patch("sources.tasks.webhooks.dispatch_document_tasks.delay")
     def test_create_no_language(self, dispatch_mock):
         self.assert_create_models_dont_exist()
         create_response = self.call_webhook(self.webhook_url, overrides={"language": None})
         self.assertEqual(create_response.status_code, 200)
+        process_webhook_events()
         create_product, create_file = self.assert_create_models()
         self.assert_dispatch_mock_calls(dispatch_mock, [create_product.id], [create_file.id])
 
-    @patch("products.views.webhook.dispatch_document_tasks.delay")
+    @patch("sources.tasks.webhooks.dispatch_document_tasks.delay")
     def test_update_no_language(self, dispatch_mock):
         update_response = self.call_webhook(self.webhook_url, verb="update", overrides={"language": None})
         self.assertEqual(update_response.status_code, 200)
+        process_webhook_events()
         update_product, update_files = self.assert_update_models()
         self.assert_dispatch_mock_calls(
             dispatch_mock, [update_product.id], [update_file.id for update_file in update_files]
         )
 
-    @patch("products.views.webhook.dispatch_document_tasks.delay")
+    @patch("sources.tasks.webhooks.dispatch_document_tasks.delay")
     def test_update_deleted(self, dispatch_mock):
         # Prepare update Document
         self.update_document.state = ProductDocument.States.DELETED
@@ -233,7 +242,71 @@ class TestProductWebhookTestCase(TestCase):
         # Execute the webhook
         update_response = self.call_webhook(self.webhook_url, verb="update")
         self.assertEqual(update_response.status_code, 200)
+        process_webhook_events()
         update_product, update_files = self.assert_update_models()
         self.assert_dispatch_mock_calls(
             dispatch_mock, [update_product.id], [update_file.id for update_file in update_files]
         )
+
+    @patch("sources.tasks.webhooks.dispatch_document_tasks.delay")
+    def test_queue(self, dispatch_mock):
+        self.assert_create_models_dont_exist()
+        with self.captureOnCommitCallbacks() as callbacks:
+            create_response = self.call_webhook(self.webhook_url)
+        self.assertEqual(create_response.status_code, 200)
+        self.assertEqual(len(callbacks), 1, "Expected processing of events to get scheduled")
+        self.assertEqual(WebhookEvent.objects.count(), 1)
+        self.assert_create_models_dont_exist()
+        self.assertEqual(dispatch_mock.call_count, 0)
+        self.assertEqual(process_webhook_events(), 1)
+        self.assertFalse(WebhookEvent.objects.exists())
+        create_product, create_file = self.assert_create_models()
+        self.assert_dispatch_mock_calls(dispatch_mock, [create_product.id], [create_file.id])
+
+    @patch("sources.tasks.webhooks.dispatch_document_tasks.delay")
+    def test_coalesce(self, dispatch_mock):
+        # A burst of events for the same record only commits the latest event
+        self.call_webhook(self.webhook_url, verb="update", overrides={"language": None})
+        self.call_webhook(self.webhook_url, verb="delete")
+        self.call_webhook(self.webhook_url, verb="update")
+        self.assertEqual(WebhookEvent.objects.count(), 3)
+        self.assertEqual(WebhookEvent.objects.filter(srn__isnull=False).values("srn").distinct().count(), 2)
+        with patch("sources.tasks.webhooks.commit_webhook_seeds", wraps=commit_webhook_seeds) as commit_mock:
+            self.assertEqual(process_webhook_events(), 3)
+        self.assertFalse(WebhookEvent.objects.exists())
+        self.assertEqual(commit_mock.call_count, 2, "Expected a single commit per entity type")
+        for args, kwargs in commit_mock.call_args_list:
+            objective, webhook_data, set_instance, configuration = args
+            self.assertEqual(len(webhook_data), 2, "Expected coalesced events to get committed as one batch")
+        self.assert_update_models()
+        self.assert_delete_models()
+
+    @override_settings(WEBHOOK_EVENT_MAX_ATTEMPTS=2)
+    def test_failure(self):
+        self.call_webhook(self.webhook_url)
+        with patch("sources.tasks.webhooks.commit_webhook_seeds", side_effect=ValueError("Invalid seed")):
+            self.assertEqual(process_webhook_events(), 1)
+            event = WebhookEvent.objects.get()
+            self.assertEqual(event.retry_count, 1)
+            self.assertIsNotNone(event.next_attempt_at)
+            self.assertIsNone(event.failed_at, "Expected failed events to get retried")
+            self.assertEqual(event.error, "Invalid seed")
+            self.assertEqual(process_webhook_events(), 0, "Expected events to wait for their next attempt")
+            WebhookEvent.objects.update(next_attempt_at=now())
+            self.assertEqual(process_webhook_events(), 1)
+        event = WebhookEvent.objects.get()
+        self.assertEqual(event.retry_count, 2)
+        self.assertIsNotNone(event.failed_at, "Expected events to be marked as failed after the last attempt")
+        self.assertEqual(process_webhook_events(), 0, "Expected failed events to get skipped")
+        self.assert_create_models_dont_exist()
+
+    @patch("sources.tasks.webhooks.dispatch_document_tasks.delay")
+    def test_supersede_retries(self, dispatch_mock):
+        # An update that waits for a retry is superseded by a later update of the same record
+        self.call_webhook(self.webhook_url, verb="update", overrides={"language": None})
+        with patch("sources.tasks.webhooks.commit_webhook_seeds", side_effect=ValueError("Invalid seed")):
+            self.assertEqual(process_webhook_events(), 1)
+        self.call_webhook(self.webhook_url, verb="update")
+        self.assertEqual(process_webhook_events(), 2, "Expected the waiting event to get locked with the later event")
+        self.assertFalse(WebhookEvent.objects.exists())
+        self.assert_update_models()
@@ -1,3 +1,4 @@
+from math import ceil
 from urllib.parse import urlparse, parse_qs
 
 from datagrowth.resources import TestClientResource
@@ -22,6 +23,21 @@ class MockHarvestResource(TestClientResource):
             "page": params["page"]
         }
 
+    def next_parameters_window(self, window):
+        content_type, data = self.content
+        if not data or not data.get("next"):
+            return []
+        params = parse_qs(urlparse(self.request["url"]).query)
+        page = int(params.get("page", ["1"])[0])
+        page_size = int(params["page_size"][0])
+        last_page = ceil(data["count"] / page_size)
+        return [
+            {
+                "page": [str(number)]
+            }
+            for number in range(page + 1, min(last_page, page + window) + 1)
+        ]
+
 
 class MockIdsResource(TestClientResource):
     test_view_name = "testing:entity-ids"
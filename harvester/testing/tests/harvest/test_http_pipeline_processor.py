@@ -1,8 +1,13 @@
+from time import sleep
+from threading import Lock
+from collections import Counter
 from unittest.mock import MagicMock, patch
 
-from django.test import TestCase
+from django.test import TestCase, TransactionTestCase
 from celery.canvas import Signature
 
+from datagrowth.configuration import create_config
+
 from core.processors import HttpPipelineProcessor
 from files.models import Batch, ProcessResult, HttpTikaResource
 from files.sources.sharekit import SEQUENCE_PROPERTIES
@@ -133,3 +138,64 @@ class TestHttpPipelineProcessor(TestCase):
         self.assertEqual(finish_signature.name, "pipeline_full_merge")
         self.assertEqual(finish_signature.args, ("HttpPipelineProcessor",))
         self.assertIn("config", finish_signature.kwargs)
+
+
+class TestConcurrentHttpPipelineProcessor(TransactionTestCase):
+    """
+    Concurrent dispatch only happens outside of transactions, so this test can't use a TestCase.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.processor = HttpPipelineProcessor({
+            "pipeline_app_label": "files",
+            "pipeline_models": {
+                "document": "FileDocument",
+                "process_result": "ProcessResult",
+                "batch": "Batch"
+            },
+            "pipeline_phase": "check_url",
+            "retrieve_data": {
+                "resource": "files.checkurlresource",
+                "method": "head",
+                "args": ["$.url"],
+                "kwargs": {}
+            },
+            "contribute_data": {}
+        })
+        self.config = create_config("http_resource", {
+            "resource": "files.checkurlresource",
+            "method": "head",
+            "args": ["$.url"],
+            "kwargs": {},
+            "concurrency": 4,
+            "domain_concurrency": 2
+        })
+        self.requests = [
+            ([f"https://{domain}/{ix}"], {})
+            for ix in range(0, 6)
+            for domain in ["one.example.com", "two.example.com"]
+        ]
+
+    def test_dispatch_resources(self):
+        active = Counter()
+        maximums = Counter()
+        lock = Lock()
+
+        def dispatch_resource(config, url):
+            domain = HttpPipelineProcessor.get_request_domain(config, url)
+            with lock:
+                active[domain] += 1
+                maximums[domain] = max(maximums[domain], active[domain])
+            sleep(0.05)
+            with lock:
+                active[domain] -= 1
+            return [url], []
+
+        with patch.object(self.processor, "dispatch_resource", side_effect=dispatch_resource):
+            results = list(self.processor.dispatch_resources(self.config, self.requests))
+
+        self.assertEqual(results, [([args[0]], []) for args, kwargs in self.requests],
+                         "Expected results in the order of the requests")
+        self.assertEqual(maximums["one.example.com"], 2)
+        self.assertEqual(maximums["two.example.com"], 2)
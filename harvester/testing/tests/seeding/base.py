@@ -1,11 +1,11 @@
-from django.test import TestCase
+from django.test import TestCase, TransactionTestCase
 from django.utils.timezone import now
 
 from testing.constants import SEED_DEFAULTS
 from testing.models import Dataset, DatasetVersion, Set, TestDocument
 
 
-class HttpSeedingProcessorTestCase(TestCase):
+class HttpSeedingProcessorTestMixin(object):
 
     @classmethod
     def setUpClass(cls):
@@ -78,3 +78,16 @@ class HttpSeedingProcessorTestCase(TestCase):
         self.assertEqual(ignored_document.derivatives, self.ignored_document.derivatives)
         self.assertIsNone(ignored_document.pending_at)
         self.assertIsNotNone(ignored_document.finished_at)
+
+
+class HttpSeedingProcessorTestCase(HttpSeedingProcessorTestMixin, TestCase):
+    pass
+
+
+class HttpSeedingProcessorTransactionTestCase(HttpSeedingProcessorTestMixin, TransactionTestCase):
+    """
+    Concurrent seeding stores Resources from worker threads, which use their own database connections.
+    These connections can't see data inside the transactions of a TestCase and commit their own data,
+    so tests for concurrent seeding need to truncate tables instead of rolling back transactions.
+    """
+    pass
@@ -1,10 +1,12 @@
 from unittest.mock import patch
+from copy import deepcopy
 
 from core.processors import HttpSeedingProcessor
 from core.tasks.harvest.set import check_set_integrity
 from testing.constants import ENTITY_SEQUENCE_PROPERTIES
-from testing.tests.seeding.base import HttpSeedingProcessorTestCase
+from testing.tests.seeding.base import HttpSeedingProcessorTestCase, HttpSeedingProcessorTransactionTestCase
 from testing.utils.generators import document_generator
+from core.models import MergeIndex
 from testing.models import TestDocument, MockIdsResource, MockDetailResource
 from testing.sources.merge import SEEDING_PHASES
 
@@ -38,6 +40,86 @@ class TestMergeHttpSeedingProcessor(HttpSeedingProcessorTestCase):
             self.assertEqual(resource.request["args"], ["merge", ix])
 
 
+class TestMergeIndexHttpSeedingProcessor(HttpSeedingProcessorTestCase):
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.seeding_phases = deepcopy(SEEDING_PHASES)
+        self.seeding_phases[1]["merge_index_max_age"] = {"days": 1}
+
+    def test_seeding(self):
+        processor = HttpSeedingProcessor(self.set, {
+            "phases": self.seeding_phases
+        })
+        results = processor("merge", "1970-01-01T00:00:00Z")
+        self.assert_results(results)
+        self.assert_documents()
+        self.assertEqual(MergeIndex.objects.count(), 20, "Expected an index entry for each merged seed")
+
+        # Seeding again shouldn't retrieve any details for seeds that remain the same
+        MockDetailResource.objects.all().delete()
+        entry = MergeIndex.objects.get(merge_value="1")
+        entry.seed_hash = "changed"
+        entry.save()
+        processor = HttpSeedingProcessor(self.set, {
+            "phases": self.seeding_phases
+        })
+        for batch in processor("merge", "1970-01-01T00:00:00Z"):
+            for doc in batch:
+                self.assertIn("title", doc.properties)
+        self.assertEqual(
+            MockDetailResource.objects.all().count(), 1,
+            "Expected only details for the seed with changed list data to get retrieved"
+        )
+        self.assertEqual(MockDetailResource.objects.first().request["args"], ["merge", 1])
+
+    def test_seeding_changed_objective(self):
+        processor = HttpSeedingProcessor(self.set, {
+            "phases": self.seeding_phases
+        })
+        list(processor("merge", "1970-01-01T00:00:00Z"))
+        self.assertEqual(MockDetailResource.objects.all().count(), 20)
+        # Contents that another objective extracted shouldn't get reused
+        MockDetailResource.objects.all().delete()
+        self.seeding_phases[1]["contribute_data"]["objective"] = {
+            **self.seeding_phases[1]["contribute_data"]["objective"],
+            "title": "$.url"
+        }
+        processor = HttpSeedingProcessor(self.set, {
+            "phases": self.seeding_phases
+        })
+        list(processor("merge", "1970-01-01T00:00:00Z"))
+        self.assertEqual(
+            MockDetailResource.objects.all().count(), 20,
+            "Expected details to get retrieved again for a changed objective"
+        )
+        self.assertEqual(MergeIndex.objects.count(), 40, "Expected separate index entries for each objective")
+        self.assertEqual(MergeIndex.objects.values("index").distinct().count(), 2)
+
+
+class TestStreamingMergeHttpSeedingProcessor(HttpSeedingProcessorTransactionTestCase):
+
+    def test_seeding(self):
+        processor = HttpSeedingProcessor(self.set, {
+            "phases": SEEDING_PHASES,
+            "streaming": True
+        })
+        results = list(processor("merge", "1970-01-01T00:00:00Z"))
+
+        self.assert_results(results)
+        self.assert_documents()
+
+        # Assert that merged data ends up in the documents
+        for doc in TestDocument.objects.filter(collection=self.set):
+            self.assertIn("title", doc.properties)
+        # Assert resources
+        self.assertEqual(MockIdsResource.objects.all().count(), 1, "Expected one requests to list mock data endpoints")
+        self.assertEqual(
+            MockDetailResource.objects.all().count(), 20,
+            "Expected one request to detail mock data endpoints for each element in list data response"
+        )
+
+
 UPDATE_PARAMETERS = {
     "size": 20,
     "page_size": 10,
@@ -1,7 +1,8 @@
 from unittest.mock import patch
+from copy import deepcopy
 
 from core.processors import HttpSeedingProcessor
-from testing.tests.seeding.base import HttpSeedingProcessorTestCase
+from testing.tests.seeding.base import HttpSeedingProcessorTestCase, HttpSeedingProcessorTransactionTestCase
 from testing.models import MockHarvestResource, TestDocument
 from testing.sources.simple import SEEDING_PHASES
 
@@ -24,6 +25,38 @@ class TestSimpleHttpSeedingProcessor(HttpSeedingProcessorTestCase):
             self.assertEqual(resource.request["args"], ["simple", "1970-01-01T00:00:00Z"])
 
 
+CONCURRENT_PARAMETERS = {
+    "size": 50,
+    "page_size": 10
+}
+
+
+class TestConcurrentSimpleHttpSeedingProcessor(HttpSeedingProcessorTransactionTestCase):
+
+    @patch.object(MockHarvestResource, "PARAMETERS", CONCURRENT_PARAMETERS)
+    def test_seeding(self):
+        seeding_phases = deepcopy(SEEDING_PHASES)
+        seeding_phases[0]["retrieve_data"]["concurrency"] = 2
+        processor = HttpSeedingProcessor(self.set, {
+            "phases": seeding_phases
+        })
+        results = list(processor("simple", "1970-01-01T00:00:00Z"))
+
+        self.assert_results(results)
+        self.assert_documents(expected_documents=50)
+
+        # Assert that batches are yielded in page order regardless of the order in which requests finish
+        self.assertEqual(
+            [sorted(doc.properties["external_id"] for doc in batch) for batch in results],
+            [list(range(start, start + 5)) for start in range(0, 50, 5)]
+        )
+        # Assert resources
+        self.assertEqual(MockHarvestResource.objects.all().count(), 5, "Expected five requests to mock data endpoints")
+        for resource in MockHarvestResource.objects.all():
+            self.assertTrue(resource.success)
+            self.assertEqual(resource.request["args"], ["simple", "1970-01-01T00:00:00Z"])
+
+
 UPDATE_PARAMETERS = {
     "size": 20,
     "page_size": 10,
@@ -106,3 +106,14 @@ class TestDocumentModel(TestCase):
         document = TestDocument.build(seed, collection=self.set)
         self.assertIsNone(document.properties["title"])
         self.assertEqual(document.properties["access_rights"], "OpenAccess")
+
+    def test_projection(self):
+        document = TestDocument.objects.projection("metadata").get(id=self.document.id)
+        self.assertEqual(document.get_deferred_fields(), {"derivatives", "pipeline", "tasks"})
+        with self.assertNumQueries(0):
+            self.assertEqual(document.properties, self.document.properties)
+            self.assertEqual(document.metadata["hash"], self.document.metadata["hash"])
+        document = TestDocument.objects.projection("dispatch").get(id=self.document.id)
+        self.assertEqual(document.get_deferred_fields(), {"metadata"})
+        with self.assertRaises(ValueError):
+            TestDocument.objects.projection("unknown")